@@ -1,6 +1,7 @@
 from pocketflow import Flow
 from nodes import (
     FetchMenuNode, 
+    OCRMenuNode,
     SpecialSituationDetectorNode,
     HolidayNoticeNode,
     SpecialMenuNode,
@@ -8,54 +9,57 @@ from nodes import (
     SendSlackNode, 
     DebugCheckNode
 )
+from functools import lru_cache
+from utils.retry import get_policy
 import logging
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
-
 def create_menu_notification_flow():
     """
     구도 한식뷔페 메뉴 알림 워크플로우를 생성합니다.
     
     향상된 플로우 구조:
     1. FetchMenuNode: 인스타그램에서 메뉴 수집
+       (OCRMenuNode: 캡션 없는 이미지 메뉴면 OCR, ocr_enabled일 때만)
     2. SpecialSituationDetectorNode: 특수 상황 감지 (휴무일, 특별 메뉴 등)
     3. 상황별 분기:
        - normal: 일반 메뉴 요약 및 전송
        - holiday: 휴무일 알림 전송
        - special_menu: 특별 메뉴 알림 전송
-    4. DebugCheckNode: 각 단계별 상태 확인
+    4. DebugCheckNode: 각 단계별 상태 확인 (재시도 횟수와 실행 마감 시간으로 제한)
     """
     
-    # 1. 노드 생성 (재시도 옵션 포함)
-    fetch_node = FetchMenuNode(max_retries=3, wait=5)
-    situation_detector = SpecialSituationDetectorNode(max_retries=2, wait=3)
+    # 1. 노드 생성 (재시도 정책은 utils/retry.py의 DEFAULT_POLICIES에서 관리)
+    fetch_node = FetchMenuNode(retry_policy=get_policy("fetch"))
+    ocr_node = OCRMenuNode()
+    situation_detector = SpecialSituationDetectorNode(retry_policy=get_policy("situation"))
     
     # 특수 상황 처리 노드들
-    holiday_notice = HolidayNoticeNode(max_retries=2, wait=2)
-    special_menu = SpecialMenuNode(max_retries=2, wait=2)
+    holiday_notice = HolidayNoticeNode(retry_policy=get_policy("notice"))
+    special_menu = SpecialMenuNode(retry_policy=get_policy("notice"))
     
     # 일반 메뉴 처리 노드들
-    summarize_node = SummarizeMenuNode(max_retries=2, wait=3)
-    send_node = SendSlackNode(max_retries=2, wait=2)
+    summarize_node = SummarizeMenuNode(retry_policy=get_policy("summarize"))
+    send_node = SendSlackNode(retry_policy=get_policy("send"))
     
-    # 디버그 체크 노드들
-    debug_fetch = DebugCheckNode()
-    debug_situation = DebugCheckNode()
-    debug_summarize = DebugCheckNode()
-    debug_send = DebugCheckNode()
+    # 디버그 체크 노드들 (단계별 성공 여부만 확인, 단계 재시도 횟수 제한)
+    debug_fetch = DebugCheckNode(stage="fetch")
+    debug_situation = DebugCheckNode(stage="situation")
+    debug_summarize = DebugCheckNode(stage="summarize")
+    debug_send = DebugCheckNode(stage="send")
     
     # 2. 플로우 연결
     # 메뉴 수집 -> 디버그 체크
     fetch_node >> debug_fetch
     
     # 수집 디버그 결과에 따른 분기
-    debug_fetch - "success" >> situation_detector  # 성공시 상황 감지
+    debug_fetch - "success" >> ocr_node            # 성공시 (필요하면) 이미지 OCR
+    ocr_node >> situation_detector                 # 그 다음 상황 감지
     debug_fetch - "retry" >> fetch_node            # 재시도시 다시 수집
     debug_fetch - "fail" >> send_node              # 실패시 에러 메시지 전송
     
-    # 상황 감지 -> 디버그 체크
-    situation_detector >> debug_situation
+    # 상황 감지 -> 디버그 체크 (감지 노드는 감지된 액션을 반환하므로 액션별로 연결)
+    for situation_action in ("normal", "holiday_notice", "special_notice", "error_notice"):
+        situation_detector - situation_action >> debug_situation
     
     # 상황 감지 결과에 따른 분기
     debug_situation - "normal" >> summarize_node     # 일반 메뉴: 요약 진행
@@ -153,11 +157,20 @@ def get_default_shared_store():
         "config": {
             "instagram_url": "https://www.instagram.com/sunaedong_buffet/",
             "slack_channel": "#gudo",
-            "debug_mode": True
+            "debug_mode": True,
+            "history_db": "data/menu_history.db",
+            "lexicon_path": "data/dish_lexicon.json",
+            "sla_time": "11:05",  # 메뉴가 슬랙에 도착해야 하는 시각 (실행 예산 = 이 시각까지 남은 시간, 최대 10분)
+            "delivery_mode": "full",  # "diff"면 이전 실행과 달라진 메뉴만 전송
+            "stream_summary": False,  # LLM 요약을 받는 대로 슬랙 메시지를 고쳐 쓰며 보여주기 (full 전송만)
+            "diff_thread": True,  # diff 모드에서 주간 전체 메뉴를 고정하고 그 스레드에 답글로 전송
+            "ocr_enabled": False,  # 캡션 없는 이미지 메뉴를 OCR로 읽기 (pytesseract + tesseract-ocr-kor 필요)
+            "ocr_cache_dir": "data/ocr_cache",
+            "archive_dir": "data/post_archive"  # 가져온 페이지 HTML/캡션 압축 보관 (None이면 보관 안 함)
         },
         "menu_data": {
             "raw_content": "",
-            "extracted_menu": "",
+            "extracted_menu": {},
             "summary": "",
             "situation_analysis": {}
         },
@@ -170,14 +183,50 @@ def get_default_shared_store():
             "special_menu_sent": False,
             "last_run": None,
             "error_log": []
-        }
+        },
+        "metrics": {
+            "node_timings": []
+        },
+        "runtime": {}  # 실행 중에만 쓰는 객체 (프로파일러 등)
     }
 
-# 기본 워크플로우 생성
-menu_flow = create_menu_notification_flow()
-simple_flow = create_simple_menu_flow()
-holiday_test_flow = create_holiday_test_flow()
-special_test_flow = create_special_menu_test_flow()
+# 이름별 플로우 생성 함수
+FLOW_FACTORIES = {
+    "menu": create_menu_notification_flow,
+    "simple": create_simple_menu_flow,
+    "holiday_test": create_holiday_test_flow,
+    "special_test": create_special_menu_test_flow
+}
+
+@lru_cache(maxsize=None)
+def get_flow(name):
+    """
+    이름에 해당하는 플로우를 처음 요청될 때 생성하고 이후에는 재사용합니다.
+    
+    PocketFlow는 실행할 때마다 노드를 복사하므로 같은 플로우 객체를 여러 번 실행해도 안전합니다.
+    
+    Args:
+        name (str): "menu", "simple", "holiday_test", "special_test" 중 하나
+        
+    Returns:
+        Flow: 생성된 (또는 캐시된) 플로우
+    """
+    if name not in FLOW_FACTORIES:
+        raise ValueError(f"알 수 없는 플로우: {name}")
+    return FLOW_FACTORIES[name]()
+
+# 기존 모듈 변수(menu_flow 등)는 import 시점에 만들지 않고 처음 접근할 때 생성
+_LEGACY_FLOW_NAMES = {
+    "menu_flow": "menu",
+    "simple_flow": "simple",
+    "holiday_test_flow": "holiday_test",
+    "special_test_flow": "special_test"
+}
+
+def __getattr__(name):
+    if name in _LEGACY_FLOW_NAMES:
+        return get_flow(_LEGACY_FLOW_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     # 테스트 실행
@@ -189,7 +238,7 @@ if __name__ == "__main__":
     # 간단한 플로우로 테스트
     print("간단한 플로우로 테스트 실행...")
     try:
-        simple_flow.run(shared)
+        get_flow("simple").run(shared)
         print(f"✅ 테스트 완료")
         print(f"📊 최종 상태: {shared['status']}")
         
@@ -7,15 +7,24 @@
 사용법:
     python main.py                    # 스케줄러 모드 (매일 11시 실행)
     python main.py --now              # 즉시 실행 모드  
+    python main.py --delivery diff    # 지난 메뉴와 달라진 점만 전송
+    python main.py --watch            # 새 포스트가 올라오는 즉시 실행
+    python main.py --tenants tenants.toml  # 여러 식당을 워커 풀로 실행
+    python main.py --bot              # 슬랙 /menu 명령에 저장된 요약으로 답하는 봇
+    python main.py --ha               # 여러 개를 띄워도 리더 하나만 실행 (대기 프로세스가 이어받음)
     python main.py --test             # 테스트 모드 (더미 데이터)
     python main.py --check            # 환경변수 체크
     python main.py --holiday-test     # 휴무일 상황 테스트
     python main.py --special-test     # 특별 메뉴 상황 테스트
+    python main.py --bench            # 기록 데이터 재생 벤치마크
+    python main.py --now --profile    # 노드별 프로파일링과 함께 실행
+    python main.py --history 갈비찜   # 메뉴 제공 기록 조회
 """
 
 import argparse
 import os
 import sys
+import time
 from datetime import datetime
 import logging
 
@@ -26,26 +35,17 @@ try:
 except ImportError:
     pass
 
-from flow import (
-    create_menu_notification_flow, 
-    create_simple_menu_flow, 
-    create_holiday_test_flow,
-    create_special_menu_test_flow,
-    get_default_shared_store
-)
-from utils.scheduler import schedule_daily_menu_job, run_scheduler, run_immediately, get_next_run_time
+from flow import get_flow, get_default_shared_store
+from utils.scheduler import schedule_daily_menu_job, run_scheduler, run_immediately, get_next_run_time, run_daily_menu_workflow
 from utils.slack_sender import send_slack_message
-
-# 로깅 설정
-def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('menu_notification.log'),
-            logging.StreamHandler()
-        ]
-    )
+from utils.bench import DEFAULT_FIXTURES_DIR
+from utils.profiler import DEFAULT_PROFILE_DIR, profiling, profile_workflow
+from utils.logger import setup_logging, log_context, new_run_id
+from utils.retry import Deadline, DEFAULT_RUN_DEADLINE_SECONDS
+from utils.history import MenuHistory, DEFAULT_DB_PATH
+from utils.proxy_pool import ProxyPool, set_proxy_pool
+from utils.coordination import DEFAULT_COORDINATION_DB
+from utils.metrics import record_run, start_metrics_server, set_next_run_provider, heartbeat
 
 def check_environment():
     """
@@ -86,8 +86,50 @@ def run_menu_workflow(shared_store):
     """
     메뉴 워크플로우를 실행하는 함수
     """
+    run_id = new_run_id()
+    runtime = shared_store.setdefault("runtime", {})
+    runtime["run_id"] = run_id
+    # 실행 전체 마감 시간 (재시도/단계 재시도가 이 시간을 넘지 않고, 남은 예산이 적으면 노드가 싼 경로를 선택)
+    # 슬랙 도착 목표 시각(sla_time)이 있으면 그 시각까지만 예산으로 사용
+    deadline = Deadline.until(shared_store["config"].get("sla_time"), DEFAULT_RUN_DEADLINE_SECONDS)
+    runtime["deadline"] = deadline
+    # 스케줄러는 shared store를 계속 쓰므로 지난 실행의 스트리밍 메시지를 고치거나 메모 조회를 다시 세지 않도록 지움
+    for key in ("streamed_ts", "streamed_channel", "summary_memo_lookup"):
+        shared_store["status"].pop(key, None)
+    with log_context(run_id=run_id):
+        logging.info(f"⏳ 실행 예산 {deadline.seconds:.0f}초")
+        _run_menu_workflow(shared_store)
+        log_budget(shared_store, deadline)
+        record_history(shared_store)
+        record_run(shared_store, deadline.elapsed())
+
+def log_budget(shared_store, deadline):
+    """단계별 실행 예산 사용량을 로그로 남기고 metrics["budget"]에 저장합니다"""
+    report = deadline.report()
+    for entry in report:
+        logging.info(f"⏳ {entry['stage']}: {entry['seconds']:.2f}초 (예산의 {entry['share']:.1%})")
+    cheap_paths = shared_store["status"].get("cheap_paths", [])
+    logging.info(f"⏳ 예산 사용 {deadline.elapsed():.1f}/{deadline.seconds:.0f}초"
+                 + (f", 싼 경로 사용: {', '.join(cheap_paths)}" if cheap_paths else ""))
+    shared_store.setdefault("metrics", {})["budget"] = {
+        "seconds": deadline.seconds,
+        "elapsed": deadline.elapsed(),
+        "stages": report
+    }
+
+def record_history(shared_store):
+    """
+    실행 결과를 실행 기록 DB에 저장합니다. (저장 실패가 알림 흐름을 막지 않도록 로그만 남김)
+    """
+    try:
+        history = MenuHistory(shared_store["config"].get("history_db", DEFAULT_DB_PATH))
+        history.record_run(shared_store)
+    except Exception as e:
+        logging.warning(f"⚠️ 실행 기록 저장 실패: {e}")
+
+def _run_menu_workflow(shared_store):
     try:
-        flow = create_menu_notification_flow()
+        flow = get_flow("menu")
         flow.run(shared_store)
         
         # 결과 로깅
@@ -107,7 +149,7 @@ def run_menu_workflow(shared_store):
         except:
             pass  # 슬랙 알림도 실패하면 로그만 남김
 
-def test_mode():
+def test_mode(profile_dir=None):
     """
     테스트 모드: 더미 데이터로 플로우 테스트
     """
@@ -154,12 +196,13 @@ def test_mode():
     
     try:
         # 간단한 플로우로 테스트 (스크래핑 건너뛰고 요약부터)
-        flow = create_simple_menu_flow()
+        flow = get_flow("simple")
         
         # FetchMenuNode 건너뛰기 위해 상태 미리 설정
         shared["status"]["fetch_success"] = True
         
-        flow.run(shared)
+        with profiling(shared, profile_dir):
+            flow.run(shared)
         
         print("✅ 테스트 완료!")
         print(f"📊 최종 상태: {shared['status']}")
@@ -169,7 +212,7 @@ def test_mode():
     except Exception as e:
         print(f"❌ 테스트 실패: {e}")
 
-def holiday_test_mode():
+def holiday_test_mode(profile_dir=None):
     """
     휴무일 상황 테스트 모드
     """
@@ -193,12 +236,13 @@ def holiday_test_mode():
     
     try:
         # 휴무일 테스트 플로우 실행
-        flow = create_holiday_test_flow()
+        flow = get_flow("holiday_test")
         
         # FetchMenuNode 건너뛰기 위해 상태 미리 설정
         shared["status"]["fetch_success"] = True
         
-        flow.run(shared)
+        with profiling(shared, profile_dir):
+            flow.run(shared)
         
         print("✅ 휴무일 테스트 완료!")
         print(f"📊 최종 상태: {shared['status']}")
@@ -213,7 +257,7 @@ def holiday_test_mode():
     except Exception as e:
         print(f"❌ 휴무일 테스트 실패: {e}")
 
-def special_menu_test_mode():
+def special_menu_test_mode(profile_dir=None):
     """
     특별 메뉴 상황 테스트 모드
     """
@@ -248,12 +292,13 @@ def special_menu_test_mode():
     
     try:
         # 특별 메뉴 테스트 플로우 실행
-        flow = create_special_menu_test_flow()
+        flow = get_flow("special_test")
         
         # FetchMenuNode 건너뛰기 위해 상태 미리 설정
         shared["status"]["fetch_success"] = True
         
-        flow.run(shared)
+        with profiling(shared, profile_dir):
+            flow.run(shared)
         
         print("✅ 특별 메뉴 테스트 완료!")
         print(f"📊 최종 상태: {shared['status']}")
@@ -268,7 +313,7 @@ def special_menu_test_mode():
     except Exception as e:
         print(f"❌ 특별 메뉴 테스트 실패: {e}")
 
-def immediate_mode():
+def immediate_mode(profile_dir=None, delivery_mode="full", stream=False, history_db=DEFAULT_DB_PATH):
     """
     즉시 실행 모드: 지금 당장 메뉴 워크플로우 실행
     """
@@ -280,9 +325,13 @@ def immediate_mode():
     
     # shared store 준비
     shared = get_default_shared_store()
+    shared["config"]["delivery_mode"] = delivery_mode
+    shared["config"]["stream_summary"] = stream
+    shared["config"]["history_db"] = history_db
     
     print("🚀 메뉴 워크플로우 시작...")
-    run_menu_workflow(shared)
+    with profiling(shared, profile_dir):
+        run_menu_workflow(shared)
     
     print("📊 실행 결과:")
     print(f"- 수집 성공: {shared['status'].get('fetch_success', False)}")
@@ -302,9 +351,13 @@ def immediate_mode():
         print(f"  - 감지된 키워드: {', '.join(analysis.get('detected_keywords', []))}")
         print(f"  - 상황 요약: {analysis.get('summary', 'N/A')}")
 
-def scheduler_mode():
+def scheduler_mode(profile_dir=None, profile_run=1, delivery_mode="full", ha=False,
+                   coordination_db=DEFAULT_COORDINATION_DB, stream=False, history_db=DEFAULT_DB_PATH):
     """
     스케줄러 모드: 매일 11시에 자동 실행
+    
+    profile_dir가 주어지면 profile_run번째 실행 한 번만 프로파일링합니다.
+    ha이면 같은 coordination_db를 쓰는 프로세스 중 리더 하나만 실행하고, 리더가 죽으면 대기 프로세스가 이어받습니다.
     """
     print("⏰ 스케줄러 모드")
     
@@ -314,9 +367,25 @@ def scheduler_mode():
     
     # shared store 준비
     shared = get_default_shared_store()
+    shared["config"]["delivery_mode"] = delivery_mode
+    shared["config"]["stream_summary"] = stream
+    shared["config"]["history_db"] = history_db
+    
+    workflow = run_menu_workflow
+    if profile_dir:
+        workflow = profile_workflow(run_menu_workflow, profile_dir, profile_run)
+        print(f"🔬 {profile_run}번째 실행을 프로파일링합니다 ({profile_dir})")
+    
+    elector = None
+    if ha:
+        from utils.coordination import Coordinator, LeaderElector, leader_only
+        elector = LeaderElector(Coordinator(coordination_db)).start()
+        workflow = leader_only(workflow, elector)
+        print(f"👑 고가용성 모드: {'리더' if elector.is_leader else '대기'} ({coordination_db})")
     
     # 스케줄링 설정
-    schedule_daily_menu_job(run_menu_workflow, shared, "11:00")
+    schedule_daily_menu_job(workflow, shared, "11:00")
+    set_next_run_provider(get_next_run_time)
     
     print(f"📅 매일 오전 11시에 메뉴 알림 실행하도록 설정했습니다.")
     print(f"⏳ 다음 실행 예정: {get_next_run_time()}")
@@ -326,6 +395,274 @@ def scheduler_mode():
         run_scheduler()
     except KeyboardInterrupt:
         print("\n⏹️ 스케줄러가 중지되었습니다.")
+    finally:
+        if elector:
+            elector.stop()
+
+def watch_mode(delivery_mode="full", history_db=DEFAULT_DB_PATH, stream=False):
+    """
+    감시 모드: 새 포스트가 올라오는 즉시 메뉴 워크플로우 실행
+    
+    과거 게시 시각 근처에서는 자주, 그 외 시간에는 드물게 HTTP 요청 한 번으로 최신 포스트를 확인합니다.
+    """
+    from utils.post_watcher import PostWatcher, DEFAULT_WATCH_START, DEFAULT_WATCH_END
+    
+    print("👀 감시 모드")
+    
+    # 환경변수 체크
+    if not check_environment():
+        return
+    
+    def on_new_post(shortcode):
+        shared = get_default_shared_store()
+        shared["config"]["delivery_mode"] = delivery_mode
+        shared["config"]["history_db"] = history_db
+        shared["config"]["stream_summary"] = stream
+        if shortcode:
+            shared["menu_data"]["post_id"] = shortcode
+        run_daily_menu_workflow(run_menu_workflow, shared)
+    
+    config = get_default_shared_store()["config"]
+    watcher = PostWatcher(config["instagram_url"], on_new_post, MenuHistory(history_db))
+    
+    print(f"📅 매일 {DEFAULT_WATCH_START}~{DEFAULT_WATCH_END} 사이에 새 포스트를 확인합니다.")
+    print("💡 Ctrl+C로 중지할 수 있습니다.")
+    
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n⏹️ 감시가 중지되었습니다.")
+
+def bot_mode(transport="http", port=None, delivery_mode="full", history_db=DEFAULT_DB_PATH):
+    """
+    슬랙 봇 모드: /menu, /menu tomorrow, /menu history 메뉴 명령에 실행 기록 DB의 요약으로 답함
+    
+    요청 처리 중에는 스크래핑/LLM을 호출하지 않고, 오늘 메뉴가 아직 없을 때만 백그라운드에서 워크플로우를 실행합니다.
+    transport가 "socket"이면 SLACK_APP_TOKEN으로 Socket Mode에 연결하고, "http"이면 port에서 슬랙 요청을 받습니다.
+    """
+    from utils.slack_bot import MenuBot, DEFAULT_BOT_PORT, start_bot_server, start_socket_mode
+    
+    print("💬 슬랙 봇 모드")
+    
+    # 환경변수 체크
+    if not check_environment():
+        return
+    
+    def refresh():
+        shared = get_default_shared_store()
+        shared["config"]["delivery_mode"] = delivery_mode
+        shared["config"]["history_db"] = history_db
+        run_daily_menu_workflow(run_menu_workflow, shared)
+    
+    bot = MenuBot(MenuHistory(history_db), refresh)
+    if transport == "socket":
+        app_token = os.environ.get("SLACK_APP_TOKEN")
+        if not app_token:
+            print("❌ Socket Mode에는 SLACK_APP_TOKEN 환경변수가 필요합니다.")
+            return
+        connection = start_socket_mode(bot, app_token, os.environ["SLACK_BOT_TOKEN"])
+    else:
+        connection = start_bot_server(bot, port or DEFAULT_BOT_PORT,
+                                      signing_secret=os.environ.get("SLACK_SIGNING_SECRET"))
+    
+    print("💡 Ctrl+C로 중지할 수 있습니다.")
+    
+    try:
+        while True:
+            heartbeat("bot", 30)
+            time.sleep(30)
+    except KeyboardInterrupt:
+        print("\n⏹️ 슬랙 봇이 중지되었습니다.")
+    finally:
+        if transport == "socket":
+            connection.close()
+        else:
+            connection.shutdown()
+
+def tenant_mode(path, workers, browsers, processes=1, ha=False, coordination_db=DEFAULT_COORDINATION_DB,
+                metrics_port=None):
+    """
+    멀티 테넌트 모드: 설정 파일의 모든 식당을 각자의 실행 시각에 워커 풀에서 실행
+    
+    브라우저 풀, LLM/슬랙 클라이언트, 스크래핑 서킷/프록시 풀은 모든 테넌트가 함께 쓰고
+    shared store와 실행 기록 DB는 테넌트마다 따로 사용합니다.
+    
+    processes가 2 이상이면 테넌트를 이름 순으로 번갈아 나눠서 워커 프로세스마다 한 샤드씩 실행하고,
+    ha이면 리더로 선출된 프로세스만 실행합니다. 두 경우 모두 "테넌트:날짜" 작업 선점으로 한 번만 실행합니다.
+    metrics_port가 있으면 샤드 워커는 metrics_port + 샤드 번호 포트에 자기 메트릭을 내보냅니다.
+    """
+    from utils.tenants import load_tenants, next_run_time
+    
+    print("🏢 멀티 테넌트 모드")
+    
+    # 환경변수 체크
+    if not check_environment():
+        return
+    
+    # 워커 프로세스를 띄우기 전에 설정 오류를 확인
+    tenants = load_tenants(path)
+    coordinated = ha or processes > 1
+    
+    print(f"📋 테넌트 {len(tenants)}개, 프로세스 {processes}개 × 워커 {workers}개, "
+          f"프로세스당 브라우저 최대 {browsers}개")
+    print("💡 Ctrl+C로 중지할 수 있습니다.")
+    
+    elector = None
+    if ha:
+        from utils.coordination import Coordinator, LeaderElector
+        elector = LeaderElector(Coordinator(coordination_db)).start()
+    keep_running = (lambda: elector.is_leader) if elector else None
+    if processes > 1:
+        set_next_run_provider(lambda: next_run_time(tenants))
+    
+    try:
+        while True:
+            if elector and not elector.is_leader:
+                print(f"💤 대기 중: 리더가 죽으면 이어받습니다 ({coordination_db})")
+                elector.wait_for_leadership()
+            if processes > 1:
+                supervise_tenant_shards(path, workers, browsers, processes, coordination_db, keep_running,
+                                        metrics_port)
+            else:
+                run_tenant_shard(path, 0, 1, workers, browsers,
+                                 coordination_db if coordinated else None, keep_running)
+            if elector is None:
+                break
+    except KeyboardInterrupt:
+        print("\n⏹️ 멀티 테넌트 스케줄러가 중지되었습니다.")
+    finally:
+        if elector:
+            elector.stop()
+
+def run_tenant_shard(path, shard, shard_count, workers, browsers, coordination_db=None, keep_running=None):
+    """
+    테넌트 중 shard번째 샤드를 이 프로세스의 워커 풀에서 실행합니다.
+    
+    coordination_db가 있으면 작업 선점으로 한 번만 실행하고, 리더가 바뀐 직후 놓친 실행을 이어받습니다.
+    """
+    from utils.tenants import load_tenants, TenantScheduler
+    from utils.browser_pool import BrowserPool, set_browser_pool
+    from utils.coordination import Coordinator, shard_items, DEFAULT_CATCH_UP_MINUTES
+    
+    tenants = shard_items(load_tenants(path), shard, shard_count, key=lambda tenant: tenant.name)
+    coordinator = Coordinator(coordination_db) if coordination_db else None
+    pool = BrowserPool(size=browsers)
+    set_browser_pool(pool)
+    scheduler = TenantScheduler(tenants, run_menu_workflow, workers=workers, coordinator=coordinator,
+                                catch_up=DEFAULT_CATCH_UP_MINUTES if coordinator else False)
+    set_next_run_provider(scheduler.next_run)
+    logging.info(f"🧩 샤드 {shard + 1}/{shard_count}: {', '.join(tenant.name for tenant in tenants) or '테넌트 없음'}"
+                 f" (다음 실행 예정: {scheduler.next_run()})")
+    try:
+        scheduler.run(keep_running=keep_running)
+    finally:
+        pool.close()
+
+def tenant_shard_worker(path, shard, shard_count, workers, browsers, coordination_db, parent_pid, metrics_port=None):
+    """
+    샤드 워커 프로세스의 진입점
+    
+    로그 파일은 프로세스마다 따로 쓰고 (파일 로테이션 충돌 방지), 부모 프로세스가 죽으면 함께 종료합니다.
+    """
+    setup_logging(log_file=f"menu_notification.shard{shard}.log")
+    if metrics_port:
+        start_metrics_server(metrics_port + shard + 1)
+    try:
+        run_tenant_shard(path, shard, shard_count, workers, browsers, coordination_db,
+                         keep_running=lambda: os.getppid() == parent_pid)
+    except KeyboardInterrupt:
+        pass
+
+def supervise_tenant_shards(path, workers, browsers, processes, coordination_db, keep_running=None,
+                            metrics_port=None):
+    """
+    샤드 워커 프로세스를 띄우고, 죽은 워커는 다시 띄웁니다. (keep_running이 False가 되면 모두 종료)
+    """
+    import multiprocessing
+    
+    # fork는 로그 리스너 스레드와 SQLite 연결을 복제하므로 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    processes_by_shard = {}
+    try:
+        while keep_running is None or keep_running():
+            heartbeat("supervisor", 2)
+            for shard in range(processes):
+                process = processes_by_shard.get(shard)
+                if process is not None and process.is_alive():
+                    continue
+                if process is not None:
+                    logging.warning(f"⚠️ 샤드 {shard + 1} 워커 종료됨 (exit {process.exitcode}), 다시 시작합니다")
+                process = context.Process(
+                    target=tenant_shard_worker,
+                    args=(path, shard, processes, workers, browsers, coordination_db, os.getpid(), metrics_port),
+                    name=f"tenant-shard-{shard + 1}"
+                )
+                process.start()
+                processes_by_shard[shard] = process
+            time.sleep(2)
+    finally:
+        for process in processes_by_shard.values():
+            process.terminate()
+        for process in processes_by_shard.values():
+            process.join(timeout=10)
+        if processes_by_shard:
+            logging.info(f"⏹️ 샤드 워커 {len(processes_by_shard)}개 종료")
+
+def history_mode(args):
+    """
+    실행 기록 조회 모드: 메뉴가 마지막으로 나온 날짜, 요일별 휴무일 통계 등
+    """
+    history = MenuHistory(args.history_db)
+    
+    if args.history:
+        dates = history.dish_dates(args.history)
+        if dates:
+            print(f"🍽️ '{args.history}' 마지막 제공일: {dates[0]}")
+            print(f"📅 최근 제공일: {', '.join(dates)}")
+        else:
+            print(f"🔍 '{args.history}' 제공 기록이 없습니다.")
+            matches = history.search_captions(args.history, limit=5)
+            if matches:
+                print(f"📝 캡션에 포함된 날짜: {', '.join(row['run_date'] for row in matches)}")
+    
+    if args.history_stats:
+        print("🏖️ 요일별 휴무일 횟수:")
+        for weekday, count in history.holiday_frequency_by_weekday().items():
+            print(f"  - {weekday}: {count}회")
+        print("⏱️ 최근 30일 노드별 평균 실행 시간:")
+        for node, stats in history.node_timing_stats().items():
+            print(f"  - {node}: 평균 {stats['avg'] * 1000:.1f}ms / 최대 {stats['max'] * 1000:.1f}ms (n={stats['count']})")
+        memo = history.summary_memo_stats()
+        print(f"♻️ 최근 30일 요약 메모 적중률: {memo['hit_rate'] * 100:.1f}% "
+              f"({memo['hits']}/{memo['lookups']}회, 저장된 요약 {memo['entries']}개)")
+
+def bench_mode(args):
+    """
+    벤치마크 모드: 기록된 인스타그램 데이터를 실제 플로우에 재생하며 성능 측정
+    """
+    import json
+    from utils.bench import run_benchmark, save_results, compare_results, print_report
+    
+    print("🏁 벤치마크 모드 실행 중...")
+    
+    results = run_benchmark(
+        fixtures_dir=args.bench_fixtures,
+        flow_name=args.bench_flow,
+        runs=args.bench_runs,
+        llm_backend=args.bench_llm,
+        llm_latency=args.bench_llm_latency
+    )
+    
+    print_report(results)
+    output_path = save_results(results, args.bench_output)
+    print(f"💾 결과 저장: {output_path}")
+    
+    if args.bench_compare:
+        with open(args.bench_compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n🔀 기준 결과와 비교 ({args.bench_compare}):")
+        for line in compare_results(baseline, results):
+            print(f"  - {line}")
 
 def main():
     """메인 함수"""
@@ -338,10 +675,22 @@ def main():
 사용 예시:
   python main.py                    # 스케줄러 모드 (매일 11시 실행)
   python main.py --now              # 즉시 실행 모드  
+  python main.py --delivery diff    # 지난 메뉴와 달라진 점만 전송
+  python main.py --watch            # 새 포스트가 올라오는 즉시 실행
   python main.py --test             # 테스트 모드 (더미 데이터)
   python main.py --check            # 환경변수 체크
   python main.py --holiday-test     # 휴무일 상황 테스트
   python main.py --special-test     # 특별 메뉴 상황 테스트
+  python main.py --bench            # 기록 데이터 재생 벤치마크
+  python main.py --now --profile    # 노드별 프로파일링과 함께 실행
+  python main.py --history 갈비찜   # 메뉴 제공 기록 조회
+  python main.py --history-stats    # 요일별 휴무일/노드 실행 시간 통계
+  python main.py --tenants tenants.toml --workers 8  # 멀티 테넌트 모드
+  python main.py --ha               # 여러 개를 띄워도 리더 하나만 실행
+  python main.py --tenants tenants.toml --processes 4 --ha  # 테넌트를 프로세스 4개로 나눠 실행
+  python main.py --metrics-port 9108  # 메트릭/헬스 체크 HTTP 서버와 함께 실행
+  python main.py --bot --bot-port 3000  # 슬랙 /menu 명령 봇 (HTTP 이벤트 엔드포인트)
+  python main.py --bot socket       # 슬랙 /menu 명령 봇 (Socket Mode)
         """
     )
     
@@ -375,23 +724,216 @@ def main():
         help='특별 메뉴 상황 테스트 모드'
     )
     
+    parser.add_argument(
+        '--bench', 
+        action='store_true', 
+        help='벤치마크 모드 (기록된 데이터를 실제 플로우에 재생)'
+    )
+    
+    parser.add_argument(
+        '--bench-fixtures', 
+        default=DEFAULT_FIXTURES_DIR, 
+        help='벤치마크 기록 데이터 디렉토리 또는 원본 포스트 아카이브 디렉토리 (기본값: bench/fixtures)'
+    )
+    
+    parser.add_argument(
+        '--bench-flow', 
+        default='simple', 
+        choices=['full', 'simple', 'holiday', 'special'],
+        help='벤치마크할 플로우 (기본값: simple)'
+    )
+    
+    parser.add_argument(
+        '--bench-runs', 
+        type=int, 
+        default=5, 
+        help='기록 데이터 전체 반복 횟수 (기본값: 5)'
+    )
+    
+    parser.add_argument(
+        '--bench-llm', 
+        default='fake', 
+        choices=['fake', 'cached'],
+        help='LLM 백엔드: fake(가짜 응답) 또는 cached(실제 응답 기록/재생)'
+    )
+    
+    parser.add_argument(
+        '--bench-llm-latency', 
+        type=float, 
+        default=0.0, 
+        help='가짜 LLM 호출당 지연 시간(초)'
+    )
+    
+    parser.add_argument(
+        '--bench-output', 
+        help='결과 JSON 저장 경로 (기본값: bench_results/bench-<시간>-<커밋>.json)'
+    )
+    
+    parser.add_argument(
+        '--bench-compare', 
+        help='비교할 기준 결과 JSON 경로'
+    )
+    
+    parser.add_argument(
+        '--profile', 
+        action='store_true', 
+        help='노드별 exec 프로파일링 (pyinstrument가 있으면 샘플링, 없으면 cProfile)'
+    )
+    
+    parser.add_argument(
+        '--profile-dir', 
+        default=DEFAULT_PROFILE_DIR, 
+        help='프로파일 결과 저장 디렉토리 (기본값: profiles)'
+    )
+    
+    parser.add_argument(
+        '--profile-run', 
+        type=int, 
+        default=1, 
+        help='스케줄러 모드에서 프로파일링할 실행 순번 (기본값: 1)'
+    )
+    
+    parser.add_argument(
+        '--history', 
+        metavar='DISH', 
+        help='메뉴가 마지막으로 나온 날짜 조회'
+    )
+    
+    parser.add_argument(
+        '--history-stats', 
+        action='store_true', 
+        help='요일별 휴무일 횟수와 노드별 실행 시간 통계'
+    )
+    
+    parser.add_argument(
+        '--watch', 
+        action='store_true', 
+        help='감시 모드 (새 포스트가 올라오는 즉시 실행)'
+    )
+    
+    parser.add_argument(
+        '--delivery', 
+        choices=['full', 'diff'], 
+        default='full', 
+        help='전송 방식: full(전체 메뉴) 또는 diff(지난 메뉴와 달라진 점만, 주간 전체 메뉴 스레드에 답글)'
+    )
+    
+    parser.add_argument(
+        '--stream', 
+        action='store_true', 
+        help='LLM 요약을 받는 대로 슬랙 메시지 하나를 고쳐 쓰며 보여줌 (full 전송만 해당)'
+    )
+    
+    parser.add_argument(
+        '--history-db', 
+        default=DEFAULT_DB_PATH, 
+        help='실행 기록 DB 경로 (기본값: data/menu_history.db)'
+    )
+    
+    parser.add_argument(
+        '--proxies', 
+        metavar='FILE', 
+        help='프록시 목록 파일 (한 줄에 하나, 건강 점수로 골라서 사용)'
+    )
+    
+    parser.add_argument(
+        '--tenants', 
+        metavar='FILE', 
+        help='멀티 테넌트 설정 파일 (JSON/TOML/YAML)'
+    )
+    
+    parser.add_argument(
+        '--workers', 
+        type=int, 
+        default=4, 
+        help='멀티 테넌트 모드에서 동시에 실행할 워크플로우 수 (기본값: 4)'
+    )
+    
+    parser.add_argument(
+        '--browsers', 
+        type=int, 
+        default=2, 
+        help='멀티 테넌트 모드에서 함께 쓰는 Chromium 최대 개수 (기본값: 2)'
+    )
+    
+    parser.add_argument(
+        '--processes', 
+        type=int, 
+        default=1, 
+        help='멀티 테넌트 모드에서 테넌트를 나눠 실행할 워커 프로세스 수 (기본값: 1)'
+    )
+    
+    parser.add_argument(
+        '--ha', 
+        action='store_true', 
+        help='고가용성 모드: 여러 개를 띄워도 리더 하나만 실행하고, 리더가 죽으면 대기 프로세스가 이어받음'
+    )
+    
+    parser.add_argument(
+        '--coordination-db', 
+        default=DEFAULT_COORDINATION_DB, 
+        help='리더 선출/작업 선점용 SQLite 경로, 같은 호스트의 모든 프로세스가 같은 경로 사용 (기본값: data/coordination.db)'
+    )
+    
+    parser.add_argument(
+        '--metrics-port', 
+        type=int, 
+        metavar='PORT', 
+        help='데몬 모드에서 /metrics(Prometheus), /healthz, /next-run을 제공할 포트 (기본값: 사용 안 함)'
+    )
+    
+    parser.add_argument(
+        '--bot', 
+        nargs='?', 
+        const='http', 
+        choices=['http', 'socket'], 
+        help='슬랙 봇 모드: /menu 명령에 저장된 요약으로 답함 (http: 이벤트 엔드포인트, socket: Socket Mode)'
+    )
+    
+    parser.add_argument(
+        '--bot-port', 
+        type=int, 
+        help='슬랙 봇 HTTP 모드에서 /slack/commands, /slack/events를 받을 포트 (기본값: 3000)'
+    )
+    
     args = parser.parse_args()
+    profile_dir = args.profile_dir if args.profile else None
     
     print("🍽️ 구도 한식뷔페 메뉴 알림 시스템")
     print("=" * 50)
     
+    if args.proxies:
+        set_proxy_pool(ProxyPool.from_file(args.proxies))
+    
+    daemon = not (args.check or args.test or args.holiday_test or args.special_test or args.history
+                  or args.history_stats or args.bench or args.now)
+    if args.metrics_port and daemon:
+        start_metrics_server(args.metrics_port)
+    
     if args.check:
         check_environment()
     elif args.test:
-        test_mode()
+        test_mode(profile_dir)
     elif args.holiday_test:
-        holiday_test_mode()
+        holiday_test_mode(profile_dir)
     elif args.special_test:
-        special_menu_test_mode()
+        special_menu_test_mode(profile_dir)
+    elif args.history or args.history_stats:
+        history_mode(args)
+    elif args.bench:
+        bench_mode(args)
     elif args.now:
-        immediate_mode()
+        immediate_mode(profile_dir, args.delivery, args.stream, args.history_db)
+    elif args.bot:
+        bot_mode(args.bot, args.bot_port, args.delivery, args.history_db)
+    elif args.watch:
+        watch_mode(args.delivery, args.history_db, args.stream)
+    elif args.tenants:
+        tenant_mode(args.tenants, args.workers, args.browsers, args.processes, args.ha, args.coordination_db,
+                    args.metrics_port)
     else:
-        scheduler_mode()
+        scheduler_mode(profile_dir, args.profile_run, args.delivery, args.ha, args.coordination_db, args.stream,
+                       args.history_db)
 
 if __name__ == "__main__":
     main()
@@ -1,33 +1,143 @@
 from pocketflow import Node
-from utils.call_llm import call_llm
-from utils.instagram_scraper import scrape_menu_from_instagram
-from utils.slack_sender import send_slack_message, send_error_notification, send_debug_info
+from utils.call_llm import call_llm, stream_llm
+from utils.instagram_scraper import scrape_menu_post
+from utils.slack_sender import (send_slack_message, post_slack_message, update_slack_message, send_error_notification,
+                                send_debug_info, StreamingSlackMessage)
+from utils.logger import log_context
+from utils.menu_parser import parse_menu, render_summary, render_sections, menu_fingerprint, DEFAULT_CONFIDENCE_THRESHOLD
+from utils.history import MenuHistory, fill_summary_template, DEFAULT_DB_PATH
+from utils.menu_diff import diff_menus, render_diff
+from utils.dish_lexicon import get_lexicon, DEFAULT_LEXICON_PATH
+from utils.circuit_breaker import circuit_states
+from utils.proxy_pool import proxy_stats
+from utils.ocr import ocr_available, ocr_images, DEFAULT_OCR_CACHE_DIR, DEFAULT_DOWNLOAD_TIMEOUT
+from utils.post_archive import archive_post_async
+from utils.prompts import (compact_prompt, build_prompt, SITUATION_INSTRUCTIONS, SITUATION_REPAIR_INSTRUCTIONS,
+                           SUMMARY_INSTRUCTIONS, SPECIAL_MENU_INSTRUCTIONS, SPECIAL_EVENT_INSTRUCTIONS,
+                           DEFAULT_PROMPT_TOKEN_BUDGET)
+from utils.situation import (SituationAnalysis, SituationParseError, SITUATION_SCHEMA, SITUATION_REPAIR_MAX_CHARS,
+                             SITUATION_REPAIR_TIMEOUT, parse_situation, repair_situation, record_parse_outcome)
+from utils.retry import RetryPolicy, run_with_retry, is_retryable, DEFAULT_STAGE_RETRIES
 from datetime import datetime
 import logging
-import re
+import sqlite3
+import time
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
-
-class FetchMenuNode(Node):
+class TimedNode(Node):
+    """
+    모든 노드의 공통 베이스
+    
+    - prep/exec/post 실행 시간을 shared["metrics"]에 기록
+    - exec 재시도를 utils.retry의 재시도 정책과 실행 마감 시간(shared["runtime"]["deadline"])으로 제어
+    - 노드마다 쓴 실행 예산을 deadline에 기록 (남은 시간이 적으면 노드가 더 싼 경로를 선택)
+    - 마지막 exec 실패 정보를 shared["status"]["node_errors"]에 기록
+    """
+    
+    def __init__(self, max_retries=1, wait=0, retry_policy=None):
+        super().__init__(max_retries=max_retries, wait=wait)
+        # 정책이 없으면 PocketFlow 방식(max_retries, 고정 wait)과 같은 정책 사용
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=max_retries, base_delay=wait, factor=1, max_delay=wait, jitter=0
+        )
+    
+    def _run(self, shared):
+        runtime = shared.get("runtime", {})
+        # 프로파일러가 연결되어 있으면 exec를 프로파일링 (main.py --profile)
+        self._profiler = runtime.get("profiler")
+        self._deadline = runtime.get("deadline")
+        self._last_error = None
+        node_name = type(self).__name__
+        started = time.perf_counter()
+        with log_context(node=node_name):
+            try:
+                return super()._run(shared)
+            finally:
+                elapsed = time.perf_counter() - started
+                timing = {"node": node_name, "seconds": elapsed}
+                if self._deadline is not None:
+                    self._deadline.record_stage(node_name, elapsed)
+                    timing["budget_remaining"] = self._deadline.remaining()
+                metrics = shared.setdefault("metrics", {})
+                metrics.setdefault("node_timings", []).append(timing)
+                if self._last_error is not None:
+                    shared["status"].setdefault("node_errors", {})[node_name] = {
+                        "error": str(self._last_error),
+                        "retryable": is_retryable(self._last_error)
+                    }
+                budget = (f", 남은 예산 {timing['budget_remaining']:.1f}초"
+                          if "budget_remaining" in timing else "")
+                logging.info(f"⏱️ {node_name} 완료 ({elapsed * 1000:.1f}ms{budget})",
+                             extra={"duration_ms": round(elapsed * 1000, 3)})
+    
+    def budget_short(self, shared, path):
+        """
+        실행 예산이 부족해서 더 싼 경로를 써야 하면 True를 반환하고 status["cheap_paths"]에 기록합니다.
+        
+        Args:
+            path (str): utils.retry.CHEAP_PATH_BUDGETS의 키 ("selenium", "llm")
+        """
+        deadline = shared.get("runtime", {}).get("deadline")
+        if deadline is None or not deadline.short(path):
+            return False
+        node_name = type(self).__name__
+        logging.warning(f"⏰ 남은 예산 {deadline.remaining():.1f}초: {node_name}가 {path} 대신 더 싼 경로를 사용합니다")
+        shared["status"].setdefault("cheap_paths", []).append(f"{node_name}:{path}")
+        return True
+    
+    def call_timeout(self, shared, default):
+        """남은 실행 예산에 맞춘 외부 호출 타임아웃(초)"""
+        deadline = shared.get("runtime", {}).get("deadline")
+        return deadline.timeout(default) if deadline is not None else default
+    
+    def compact_prompt(self, shared, instructions, content, context=None):
+        """
+        포스트 내용을 줄여서 LLM 프롬프트를 만들고 줄이기 전/후 추정 토큰 수를 metrics["prompt_tokens"]에 기록합니다.
+        """
+        node_name = type(self).__name__
+        budget = shared["config"].get("prompt_token_budget", DEFAULT_PROMPT_TOKEN_BUDGET)
+        prompt, stats = compact_prompt(instructions, content, budget, context, node_name)
+        shared.setdefault("metrics", {}).setdefault("prompt_tokens", []).append(dict(stats, node=node_name))
+        return prompt
+    
+    def _exec(self, prep_res):
+        profiler = getattr(self, "_profiler", None)
+        if profiler is None:
+            return self._exec_with_retry(prep_res)
+        return profiler.profile(type(self).__name__, self._exec_with_retry, prep_res)
+    
+    def _exec_with_retry(self, prep_res):
+        """재시도 정책에 따라 exec를 실행하고, 끝내 실패하면 exec_fallback으로 넘깁니다"""
+        try:
+            return run_with_retry(
+                self.exec, prep_res, self.retry_policy,
+                deadline=getattr(self, "_deadline", None),
+                label=type(self).__name__
+            )
+        except Exception as e:
+            self._last_error = e
+            return self.exec_fallback(prep_res, e)
+
+class FetchMenuNode(TimedNode):
     """인스타그램에서 최신 메뉴 포스트를 수집하는 노드"""
     
     def prep(self, shared):
-        """Instagram URL을 shared store에서 가져옵니다"""
+        """Instagram URL과 남은 예산에 맞춘 스크래핑 방식을 준비합니다"""
         instagram_url = shared["config"]["instagram_url"]
         logging.info(f"📱 인스타그램 URL 준비: {instagram_url}")
-        return instagram_url
+        # 예산이 부족하면 Chromium 없이 HTTP 요청만, 타임아웃도 남은 시간에 맞춤
+        return instagram_url, self.budget_short(shared, "selenium"), self.call_timeout(shared, 15)
     
-    def exec(self, instagram_url):
-        """Instagram에서 메뉴 정보를 스크래핑합니다"""
+    def exec(self, inputs):
+        """Instagram 최근 포스트 중 오늘 메뉴 포스트를 스크래핑합니다"""
+        instagram_url, http_only, timeout = inputs
         logging.info("🕷️ 인스타그램 스크래핑 시작...")
-        menu_content = scrape_menu_from_instagram(instagram_url)
+        post = scrape_menu_post(instagram_url, http_only=http_only, timeout=timeout)
         
-        if not menu_content:
+        if not post["text"]:
             raise Exception("인스타그램에서 메뉴 정보를 가져올 수 없습니다")
             
-        logging.info(f"✅ 메뉴 정보 수집 완료 (길이: {len(menu_content)})")
-        return menu_content
+        logging.info(f"✅ 메뉴 정보 수집 완료 (길이: {len(post['text'])})")
+        return post
     
     def exec_fallback(self, prep_res, exc):
         """스크래핑 실패 시 fallback 메시지 반환"""
@@ -38,121 +148,236 @@ class FetchMenuNode(Node):
 
 🔗 https://www.instagram.com/sunaedong_buffet/
         """.strip()
-        return fallback_message
+        return {"text": fallback_message, "shortcode": None, "taken_at": None, "image_urls": [], "fallback": True}
     
     def post(self, shared, prep_res, exec_res):
         """수집된 메뉴 정보를 shared store에 저장"""
-        shared["menu_data"]["raw_content"] = exec_res
-        shared["status"]["fetch_success"] = bool(exec_res and len(exec_res) > 20)
+        # 가져온 원본 페이지는 shared store에 두지 않고 아카이브로만 보냄 (백그라운드 스레드에서 압축/기록)
+        pages = exec_res.pop("pages", None)
+        archive_dir = shared["config"].get("archive_dir")
+        if pages and archive_dir:
+            archive_post_async(archive_dir, {
+                "post_id": exec_res.get("shortcode"),
+                "fetched_at": time.time(),
+                "instagram_url": prep_res[0],
+                "caption": None if exec_res.get("fallback") else exec_res["text"],
+                "taken_at": exec_res.get("taken_at"),
+                "image_urls": exec_res.get("image_urls") or [],
+                "pages": pages
+            })
+        content = exec_res["text"]
+        shared["menu_data"]["raw_content"] = content
+        if exec_res.get("shortcode"):
+            shared["menu_data"]["post_id"] = exec_res["shortcode"]
+            shared["menu_data"]["post_taken_at"] = exec_res.get("taken_at")
+        # 이미지 속 메뉴는 OCRMenuNode에서 읽음
+        shared["menu_data"]["image_urls"] = exec_res.get("image_urls") or []
+        shared["menu_data"]["caption_missing"] = bool(exec_res.get("fallback"))
+        shared["status"]["fetch_success"] = bool(content and len(content) > 20)
+        # 차단되어 건너뛴 스크래핑 방식이 있으면 기록 (디버그 메시지/실행 기록 확인용)
+        open_circuits = {name: state for name, state in circuit_states().items() if state["state"] != "closed"}
+        if open_circuits:
+            shared["status"]["scraper_circuits"] = open_circuits
+        proxies = proxy_stats()
+        if proxies:
+            shared["status"]["proxy_stats"] = proxies
         shared["status"]["last_run"] = datetime.now().isoformat()
         
         if not shared["status"]["fetch_success"]:
-            shared["status"]["error_log"].append(f"메뉴 수집 실패: 내용이 너무 짧음 ({len(exec_res)} 글자)")
+            shared["status"]["error_log"].append(f"메뉴 수집 실패: 내용이 너무 짧음 ({len(content)} 글자)")
         
         logging.info(f"💾 메뉴 데이터 저장 완료 (성공: {shared['status']['fetch_success']})")
         return "default"
 
-class SpecialSituationDetectorNode(Node):
+class OCRMenuNode(TimedNode):
+    """
+    캡션 없이 이미지로만 올라온 메뉴를 OCR로 읽는 노드 (선택 단계)
+    
+    config["ocr_enabled"]가 켜져 있고 pytesseract/tesseract가 설치되어 있을 때,
+    캡션이 없거나 캡션에서 파싱된 메뉴가 너무 적은 경우에만 실행합니다.
+    """
+    
+    MIN_CAPTION_DISHES = 3
+    
+    def prep(self, shared):
+        """OCR이 필요한지 판단하고 이미지 URL과 캐시 경로를 준비합니다"""
+        config = shared["config"]
+        menu_data = shared["menu_data"]
+        image_urls = menu_data.get("image_urls") or []
+        if not config.get("ocr_enabled") or not image_urls:
+            return None
+        
+        caption_missing = menu_data.get("caption_missing", False)
+        if not caption_missing:
+            dishes = parse_menu(menu_data["raw_content"]).dishes()
+            if len(dishes) >= self.MIN_CAPTION_DISHES:
+                logging.info(f"🖼️ 캡션에서 메뉴 {len(dishes)}개를 찾아 OCR 생략")
+                return None
+        
+        if not ocr_available():
+            logging.warning("⚠️ pytesseract/tesseract가 없어 OCR을 건너뜁니다")
+            return None
+        
+        # 예산이 부족하면 이미지 다운로드/인식 없이 캡션만으로 진행
+        if self.budget_short(shared, "ocr"):
+            return None
+        
+        logging.info(f"🖼️ 이미지 {len(image_urls)}장 OCR 준비 (캡션 없음: {caption_missing})")
+        return (image_urls, config.get("ocr_cache_dir", DEFAULT_OCR_CACHE_DIR), caption_missing,
+                self.call_timeout(shared, DEFAULT_DOWNLOAD_TIMEOUT))
+    
+    def exec(self, inputs):
+        """이미지를 내려받아 텍스트를 인식합니다"""
+        if inputs is None:
+            return None
+        image_urls, cache_dir, _, timeout = inputs
+        result = ocr_images(image_urls, cache_dir=cache_dir, timeout=timeout)
+        logging.info(f"✅ OCR 완료: 이미지 {result['images']}장 중 {result['recognized']}장 인식 "
+                     f"(캐시 {result['cache_hits']}장)")
+        return result
+    
+    def exec_fallback(self, prep_res, exc):
+        """OCR 실패 시 캡션만으로 계속 진행"""
+        logging.warning(f"⚠️ 이미지 OCR 실패, 캡션만 사용합니다: {exc}")
+        return None
+    
+    def post(self, shared, prep_res, exec_res):
+        """인식한 텍스트를 raw_content에 반영"""
+        if not exec_res or not exec_res["text"]:
+            return "default"
+        
+        caption_missing = prep_res[2]
+        menu_data = shared["menu_data"]
+        if caption_missing:
+            menu_data["raw_content"] = exec_res["text"]
+        else:
+            menu_data["raw_content"] = f"{menu_data['raw_content']}\n\n[이미지 텍스트]\n{exec_res['text']}"
+        shared["status"]["fetch_success"] = len(menu_data["raw_content"]) > 20
+        shared["status"]["ocr"] = {
+            "images": exec_res["images"],
+            "recognized": exec_res["recognized"],
+            "cache_hits": exec_res["cache_hits"],
+            "replaced_caption": caption_missing
+        }
+        logging.info(f"💾 OCR 텍스트 반영 완료 (길이: {len(exec_res['text'])})")
+        return "default"
+
+# 예산이 부족할 때 LLM 대신 쓰는 특수 상황 키워드 (감지 프롬프트의 키워드와 같음)
+SITUATION_KEYWORDS = [
+    ("holiday", "holiday_notice", ["휴무", "휴점", "쉬는날", "영업안함", "문닫음", "영업중단"]),
+    ("special_menu", "special_notice", ["특별메뉴", "이벤트", "한정메뉴", "시즌메뉴"])
+]
+
+def detect_situation_by_keywords(raw_content):
+    """
+    LLM 없이 키워드만으로 특수 상황을 감지합니다. (실행 예산이 부족할 때)
+    
+    Returns:
+        dict: LLM 분석 결과와 같은 형식
+    """
+    compact = "".join(raw_content.split())
+    for situation_type, action, keywords in SITUATION_KEYWORDS:
+        detected = [keyword for keyword in keywords if keyword in compact]
+        if detected:
+            return {
+                "situation_type": situation_type,
+                "confidence": 0.6,
+                "detected_keywords": detected,
+                "summary": f"키워드 감지: {', '.join(detected)}",
+                "action_required": action
+            }
+    return {
+        "situation_type": "normal",
+        "confidence": 0.6,
+        "detected_keywords": [],
+        "summary": "특수 상황 키워드 없음 (키워드 감지)",
+        "action_required": "normal"
+    }
+
+class SpecialSituationDetectorNode(TimedNode):
     """특수 상황(휴무일, 영업 중단 등)을 감지하는 노드"""
     
     def prep(self, shared):
-        """수집된 메뉴 정보를 가져옵니다"""
+        """수집된 메뉴 정보와 남은 예산을 가져옵니다"""
         raw_content = shared["menu_data"]["raw_content"]
         logging.info(f"🔍 특수 상황 감지 시작 (내용 길이: {len(raw_content)})")
-        return raw_content
+        keywords_only = self.budget_short(shared, "llm")
+        prompt = None
+        if raw_content and not keywords_only:
+            prompt = self.compact_prompt(shared, SITUATION_INSTRUCTIONS, raw_content)
+        return raw_content, keywords_only, self.call_timeout(shared, 30), prompt
     
-    def exec(self, raw_content):
-        """LLM을 사용하여 특수 상황을 감지합니다"""
+    def exec(self, inputs):
+        """LLM을 사용하여 특수 상황을 감지합니다 (예산이 부족하면 키워드로 감지)"""
+        raw_content, keywords_only, timeout, prompt = inputs
         if not raw_content:
             raise Exception("분석할 내용이 없습니다")
-        
-        prompt = f"""
-다음은 한식뷔페 인스타그램 포스트에서 가져온 내용입니다.
-이 내용을 분석하여 특수 상황(휴무일, 영업 중단, 특별 메뉴 등)이 있는지 판단해주세요.
-
-원본 내용:
-{raw_content}
-
-분석 요구사항:
-1. 휴무일 관련 키워드: "휴무", "휴점", "쉬는날", "영업안함", "문닫음", "오늘휴무"
-2. 영업 중단 관련: "영업중단", "임시휴무", "특별휴무", "정기휴무"
-3. 특별 메뉴 관련: "특별메뉴", "이벤트", "한정메뉴", "시즌메뉴"
-4. 영업시간 변경: "영업시간변경", "시간조정", "오늘만"
-
-분석 결과를 다음 JSON 형식으로 반환해주세요:
-```json
-{{
-    "situation_type": "normal|holiday|special_menu|business_hours_change|error",
-    "confidence": 0.0-1.0,
-    "detected_keywords": ["키워드1", "키워드2"],
-    "summary": "상황 요약",
-    "action_required": "normal|holiday_notice|special_notice|error_notice"
-}}
-```
-
-situation_type 설명:
-- normal: 정상 영업, 일반 메뉴
-- holiday: 휴무일 또는 영업 중단
-- special_menu: 특별 메뉴 또는 이벤트
-- business_hours_change: 영업시간 변경
-- error: 분석 불가능한 상황
-
-action_required 설명:
-- normal: 일반 메뉴 요약 진행
-- holiday_notice: 휴무일 알림 전송
-- special_notice: 특별 메뉴 알림 전송
-- error_notice: 오류 상황 알림 전송
-"""
+        if keywords_only:
+            return detect_situation_by_keywords(raw_content)
         
         logging.info("🤖 특수 상황 분석 시작...")
-        analysis_result = call_llm(prompt)
+        # 스키마를 지정해서 JSON 객체 하나만 받음 (코드 블록이나 설명이 섞이지 않게)
+        reply = call_llm(prompt, timeout=timeout, response_schema=SITUATION_SCHEMA)
         
-        # JSON 파싱 시도
+        outcome = "ok"
         try:
-            import json
-            # JSON 부분만 추출
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', analysis_result, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group(1))
-            else:
-                # JSON 블록이 없으면 전체를 파싱 시도
-                result = json.loads(analysis_result)
-        except:
-            # 파싱 실패 시 기본값
-            result = {
-                "situation_type": "normal",
-                "confidence": 0.5,
-                "detected_keywords": [],
-                "summary": "분석 실패로 인해 정상 영업으로 간주",
-                "action_required": "normal"
-            }
-        
+            analysis = parse_situation(reply)
+        except SituationParseError as e:
+            logging.warning(f"⚠️ 특수 상황 응답 파싱 실패: {e}")
+            analysis, outcome = self._repair(reply, e, raw_content, timeout)
+        record_parse_outcome(outcome)
+        
+        result = analysis.to_dict()
+        result["parse"] = outcome
         logging.info(f"✅ 특수 상황 분석 완료: {result['situation_type']} (신뢰도: {result['confidence']})")
         return result
     
+    def _repair(self, reply, error, raw_content, timeout):
+        """
+        읽지 못한 응답을 싼 방법부터 고칩니다.
+        
+        1. 코드 펜스, 끝 쉼표 등을 로컬에서 고쳐서 다시 파싱
+        2. 원본 포스트 없이 응답만 넘겨 LLM에 JSON으로 다시 써 달라고 한 번 요청
+        3. 그래도 안 되면 정상 영업으로 단정하지 않고 키워드 감지 결과 사용
+        
+        Returns:
+            tuple: (SituationAnalysis, "repaired" | "llm_repaired" | "failed")
+        """
+        try:
+            return repair_situation(reply), "repaired"
+        except SituationParseError:
+            pass
+        
+        try:
+            prompt = build_prompt(SITUATION_REPAIR_INSTRUCTIONS, (reply or "")[:SITUATION_REPAIR_MAX_CHARS],
+                                  context=f"파싱 오류: {error}", label="응답")
+            repaired = call_llm(prompt, timeout=min(timeout, SITUATION_REPAIR_TIMEOUT),
+                                response_schema=SITUATION_SCHEMA)
+            return repair_situation(repaired), "llm_repaired"
+        except Exception as e:
+            logging.warning(f"⚠️ 특수 상황 응답 수선 실패, 키워드로 감지합니다: {e}")
+        return SituationAnalysis.from_dict(detect_situation_by_keywords(raw_content)), "failed"
+    
     def exec_fallback(self, prep_res, exc):
-        """분석 실패 시 기본값 반환"""
+        """분석 실패 시 키워드 감지 결과 반환 (휴무일 포스트를 정상 영업으로 보내지 않도록)"""
         logging.warning(f"⚠️ 특수 상황 분석 실패: {exc}")
         
-        fallback_result = {
-            "situation_type": "normal",
-            "confidence": 0.3,
-            "detected_keywords": [],
-            "summary": "분석 실패로 인해 정상 영업으로 간주",
-            "action_required": "normal"
-        }
-        
+        fallback_result = detect_situation_by_keywords(prep_res[0] or "")
+        fallback_result["confidence"] = min(fallback_result["confidence"], 0.3)
         return fallback_result
     
     def post(self, shared, prep_res, exec_res):
         """분석 결과를 shared store에 저장"""
+        parse_outcome = exec_res.pop("parse", None)
+        if parse_outcome:
+            shared["status"]["situation_parse"] = parse_outcome
         shared["menu_data"]["situation_analysis"] = exec_res
         shared["status"]["situation_detected"] = exec_res["situation_type"] != "normal"
         
         logging.info(f"💾 특수 상황 분석 저장: {exec_res['situation_type']} -> {exec_res['action_required']}")
         return exec_res["action_required"]
 
-class HolidayNoticeNode(Node):
+class HolidayNoticeNode(TimedNode):
     """휴무일 알림을 전송하는 노드"""
     
     def prep(self, shared):
@@ -161,11 +386,13 @@ class HolidayNoticeNode(Node):
         channel = shared["config"]["slack_channel"]
         
         logging.info(f"🏖️ 휴무일 알림 준비: {analysis['situation_type']}")
-        return analysis, channel
+        # 예산이 부족하면 LLM 없이 기본 알림 문구로 전송
+        use_llm = not self.budget_short(shared, "llm")
+        return analysis, channel, use_llm, self.call_timeout(shared, 30)
     
     def exec(self, inputs):
         """휴무일 알림 메시지를 생성합니다"""
-        analysis, channel = inputs
+        analysis, channel, use_llm, timeout = inputs
         
         # LLM을 사용하여 휴무일 알림 메시지 생성
         prompt = f"""
@@ -193,11 +420,13 @@ class HolidayNoticeNode(Node):
 감사합니다! 🍽️
 """
         
-        logging.info("📝 휴무일 알림 메시지 생성...")
-        holiday_message = call_llm(prompt)
+        holiday_message = None
+        if use_llm:
+            logging.info("📝 휴무일 알림 메시지 생성...")
+            holiday_message = call_llm(prompt, timeout=timeout)
         
         if not holiday_message:
-            # LLM 실패 시 기본 메시지
+            # LLM 실패 또는 예산 부족 시 기본 메시지
             holiday_message = f"""
 🏖️ **오늘은 휴무일입니다**
 
@@ -221,7 +450,7 @@ class HolidayNoticeNode(Node):
         logging.warning(f"⚠️ 휴무일 알림 실패: {exc}")
         
         try:
-            analysis, channel = prep_res
+            analysis, channel = prep_res[:2]
             fallback_message = f"""
 🏖️ **오늘은 휴무일입니다**
 
@@ -244,7 +473,7 @@ class HolidayNoticeNode(Node):
         logging.info("💾 휴무일 알림 완료")
         return "success"
 
-class SpecialMenuNode(Node):
+class SpecialMenuNode(TimedNode):
     """특별 메뉴 알림을 전송하는 노드"""
     
     def prep(self, shared):
@@ -252,46 +481,68 @@ class SpecialMenuNode(Node):
         analysis = shared["menu_data"]["situation_analysis"]
         raw_content = shared["menu_data"]["raw_content"]
         channel = shared["config"]["slack_channel"]
+        lexicon = get_lexicon(shared["config"].get("lexicon_path", DEFAULT_LEXICON_PATH))
+        parsed = parse_menu(raw_content, lexicon)
         
         logging.info(f"🎉 특별 메뉴 알림 준비: {analysis['situation_type']}")
-        return analysis, raw_content, channel
+        items = parsed.items()
+        known = [item for category, item in items if category != "기타"]
+        context = f"상황 분석: {analysis['summary']}"
+        use_menu = bool(known) and len(known) * 2 >= len(items)
+        if self.budget_short(shared, "llm"):
+            # 예산이 부족하면 LLM 없이 기본 문구로 전송
+            prompt = None
+        elif use_menu:
+            # 메뉴 구성은 사전으로 직접 정리하고 LLM에는 사전에 없는 줄(이벤트 정보)만 넘김
+            event_info = "\n".join(parsed.unparsed_lines)
+            if parsed.price:
+                event_info += f"\n가격: {parsed.price}"
+            prompt = self.compact_prompt(shared, SPECIAL_EVENT_INSTRUCTIONS, event_info, context=context)
+        else:
+            # 사전으로 메뉴 구성을 정리할 수 없으면 원본 내용 전체를 LLM에 넘김
+            prompt = self.compact_prompt(shared, SPECIAL_MENU_INSTRUCTIONS, raw_content, context=context)
+        return analysis, raw_content, channel, parsed, prompt, use_menu, self.call_timeout(shared, 30)
     
     def exec(self, inputs):
         """특별 메뉴 알림 메시지를 생성합니다"""
-        analysis, raw_content, channel = inputs
+        analysis, raw_content, channel, parsed, prompt, use_menu, timeout = inputs
         
-        # LLM을 사용하여 특별 메뉴 요약
-        prompt = f"""
-다음은 한식뷔페의 특별 메뉴 정보입니다:
-
-상황 분석: {analysis['summary']}
-원본 내용: {raw_content}
-
-이 정보를 바탕으로 특별 메뉴 알림을 작성해주세요.
-
-요구사항:
-1. 특별 메뉴의 특징을 강조
-2. 메뉴 내용을 구조화하여 정리
-3. 이모지를 적절히 사용
-4. 특별한 이유나 이벤트 정보가 있다면 포함
-5. 300자 이내로 작성
+        if use_menu:
+            special_message = self._render_with_menu(analysis, parsed, prompt, timeout)
+        else:
+            special_message = self._render_with_llm(analysis, raw_content, prompt, timeout)
+        
+        # 슬랙으로 전송
+        success = send_slack_message(special_message, channel)
+        
+        if not success:
+            raise Exception("특별 메뉴 알림 전송에 실패했습니다")
+        
+        logging.info("✅ 특별 메뉴 알림 전송 완료")
+        return special_message
+    
+    def _render_with_menu(self, analysis, parsed, prompt, timeout):
+        """분류된 메뉴 구성에 LLM이 쓴 짧은 이벤트 소개를 붙입니다"""
+        logging.info(f"📝 특별 이벤트 소개 생성 (메뉴 {len(parsed.dishes())}개는 사전으로 분류)...")
+        intro = (call_llm(prompt, timeout=timeout) if prompt else None) or f"📋 특별 메뉴 정보: {analysis['summary']}"
+        menu_lines = "\n".join(render_sections(parsed))
+        
+        return f"""🎉 **오늘의 특별 메뉴** 🎉
 
-형식:
-🎉 **오늘의 특별 메뉴** 🎉
+{intro.strip()}
 
-📋 특별 메뉴 정보: [상세 내용]
-🍽️ 메뉴 구성: [구조화된 메뉴]
-🎊 특별 이벤트: [있다면]
-ℹ️ 참고사항: [기타 정보]
+🍽️ 메뉴 구성
+{menu_lines}
 
-맛있게 드세요! 😋
-"""
-        
+맛있게 드세요! 😋"""
+    
+    def _render_with_llm(self, analysis, raw_content, prompt, timeout):
+        """원본 내용 전체를 LLM에 넘겨 특별 메뉴 알림을 작성합니다"""
         logging.info("📝 특별 메뉴 알림 메시지 생성...")
-        special_message = call_llm(prompt)
+        special_message = call_llm(prompt, timeout=timeout) if prompt else None
         
         if not special_message:
-            # LLM 실패 시 기본 메시지
+            # LLM 실패 또는 예산 부족 시 기본 메시지
             special_message = f"""
 🎉 **오늘의 특별 메뉴** 🎉
 
@@ -301,13 +552,6 @@ class SpecialMenuNode(Node):
 맛있게 드세요! 😋
             """.strip()
         
-        # 슬랙으로 전송
-        success = send_slack_message(special_message, channel)
-        
-        if not success:
-            raise Exception("특별 메뉴 알림 전송에 실패했습니다")
-        
-        logging.info("✅ 특별 메뉴 알림 전송 완료")
         return special_message
     
     def exec_fallback(self, prep_res, exc):
@@ -315,7 +559,7 @@ class SpecialMenuNode(Node):
         logging.warning(f"⚠️ 특별 메뉴 알림 실패: {exc}")
         
         try:
-            analysis, raw_content, channel = prep_res
+            analysis, raw_content, channel = prep_res[:3]
             fallback_message = f"""
 🎉 **오늘의 특별 메뉴** 🎉
 
@@ -338,59 +582,83 @@ class SpecialMenuNode(Node):
         logging.info("💾 특별 메뉴 알림 완료")
         return "success"
 
-class SummarizeMenuNode(Node):
+class SummarizeMenuNode(TimedNode):
     """LLM을 사용하여 메뉴 정보를 요약하는 노드"""
     
     def prep(self, shared):
-        """수집된 메뉴 정보를 가져옵니다"""
+        """수집된 메뉴 정보를 가져오고 LLM 없이 파싱해봅니다"""
         raw_content = shared["menu_data"]["raw_content"]
-        logging.info(f"📝 요약할 메뉴 정보 준비 (길이: {len(raw_content)})")
-        return raw_content
+        lexicon = get_lexicon(shared["config"].get("lexicon_path", DEFAULT_LEXICON_PATH))
+        parsed = parse_menu(raw_content, lexicon)
+        min_confidence = shared["config"].get("parser_min_confidence", DEFAULT_CONFIDENCE_THRESHOLD)
+        
+        source, memo_summary, history = "llm", None, None
+        fingerprint = menu_fingerprint(parsed)
+        if parsed.confidence >= min_confidence:
+            source = "parser"
+        elif fingerprint and shared["config"].get("history_db"):
+            # 같은 메뉴 구성이 예전에 LLM으로 요약된 적이 있으면 날짜만 바꿔 재사용
+            try:
+                history = MenuHistory(shared["config"]["history_db"])
+                template = history.lookup_summary(fingerprint)
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ 요약 메모 조회 실패: {e}")
+                history, template = None, None
+            if template:
+                today = datetime.now()
+                memo_summary = fill_summary_template(template, parsed.date_text or f"{today.month}월 {today.day}일")
+                source = "memo"
+        # 메모를 실제로 조회한 실행만 적중률 메트릭에 반영 (조회 안 했으면 None)
+        shared["status"]["summary_memo_lookup"] = None if history is None else ("hit" if source == "memo" else "miss")
+        # 예산이 부족하면 신뢰도가 낮아도 LLM 대신 템플릿으로 요약
+        if source == "llm" and parsed.dishes() and self.budget_short(shared, "llm"):
+            source = "parser"
+        
+        # 스트리밍 모드면 LLM 응답을 받는 대로 채널에 보여줌 (diff 전송은 완성된 요약이 있어야 해서 제외)
+        stream_channel = None
+        if (source == "llm" and shared["config"].get("stream_summary")
+                and shared["config"].get("delivery_mode", "full") == "full"):
+            stream_channel = shared["config"]["slack_channel"]
+        
+        logging.info(f"📝 요약할 메뉴 정보 준비 (길이: {len(raw_content)}, 파싱 신뢰도: {parsed.confidence}, "
+                     f"요약 방식: {source}{', 스트리밍' if stream_channel else ''})")
+        return {
+            "raw_content": raw_content,
+            "parsed": parsed,
+            "source": source,
+            "memo_summary": memo_summary,
+            "fingerprint": fingerprint,
+            "history": history,
+            "lexicon": lexicon,
+            "timeout": self.call_timeout(shared, 60),
+            "prompt": self.compact_prompt(shared, SUMMARY_INSTRUCTIONS, raw_content)
+                      if source == "llm" and raw_content else None,
+            "stream_channel": stream_channel,
+            # 단계 재시도 때는 이미 보낸 스트리밍 메시지를 이어서 고침
+            "streamed_ts": shared["status"].get("streamed_ts"),
+            "streamed_channel": shared["status"].get("streamed_channel"),
+            "first_visible": None,
+            "fallback": False  # exec_fallback이 만든 대체 문구면 True (성공으로 치지 않고 메모/사전에 남기지 않음)
+        }
     
-    def exec(self, raw_content):
-        """LLM을 사용하여 메뉴를 요약합니다"""
+    def exec(self, inputs):
+        """구조화된 캡션은 파싱 결과로, 자유 형식 포스트는 LLM으로 메뉴를 요약합니다"""
+        raw_content = inputs["raw_content"]
         if not raw_content:
             raise Exception("요약할 메뉴 내용이 없습니다")
         
-        prompt = f"""
-다음은 한식뷔페 인스타그램 포스트에서 가져온 메뉴 정보입니다.
-이 내용을 읽기 쉽고 구조화된 형태로 요약해주세요.
-
-원본 내용:
-{raw_content}
-
-요약 요구사항:
-1. 한국어로 작성
-2. 메뉴를 카테고리별로 정리 (주요리, 밑반찬, 국물류, 후식 등)
-3. 이모지를 적절히 사용하여 보기 좋게 작성
-4. 없는 메뉴는 추가하지 마세요
-5. 영업시간이나 기타 정보가 있다면 포함
-
-아래 형식으로 작성해주세요:
-
-🍽️ **오늘의 메뉴**
-
-**🥩 주요리**
-- 메뉴1
-- 메뉴2
-
-**🥬 밑반찬**
-- 반찬1
-- 반찬2
-
-**🍲 국물류**
-- 국물요리1
-
-**🍰 후식**
-- 후식류
-
-**ℹ️ 기타정보**
-- 영업시간: (있다면)
-- 특이사항: (있다면)
-"""
+        if inputs["source"] == "parser":
+            logging.info("⚡ 파싱 신뢰도가 높아 LLM 호출 없이 요약합니다")
+            return render_summary(inputs["parsed"])
+        if inputs["source"] == "memo":
+            logging.info("♻️ 같은 메뉴 구성의 이전 요약을 재사용합니다")
+            return inputs["memo_summary"]
         
         logging.info("🤖 LLM 요약 시작...")
-        summary = call_llm(prompt)
+        if inputs["stream_channel"]:
+            summary = self._stream_summary(inputs)
+        else:
+            summary = call_llm(inputs["prompt"], timeout=inputs["timeout"])
         
         if not summary:
             raise Exception("LLM 요약 결과가 비어있습니다")
@@ -398,16 +666,40 @@ class SummarizeMenuNode(Node):
         logging.info("✅ 메뉴 요약 완료")
         return summary
     
+    def _stream_summary(self, inputs):
+        """
+        LLM 응답을 스트리밍으로 받으면서 슬랙 메시지 하나를 고쳐 씁니다.
+        
+        첫 조각은 바로 전송하고 이후 섹션(주요리, 밑반찬, ...)이 완성될 때마다 몰아서 chat.update 합니다.
+        완성된 요약으로 마지막 수정은 SendSlackNode가 합니다.
+        """
+        message = StreamingSlackMessage(inputs["stream_channel"], ts=inputs["streamed_ts"])
+        if inputs["streamed_channel"]:
+            message.channel_id = inputs["streamed_channel"]
+        try:
+            for chunk in stream_llm(inputs["prompt"], timeout=inputs["timeout"]):
+                message.append(chunk)
+        finally:
+            # 중간에 실패해도 보낸 메시지는 재시도/전송 단계에서 이어서 고치도록 남김
+            inputs["streamed_ts"] = message.ts
+            inputs["streamed_channel"] = message.channel_id
+            if inputs["first_visible"] is None:
+                inputs["first_visible"] = message.first_visible
+        logging.info(f"📡 스트리밍 요약 완료 (수정 {message.updates}회)")
+        return message.text.strip()
+    
     def exec_fallback(self, prep_res, exc):
         """요약 실패 시 원본 텍스트를 간단히 정리하여 반환"""
         logging.warning(f"⚠️ LLM 요약 실패: {exc}")
+        prep_res["fallback"] = True
         
-        if prep_res:
+        raw_content = prep_res["raw_content"]
+        if raw_content:
             fallback_summary = f"""
 🍽️ **오늘의 메뉴** (자동 요약 실패)
 
 📝 원본 정보:
-{prep_res[:500]}{'...' if len(prep_res) > 500 else ''}
+{raw_content[:500]}{'...' if len(raw_content) > 500 else ''}
 
 ⚠️ 자동 요약에 실패했습니다. 위 원본 정보를 참고해주세요.
             """.strip()
@@ -417,49 +709,128 @@ class SummarizeMenuNode(Node):
         return fallback_summary
     
     def post(self, shared, prep_res, exec_res):
-        """요약된 메뉴를 shared store에 저장"""
+        """요약된 메뉴와 파싱 결과를 shared store에 저장"""
         shared["menu_data"]["summary"] = exec_res
-        shared["status"]["summarize_success"] = bool(exec_res and "메뉴" in exec_res)
+        shared["menu_data"]["extracted_menu"] = prep_res["parsed"].to_dict()
+        shared["status"]["summary_source"] = prep_res["source"]
+        shared["status"]["summarize_success"] = bool(exec_res and "메뉴" in exec_res) and not prep_res["fallback"]
+        if prep_res["streamed_ts"]:
+            shared["status"]["streamed_ts"] = prep_res["streamed_ts"]
+            shared["status"]["streamed_channel"] = prep_res["streamed_channel"]
+            if prep_res["first_visible"] is not None:
+                shared.setdefault("metrics", {})["first_visible_seconds"] = round(prep_res["first_visible"], 3)
         
         if not shared["status"]["summarize_success"]:
-            shared["status"]["error_log"].append("메뉴 요약 실패: 유효하지 않은 요약 결과")
+            reason = "자동 요약 대신 원본 정보를 전송" if prep_res["fallback"] else "유효하지 않은 요약 결과"
+            shared["status"]["error_log"].append(f"메뉴 요약 실패: {reason}")
+        else:
+            # 섹션 제목이 있는 캡션과 LLM 분류 결과로 메뉴 사전을 넓혀 다음 실행의 LLM 호출을 줄임
+            lexicon = prep_res["lexicon"]
+            if prep_res["source"] == "parser":
+                learned = lexicon.learn_menu(prep_res["parsed"])
+            else:
+                learned = lexicon.learn_from_summary(exec_res)
+            if learned:
+                logging.info(f"📚 메뉴 사전에 {learned}개 메뉴 학습")
+                try:
+                    lexicon.save()
+                except OSError as e:
+                    logging.warning(f"⚠️ 메뉴 사전 저장 실패: {e}")
+        
+        history = prep_res["history"]
+        if history is not None:
+            try:
+                history.record_summary_lookup(prep_res["fingerprint"], prep_res["source"] == "memo")
+                if prep_res["source"] == "llm" and shared["status"]["summarize_success"]:
+                    history.store_summary(prep_res["fingerprint"], exec_res)
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ 요약 메모 저장 실패: {e}")
         
         logging.info(f"💾 메뉴 요약 저장 완료 (성공: {shared['status']['summarize_success']})")
         return "default"
 
-class SendSlackNode(Node):
+class SendSlackNode(TimedNode):
     """요약된 메뉴를 슬랙으로 전송하는 노드"""
     
     def prep(self, shared):
-        """전송할 메뉴 요약과 채널 정보를 가져옵니다"""
+        """전송할 메시지와 채널 정보를 준비합니다 (diff 모드면 이전 실행과 비교)"""
         summary = shared["menu_data"]["summary"]
         channel = shared["config"]["slack_channel"]
+        delivery = {"kind": "full", "text": summary, "thread_ts": None, "pin": False, "week": None}
+        
+        streamed_ts = shared["status"].get("streamed_ts")
+        if streamed_ts and shared["config"].get("delivery_mode", "full") == "full":
+            # 요약하면서 스트리밍으로 보낸 메시지를 완성된 요약으로 고침
+            delivery = dict(delivery, kind="streamed", update_ts=streamed_ts,
+                            channel_id=shared["status"]["streamed_channel"])
+        elif shared["config"].get("delivery_mode") == "diff" and summary:
+            try:
+                delivery = self._prepare_diff(shared, summary, channel) or delivery
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ 이전 실행 기록을 읽지 못해 전체 메뉴를 전송합니다: {e}")
         
-        logging.info(f"📤 슬랙 전송 준비: {channel}")
-        return summary, channel
+        logging.info(f"📤 슬랙 전송 준비: {channel} ({delivery['kind']})")
+        return delivery, channel
+    
+    def _prepare_diff(self, shared, summary, channel):
+        """
+        이전 실행의 메뉴와 비교한 전송 계획을 만듭니다.
+        
+        diff_thread가 켜져 있으면 주마다 첫 실행에 전체 메뉴를 고정 메시지로 보내고,
+        이후에는 그 스레드에 차이만 답글로 답니다. 비교할 기록이 없으면 None.
+        """
+        history = MenuHistory(shared["config"].get("history_db", DEFAULT_DB_PATH))
+        today = datetime.now()
+        
+        if shared["config"].get("diff_thread", True):
+            iso = today.isocalendar()
+            week = f"{iso[0]}-W{iso[1]:02d}"
+            anchor_ts = history.weekly_post(week, channel)
+            if anchor_ts is None:
+                return {"kind": "weekly_full", "text": summary, "thread_ts": None, "pin": True, "week": week}
+        else:
+            anchor_ts = None
+        
+        previous = history.previous_menu(today.date().isoformat())
+        lexicon = get_lexicon(shared["config"].get("lexicon_path", DEFAULT_LEXICON_PATH))
+        parsed = parse_menu(shared["menu_data"]["raw_content"], lexicon)
+        if previous is None or not parsed.dishes():
+            return None
+        
+        diff = diff_menus(parsed, parse_menu(previous["raw_caption"], lexicon))
+        shared["menu_data"]["menu_diff"] = diff.to_dict()
+        text = render_diff(diff, parsed.date_text or f"{today.month}월 {today.day}일", previous["run_date"])
+        return {"kind": "diff", "text": text, "thread_ts": anchor_ts, "pin": False, "week": None}
     
     def exec(self, inputs):
         """슬랙으로 메뉴 메시지를 전송합니다"""
-        summary, channel = inputs
+        delivery, channel = inputs
         
-        if not summary:
+        if not delivery["text"]:
             raise Exception("전송할 메뉴 요약이 없습니다")
         
+        if delivery["kind"] == "streamed":
+            logging.info("📨 스트리밍 메시지 마무리...")
+            if not update_slack_message(delivery["text"], delivery["channel_id"], delivery["update_ts"]):
+                raise Exception("스트리밍 메시지 수정에 실패했습니다")
+            logging.info("✅ 슬랙 메시지 전송 완료")
+            return delivery["update_ts"]
+        
         logging.info("📨 슬랙 메시지 전송 시작...")
-        success = send_slack_message(summary, channel)
+        ts = post_slack_message(delivery["text"], channel, thread_ts=delivery["thread_ts"], pin=delivery["pin"])
         
-        if not success:
+        if not ts:
             raise Exception("슬랙 메시지 전송에 실패했습니다")
             
         logging.info("✅ 슬랙 메시지 전송 완료")
-        return success
+        return ts
     
     def exec_fallback(self, prep_res, exc):
         """슬랙 전송 실패 시 에러 알림 전송 시도"""
         logging.warning(f"⚠️ 슬랙 전송 실패: {exc}")
         
         try:
-            summary, channel = prep_res
+            delivery, channel = prep_res
             error_msg = f"메뉴 알림 전송 실패: {str(exc)}"
             send_error_notification(error_msg, channel)
             return False
@@ -468,28 +839,65 @@ class SendSlackNode(Node):
     
     def post(self, shared, prep_res, exec_res):
         """전송 결과를 shared store에 저장"""
+        delivery, channel = prep_res
         shared["status"]["send_success"] = bool(exec_res)
+        shared["status"]["delivery"] = delivery["kind"]
         
         if not shared["status"]["send_success"]:
             shared["status"]["error_log"].append("슬랙 메시지 전송 실패")
+        elif delivery["week"]:
+            try:
+                MenuHistory(shared["config"].get("history_db", DEFAULT_DB_PATH)).set_weekly_post(
+                    delivery["week"], channel, exec_res)
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ 주간 메뉴 메시지 저장 실패: {e}")
         
         logging.info(f"💾 전송 상태 저장 완료 (성공: {shared['status']['send_success']})")
         return "default"
 
-class DebugCheckNode(Node):
-    """각 단계의 실행 상태를 확인하고 디버그 정보를 제공하는 노드"""
+class DebugCheckNode(TimedNode):
+    """
+    각 단계의 실행 상태를 확인하고 디버그 정보를 제공하는 노드
+    
+    stage가 주어지면 해당 단계의 성공 여부만 보고 다음 액션을 결정합니다.
+    단계 재시도는 max_stage_retries번까지만, 그리고 직전 노드의 오류가 재시도 가능하고
+    실행 마감 시간이 남아 있을 때만 허용되므로 "retry" 루프는 항상 끝납니다.
+    """
+    
+    # 단계 이름 -> (성공 여부 status 키, 단계를 실행하는 노드 이름)
+    STAGES = {
+        "fetch": ("fetch_success", "FetchMenuNode"),
+        "situation": (None, "SpecialSituationDetectorNode"),
+        "summarize": ("summarize_success", "SummarizeMenuNode"),
+        "send": ("send_success", "SendSlackNode")
+    }
+    
+    def __init__(self, stage=None, max_stage_retries=DEFAULT_STAGE_RETRIES, **kwargs):
+        super().__init__(**kwargs)
+        if stage is not None and stage not in self.STAGES:
+            raise ValueError(f"알 수 없는 단계: {stage}")
+        self.stage = stage
+        self.max_stage_retries = max_stage_retries
     
     def prep(self, shared):
         """현재 실행 상태 정보를 가져옵니다"""
         status = shared["status"]
         debug_mode = shared["config"].get("debug_mode", False)
+        deadline = shared.get("runtime", {}).get("deadline")
         
-        logging.info(f"🔍 디버그 체크 시작 (디버그 모드: {debug_mode})")
-        return status, debug_mode
+        logging.info(f"🔍 디버그 체크 시작 (단계: {self.stage or '전체'}, 디버그 모드: {debug_mode})")
+        return {
+            "status": status,
+            "debug_mode": debug_mode,
+            "situation_action": shared["menu_data"].get("situation_analysis", {}).get("action_required"),
+            "retries_used": status.get("stage_retries", {}).get(self.stage or "all", 0),
+            "deadline_expired": deadline.expired() if deadline else False
+        }
     
     def exec(self, inputs):
         """현재 상태를 분석하고 다음 액션을 결정합니다"""
-        status, debug_mode = inputs
+        status = inputs["status"]
+        debug_mode = inputs["debug_mode"]
         
         # 실행 상태 체크
         fetch_ok = status.get("fetch_success", False)
@@ -500,6 +908,7 @@ class DebugCheckNode(Node):
         all_success = fetch_ok and summarize_ok and send_ok
         
         debug_info = {
+            "stage": self.stage,
             "fetch_success": fetch_ok,
             "summarize_success": summarize_ok,
             "send_success": send_ok,
@@ -517,15 +926,31 @@ class DebugCheckNode(Node):
             except Exception as e:
                 logging.warning(f"디버그 정보 전송 실패: {e}")
         
+        # 현재 단계 성공 여부와 재시도 가능 여부
+        retryable = True
+        if self.stage is None:
+            stage_ok = all_success
+        else:
+            status_key, node_name = self.STAGES[self.stage]
+            if status_key is None:
+                stage_ok = bool(inputs["situation_action"])
+            else:
+                stage_ok = status.get(status_key, False)
+            node_error = status.get("node_errors", {}).get(node_name)
+            retryable = node_error is None or node_error["retryable"]
+        
         # 다음 액션 결정
-        if all_success:
-            action = "success"
-        elif status.get("error_log") and len(status["error_log"]) >= 3:
-            action = "fail"  # 너무 많은 에러 발생시 포기
+        if stage_ok:
+            # 상황 감지 단계는 감지된 상황에 맞는 액션으로 분기
+            action = inputs["situation_action"] if self.stage == "situation" else "success"
+        elif (retryable and not inputs["deadline_expired"]
+              and inputs["retries_used"] < self.max_stage_retries):
+            action = "retry"
         else:
-            action = "retry"  # 재시도 가능
+            action = "fail"
             
-        logging.info(f"🎯 디버그 결과: {action} (성공률: {sum([fetch_ok, summarize_ok, send_ok])}/3)")
+        logging.info(f"🎯 디버그 결과: {action} (성공률: {sum([fetch_ok, summarize_ok, send_ok])}/3, "
+                     f"단계 재시도: {inputs['retries_used']}/{self.max_stage_retries})")
         
         return {
             "action": action,
@@ -537,10 +962,15 @@ class DebugCheckNode(Node):
         action = exec_res["action"]
         debug_info = exec_res["debug_info"]
         
-        # 최종 상태 업데이트
+        if action == "retry":
+            stage_retries = shared["status"].setdefault("stage_retries", {})
+            stage_retries[self.stage or "all"] = stage_retries.get(self.stage or "all", 0) + 1
+        
+        # 최종 상태 업데이트 (중간 단계 체크는 최종 결과를 덮어쓰지 않음)
         shared["status"]["debug_info"] = debug_info
-        shared["status"]["final_success"] = debug_info["all_success"]
+        if self.stage in (None, "send"):
+            shared["status"]["final_success"] = debug_info["all_success"]
         
         logging.info(f"🏁 최종 결과: {action}")
         
-        return action
\ No newline at end of file
+        return action
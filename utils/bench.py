@@ -0,0 +1,542 @@
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils import call_llm as llm_module
+from utils import instagram_scraper
+from utils import post_archive
+from utils import slack_sender
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "fixtures")
+DEFAULT_RESULTS_DIR = "bench_results"
+
+class FakeLLM:
+    """
+    프롬프트 종류를 보고 그럴듯한 응답을 돌려주는 가짜 LLM 백엔드
+
+    상황 감지는 원본 내용의 키워드로 판단하고, 요약/알림은 원본 내용을 그대로 정리해서 반환합니다.
+    """
+
+    HOLIDAY_KEYWORDS = ["휴무", "휴점", "쉬는날", "영업안함", "문닫음"]
+    SPECIAL_KEYWORDS = ["특별메뉴", "특별 메뉴", "이벤트", "한정메뉴", "한정 특별", "시즌메뉴"]
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if "JSON 형식으로 반환" in prompt:
+            return self._situation(prompt)
+        if "휴무일 알림 메시지" in prompt:
+            return "🏖️ **오늘은 휴무일입니다**\n\n감사합니다! 🍽️"
+        if "특별 이벤트 소개만" in prompt:
+            return "🎊 오늘 하루만 특별 가격으로 만나보세요!"
+        if "특별 메뉴 알림" in prompt:
+            return "🎉 **오늘의 특별 메뉴** 🎉\n\n맛있게 드세요! 😋"
+        return self._summary(prompt)
+
+    def _source(self, prompt):
+        """프롬프트에서 원본 내용 부분만 잘라냅니다 (원본 내용은 프롬프트 맨 뒤)"""
+        match = re.search(r"원본 내용:\s*(.*)$", prompt, re.DOTALL)
+        return match.group(1) if match else prompt
+
+    def _situation(self, prompt):
+        source = self._source(prompt)
+        holiday = [k for k in self.HOLIDAY_KEYWORDS if k in source]
+        special = [k for k in self.SPECIAL_KEYWORDS if k in source]
+
+        if holiday:
+            situation, action, keywords = "holiday", "holiday_notice", holiday
+        elif special:
+            situation, action, keywords = "special_menu", "special_notice", special
+        else:
+            situation, action, keywords = "normal", "normal", []
+
+        result = {
+            "situation_type": situation,
+            "confidence": 0.9,
+            "detected_keywords": keywords,
+            "summary": f"가짜 LLM 판단: {situation}",
+            "action_required": action
+        }
+        # 실제 호출은 JSON 스키마 모드라서 코드 블록 없이 JSON만 돌려줌
+        return json.dumps(result, ensure_ascii=False)
+
+    def _summary(self, prompt):
+        lines = [line.strip() for line in self._source(prompt).splitlines()]
+        items = [line.lstrip("•-").strip() for line in lines if line.startswith(("•", "-"))]
+        return "🍽️ **오늘의 메뉴**\n\n" + "\n".join(f"- {item}" for item in items)
+
+class CachedLLM:
+    """
+    프롬프트 해시로 실제 LLM 응답을 기록/재생하는 백엔드
+
+    캐시에 없는 프롬프트만 Gemini를 호출하고, 결과는 JSON 파일에 저장합니다.
+    """
+
+    def __init__(self, cache_path, fallback=None):
+        self.cache_path = cache_path
+        self.fallback = fallback or llm_module.call_gemini
+        self.calls = 0
+        self.misses = 0
+        self.cache = {}
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+
+    def __call__(self, prompt):
+        self.calls += 1
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        if key not in self.cache:
+            self.misses += 1
+            self.cache[key] = self.fallback(prompt)
+            self.save()
+        return self.cache[key]
+
+    def save(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, ensure_ascii=False, indent=2)
+
+class FakeSlack:
+    """전송된 메시지를 기록만 하는 가짜 슬랙 백엔드"""
+
+    def __init__(self):
+        self.messages = []
+        self.updates = []
+
+    def __call__(self, channel, text, thread_ts=None, pin=False, update_ts=None):
+        if update_ts:
+            self.updates.append({"channel": channel, "text": text, "ts": update_ts})
+            return True
+        self.messages.append({"channel": channel, "text": text, "thread_ts": thread_ts, "pin": pin})
+        return f"{len(self.messages)}.000000"
+
+def load_fixtures(fixtures_dir=DEFAULT_FIXTURES_DIR):
+    """
+    벤치마크용 기록 데이터를 불러옵니다.
+
+    .html 파일은 인스타그램 프로필 페이지, .txt 파일은 포스트 캡션으로 취급합니다.
+    디렉토리가 원본 포스트 아카이브(utils/post_archive.py)면 보관된 포스트를 기록 데이터로 사용합니다.
+
+    Args:
+        fixtures_dir (str): 기록 데이터 디렉토리 또는 아카이브 디렉토리
+
+    Returns:
+        list: {"name", "kind", "content"} 딕셔너리 리스트
+    """
+    if os.path.exists(os.path.join(fixtures_dir, post_archive.INDEX_FILE)):
+        fixtures = load_archive_fixtures(fixtures_dir)
+        if not fixtures:
+            raise ValueError(f"아카이브에 재생할 포스트가 없습니다: {fixtures_dir}")
+        return fixtures
+
+    fixtures = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        kind = os.path.splitext(name)[1].lstrip(".")
+        if kind not in ("html", "txt"):
+            continue
+        with open(os.path.join(fixtures_dir, name), "r", encoding="utf-8") as f:
+            fixtures.append({"name": name, "kind": kind, "content": f.read()})
+
+    if not fixtures:
+        raise ValueError(f"벤치마크 기록 데이터가 없습니다: {fixtures_dir}")
+    return fixtures
+
+def load_archive_fixtures(archive_dir, start_date=None, end_date=None):
+    """
+    원본 포스트 아카이브의 레코드를 기록 데이터로 바꿉니다.
+
+    첫 페이지(프로필 HTML)가 있으면 html, 없으면 캡션을 txt 기록 데이터로 사용합니다.
+    """
+    fixtures = []
+    for record in post_archive.PostArchive(archive_dir).iter_records(start_date, end_date):
+        name = f"{str(record.get('date') or '')[:10] or 'archive'}-{record.get('post_id') or len(fixtures)}"
+        pages = record.get("pages") or []
+        if pages:
+            fixtures.append({"name": f"{name}.html", "kind": "html", "content": pages[0]["html"]})
+        elif record.get("caption"):
+            fixtures.append({"name": f"{name}.txt", "kind": "txt", "content": record["caption"]})
+    return fixtures
+
+def make_replay_backend(fixture):
+    """
+    기록 데이터를 재생하는 스크래퍼 백엔드를 만듭니다.
+
+    HTML은 실제 파서를 거칩니다. 최근 포스트 메타데이터가 있으면 오늘 포스트 선택까지 재생하고,
+    없으면 parse_profile_html로 텍스트를 추출합니다.
+    """
+    def replay(instagram_url):
+        if fixture["kind"] == "html":
+            posts = instagram_scraper.extract_recent_posts(fixture["content"])
+            post = instagram_scraper.select_todays_post(posts) if posts else None
+            return post or instagram_scraper.parse_profile_html(fixture["content"]) or ""
+        return fixture["content"]
+    return replay
+
+def bench_parser(fixtures, repeat=200):
+    """
+    기록 데이터의 캡션마다 결정적 메뉴 파서의 속도와 신뢰도를 측정합니다.
+
+    Args:
+        fixtures (list): load_fixtures 결과
+        repeat (int): 캡션당 반복 파싱 횟수
+
+    Returns:
+        dict: {"fixtures": {이름: {"confidence", "dishes", "mean_us"}}, "parser_share"}
+    """
+    from utils.menu_parser import parse_menu, DEFAULT_CONFIDENCE_THRESHOLD
+
+    results = {}
+    for fixture in fixtures:
+        caption = make_replay_backend(fixture)(None)
+        if isinstance(caption, dict):
+            caption = caption["text"]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parsed = parse_menu(caption)
+        elapsed = time.perf_counter() - started
+        results[fixture["name"]] = {
+            "confidence": parsed.confidence,
+            "dishes": len(parsed.dishes()),
+            "mean_us": round(elapsed / repeat * 1_000_000, 2)
+        }
+
+    handled = sum(1 for r in results.values() if r["confidence"] >= DEFAULT_CONFIDENCE_THRESHOLD)
+    return {
+        "fixtures": results,
+        "parser_share": round(handled / len(results), 3) if results else 0.0
+    }
+
+def percentile(values, pct):
+    """
+    선형 보간 방식의 백분위수를 계산합니다.
+
+    Args:
+        values (list): 숫자 리스트
+        pct (float): 0~100 사이 백분위
+
+    Returns:
+        float: 백분위수 (값이 없으면 0.0)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def summarize_latencies(values):
+    """지연 시간 리스트를 p50/p95/p99 요약으로 변환합니다 (단위: ms)"""
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3)
+    }
+
+def get_peak_rss_mb():
+    """프로세스 최대 RSS(MB)를 반환합니다"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+def get_git_commit():
+    """현재 git 커밋 해시를 반환합니다 (git이 없으면 None)"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+# 벤치마크 플로우 이름 -> flow.get_flow 이름
+BENCH_FLOWS = {
+    "full": "menu",
+    "simple": "simple",
+    "holiday": "holiday_test",
+    "special": "special_test"
+}
+
+def get_bench_flow(flow_name):
+    """벤치마크할 플로우를 반환합니다 (실제 실행과 같은 메모이즈된 플로우 사용)"""
+    from flow import get_flow
+
+    if flow_name not in BENCH_FLOWS:
+        raise ValueError(f"알 수 없는 플로우: {flow_name} (선택 가능: {', '.join(BENCH_FLOWS)})")
+    return get_flow(BENCH_FLOWS[flow_name])
+
+def measure_import_time(module="main", top=15):
+    """
+    새 인터프리터에서 `python -X importtime -c "import <module>"`을 실행해 import 시간을 요약합니다.
+
+    Args:
+        module (str): import할 모듈 이름
+        top (int): 누적 시간 기준으로 보고할 모듈 개수
+
+    Returns:
+        dict: 전체 import 시간과 누적 시간 상위 모듈 (측정 실패 시 None)
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=root, capture_output=True, text=True, timeout=120
+        )
+    except Exception:
+        return None
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if match:
+            entries.append({
+                "module": match.group(4),
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+                "depth": (len(match.group(3)) - 1) // 2
+            })
+
+    if completed.returncode != 0 or not entries:
+        return None
+
+    # 대상 모듈의 누적 시간 (인터프리터 기동 시 import되는 site 등은 제외)
+    total_us = next((entry["cumulative_us"] for entry in entries
+                     if entry["depth"] == 0 and entry["module"] == module), 0)
+    hottest = sorted(entries, key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 3),
+        "top": [
+            {"module": entry["module"], "cumulative_ms": round(entry["cumulative_us"] / 1000, 3)}
+            for entry in hottest
+        ]
+    }
+
+def run_benchmark(fixtures_dir=DEFAULT_FIXTURES_DIR, flow_name="simple", runs=5,
+                  llm_backend="fake", llm_latency=0.0, llm_cache_path=None, import_time=True):
+    """
+    기록 데이터를 실제 플로우에 재생하면서 성능을 측정합니다.
+
+    Args:
+        fixtures_dir (str): 기록 데이터 디렉토리
+        flow_name (str): 실행할 플로우 이름
+        runs (int): 기록 데이터 전체를 반복할 횟수
+        llm_backend (str): "fake" 또는 "cached"
+        llm_latency (float): 가짜 LLM 호출당 지연 시간(초)
+        llm_cache_path (str): cached 백엔드가 사용할 캐시 파일 경로
+        import_time (bool): `-X importtime`으로 main.py import 시간도 측정할지 여부
+
+    Returns:
+        dict: 벤치마크 결과
+    """
+    from flow import get_default_shared_store
+
+    fixtures = load_fixtures(fixtures_dir)
+    bench_flow = get_bench_flow(flow_name)
+
+    if llm_backend == "fake":
+        llm = FakeLLM(latency=llm_latency)
+    elif llm_backend == "cached":
+        llm = CachedLLM(llm_cache_path or os.path.join(DEFAULT_RESULTS_DIR, "llm_cache.json"))
+    else:
+        raise ValueError(f"알 수 없는 LLM 백엔드: {llm_backend}")
+    slack = FakeSlack()
+
+    node_latencies = {}
+    prompt_tokens = {"before": 0, "after": 0, "prompts": 0}
+    run_results = []
+    # 요약 메모가 실제 실행 기록 DB에 섞이지 않도록 임시 DB 사용 (반복 실행 사이에는 유지)
+    bench_dir = tempfile.mkdtemp(prefix="menu-bench-")
+    bench_db = os.path.join(bench_dir, "history.db")
+
+    llm_module.set_llm_backend(llm)
+    slack_sender.set_slack_backend(slack)
+    started = time.perf_counter()
+    try:
+        for run_index in range(runs):
+            for fixture in fixtures:
+                instagram_scraper.set_scraper_backend(make_replay_backend(fixture))
+                shared = get_default_shared_store()
+                # 벤치마크 중 학습한 메뉴가 실제 사전 파일에 섞이지 않도록 메모리에서만 학습
+                shared["config"]["lexicon_path"] = None
+                shared["config"]["history_db"] = bench_db
+                llm_calls_before = llm.calls
+
+                run_started = time.perf_counter()
+                error = None
+                try:
+                    bench_flow.run(shared)
+                except Exception as e:
+                    error = str(e)
+                wall = time.perf_counter() - run_started
+
+                for timing in shared["metrics"]["node_timings"]:
+                    node_latencies.setdefault(timing["node"], []).append(timing["seconds"])
+                for stats in shared["metrics"].get("prompt_tokens", []):
+                    prompt_tokens["before"] += stats["before"]
+                    prompt_tokens["after"] += stats["after"]
+                    prompt_tokens["prompts"] += 1
+
+                run_results.append({
+                    "run": run_index,
+                    "fixture": fixture["name"],
+                    "wall_ms": round(wall * 1000, 3),
+                    "llm_calls": llm.calls - llm_calls_before,
+                    "situation_type": shared["menu_data"].get("situation_analysis", {}).get("situation_type"),
+                    "summary_source": shared["status"].get("summary_source"),
+                    "situation_parse": shared["status"].get("situation_parse"),
+                    "final_success": shared["status"].get("final_success", False),
+                    "error": error
+                })
+    finally:
+        llm_module.set_llm_backend(None)
+        slack_sender.set_slack_backend(None)
+        instagram_scraper.set_scraper_backend(None)
+        shutil.rmtree(bench_dir, ignore_errors=True)
+    total_wall = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": get_git_commit(),
+            "python": platform.python_version(),
+            "flow": flow_name,
+            "runs": runs,
+            "fixtures": [fixture["name"] for fixture in fixtures],
+            "llm_backend": llm_backend,
+            "llm_latency": llm_latency
+        },
+        "total_wall_ms": round(total_wall * 1000, 3),
+        "run_wall": summarize_latencies([r["wall_ms"] / 1000 for r in run_results]),
+        "nodes": {name: summarize_latencies(values) for name, values in sorted(node_latencies.items())},
+        "llm_calls": {
+            "total": llm.calls,
+            "per_run": round(llm.calls / len(run_results), 3) if run_results else 0.0
+        },
+        "slack_messages": len(slack.messages),
+        "prompt_tokens": prompt_tokens,
+        "summary_sources": dict(Counter(r["summary_source"] for r in run_results if r["summary_source"])),
+        "situation_parse": dict(Counter(r["situation_parse"] for r in run_results if r["situation_parse"])),
+        "errors": sum(1 for r in run_results if r["error"]),
+        "peak_rss_mb": get_peak_rss_mb(),
+        "import_time": measure_import_time("main") if import_time else None,
+        "parser": bench_parser(fixtures),
+        "runs": run_results
+    }
+
+def save_results(results, output_path=None):
+    """
+    벤치마크 결과를 JSON 파일로 저장합니다.
+
+    Returns:
+        str: 저장된 파일 경로
+    """
+    if not output_path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        commit = results["meta"].get("git_commit") or "nogit"
+        output_path = os.path.join(DEFAULT_RESULTS_DIR, f"bench-{stamp}-{commit}.json")
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return output_path
+
+def compare_results(baseline, current):
+    """
+    두 벤치마크 결과를 비교한 요약 줄들을 반환합니다.
+
+    Args:
+        baseline (dict): 기준 결과
+        current (dict): 현재 결과
+
+    Returns:
+        list: "지표: 기준 -> 현재 (변화율)" 형식의 문자열 리스트
+    """
+    def line(label, old, new):
+        if old is None or new is None:
+            return f"{label}: {old} -> {new}"
+        change = ((new - old) / old * 100) if old else 0.0
+        return f"{label}: {old} -> {new} ({change:+.1f}%)"
+
+    lines = [
+        line("total_wall_ms", baseline.get("total_wall_ms"), current.get("total_wall_ms")),
+        line("run_wall.p95_ms", baseline["run_wall"]["p95_ms"], current["run_wall"]["p95_ms"]),
+        line("llm_calls.per_run", baseline["llm_calls"]["per_run"], current["llm_calls"]["per_run"]),
+        line("peak_rss_mb", baseline.get("peak_rss_mb"), current.get("peak_rss_mb")),
+        line("prompt_tokens.after",
+             (baseline.get("prompt_tokens") or {}).get("after"),
+             (current.get("prompt_tokens") or {}).get("after")),
+        line("import_time.total_ms",
+             (baseline.get("import_time") or {}).get("total_ms"),
+             (current.get("import_time") or {}).get("total_ms"))
+    ]
+    for name, stats in current["nodes"].items():
+        old = baseline["nodes"].get(name)
+        lines.append(line(f"{name}.p95_ms", old["p95_ms"] if old else None, stats["p95_ms"]))
+    return lines
+
+def print_report(results):
+    """벤치마크 결과를 사람이 읽기 쉬운 형태로 출력합니다"""
+    print(f"📊 벤치마크 결과 (flow={results['meta']['flow']}, runs={results['meta']['runs']}, "
+          f"fixtures={len(results['meta']['fixtures'])})")
+    print(f"- 전체 실행 시간: {results['total_wall_ms']:.1f}ms")
+    wall = results["run_wall"]
+    print(f"- 실행당 시간: p50 {wall['p50_ms']:.1f}ms / p95 {wall['p95_ms']:.1f}ms / p99 {wall['p99_ms']:.1f}ms")
+    print(f"- LLM 호출: 총 {results['llm_calls']['total']}회 (실행당 {results['llm_calls']['per_run']}회)")
+    print(f"- 최대 RSS: {results['peak_rss_mb']}MB")
+    tokens = results.get("prompt_tokens")
+    if tokens and tokens["prompts"]:
+        print(f"- 프롬프트 토큰(추정): 압축 전 {tokens['before']} -> 후 {tokens['after']} "
+              f"({1 - tokens['after'] / tokens['before']:.0%} 절감, 프롬프트 {tokens['prompts']}개)")
+    if results.get("summary_sources"):
+        sources = ", ".join(f"{source} {count}회" for source, count in sorted(results["summary_sources"].items()))
+        print(f"- 요약 방식: {sources}")
+    if results.get("situation_parse"):
+        parses = results["situation_parse"]
+        failed = sum(count for outcome, count in parses.items() if outcome != "ok")
+        outcomes = ", ".join(f"{outcome} {count}회" for outcome, count in sorted(parses.items()))
+        print(f"- 상황 감지 JSON 파싱: {outcomes} (바로 파싱 실패율 {failed / sum(parses.values()):.0%})")
+    print(f"- 오류: {results['errors']}건")
+    if results.get("import_time"):
+        imports = results["import_time"]
+        print(f"- import 시간 (python -X importtime -c 'import {imports['module']}'): {imports['total_ms']:.1f}ms")
+        for entry in imports["top"][:5]:
+            print(f"  - {entry['module']}: {entry['cumulative_ms']:.1f}ms")
+    if results.get("parser"):
+        parser = results["parser"]
+        print(f"- 메뉴 파서 (LLM 없이 요약 가능한 비율 {parser['parser_share'] * 100:.0f}%):")
+        for name, stats in parser["fixtures"].items():
+            print(f"  - {name}: 신뢰도 {stats['confidence']} / 메뉴 {stats['dishes']}개 / {stats['mean_us']:.1f}µs")
+    print("- 노드별 지연 시간:")
+    for name, stats in results["nodes"].items():
+        print(f"  - {name}: p50 {stats['p50_ms']:.2f}ms / p95 {stats['p95_ms']:.2f}ms / "
+              f"p99 {stats['p99_ms']:.2f}ms (n={stats['count']})")
@@ -0,0 +1,113 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+DEFAULT_BROWSER_POOL_SIZE = 2
+DEFAULT_MAX_USES = 20  # 이만큼 쓴 브라우저는 메모리 누수를 막기 위해 새로 띄움
+
+class BrowserPool:
+    """
+    여러 워크플로우가 함께 쓰는 Chromium 풀
+
+    동시에 띄우는 브라우저 수를 size로 제한하고, 다 쓴 브라우저는 닫지 않고 다음 스크래핑에 재사용합니다.
+    스크래핑 중 오류가 난 브라우저는 상태를 믿을 수 없으므로 닫습니다.
+    """
+
+    def __init__(self, size=DEFAULT_BROWSER_POOL_SIZE, max_uses=DEFAULT_MAX_USES, factory=None):
+        """
+        Args:
+            size (int): 동시에 띄울 수 있는 최대 브라우저 수
+            max_uses (int): 브라우저 하나를 재사용하는 최대 횟수
+            factory: 새 브라우저를 만드는 함수 (None이면 프록시 없는 headless Chromium)
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory or _new_driver
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.idle = []  # [(driver, 사용 횟수)]
+        self.created = 0
+
+    @contextmanager
+    def session(self):
+        """브라우저 하나를 빌려 쓰고 돌려줍니다 (모두 사용 중이면 빌 때까지 기다림)"""
+        self.slots.acquire()
+        driver, uses = None, 0
+        try:
+            with self.lock:
+                if self.idle:
+                    driver, uses = self.idle.pop()
+            if driver is None:
+                driver = self.factory()
+                with self.lock:
+                    self.created += 1
+            yield driver
+        except BaseException:
+            _quit(driver)
+            driver = None
+            raise
+        finally:
+            if driver is not None:
+                if uses + 1 >= self.max_uses:
+                    _quit(driver)
+                else:
+                    with self.lock:
+                        self.idle.append((driver, uses + 1))
+            self.slots.release()
+
+    def close(self):
+        """쉬고 있는 브라우저를 모두 닫습니다"""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for driver, _ in idle:
+            _quit(driver)
+
+    def stats(self):
+        with self.lock:
+            return {"size": self.size, "idle": len(self.idle), "created": self.created}
+
+def _new_driver(proxy=None):
+    from selenium import webdriver
+    from utils.instagram_scraper import setup_chrome_options
+
+    return webdriver.Chrome(options=setup_chrome_options(proxy))
+
+def _quit(driver):
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception as e:
+        logging.warning(f"⚠️ 브라우저 종료 실패: {e}")
+
+# 스크래퍼가 사용하는 브라우저 풀 (None이면 스크래핑마다 새 브라우저를 띄우고 닫음)
+_browser_pool = None
+
+def set_browser_pool(pool):
+    """
+    스크래퍼가 사용할 브라우저 풀을 설정합니다.
+
+    Args:
+        pool (BrowserPool | None): 브라우저 풀 (None이면 풀 없이 매번 새 브라우저)
+    """
+    global _browser_pool
+    _browser_pool = pool
+
+@contextmanager
+def browser_session(proxy=None):
+    """
+    스크래핑에 쓸 브라우저를 제공합니다.
+
+    풀이 있고 프록시를 쓰지 않으면 풀에서 빌리고, 그 외에는 새로 띄운 뒤 닫습니다.
+    (Chromium 프록시는 실행할 때만 정할 수 있어서 프록시 브라우저는 재사용하지 않음)
+    """
+    if _browser_pool is not None and not proxy:
+        with _browser_pool.session() as driver:
+            yield driver
+        return
+
+    driver = _new_driver(proxy)
+    try:
+        yield driver
+    finally:
+        _quit(driver)
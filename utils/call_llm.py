@@ -1,12 +1,98 @@
 import os
-import google.generativeai as genai
+import threading
 
-def call_llm(prompt):
+from utils.metrics import record_llm_usage
+
+# Gemini 1.5 Flash 모델 사용 (더 빠르고 안정적), GEMINI_MODEL 환경변수로 변경
+DEFAULT_GEMINI_MODEL = "gemini-1.5-flash"
+
+# 벤치마크 등에서 Gemini 대신 사용할 LLM 백엔드 (None이면 Gemini 사용)
+_llm_backend = None
+
+def set_llm_backend(backend):
+    """
+    LLM 호출 백엔드를 교체합니다.
+    
+    Args:
+        backend: prompt(str)를 받아 응답 텍스트를 반환하는 callable (None이면 Gemini로 복원)
+    """
+    global _llm_backend
+    _llm_backend = backend
+
+def call_llm(prompt, timeout=None, response_schema=None):
     """
     Google Gemini API를 사용하여 LLM 호출
     
+    LLM 라우터(utils/llm_router.py)를 거쳐서 느린 응답은 헤지 요청으로, 실패는 다른 모델로 넘깁니다.
+    
     Args:
         prompt (str): LLM에 전달할 프롬프트
+        timeout (float): 응답 대기 시간(초, None이면 제한 없음). 백엔드에는 전달하지 않음
+        response_schema (dict): 주어지면 이 스키마(OpenAPI 형식)에 맞는 JSON만 생성하도록 요청. 백엔드에는 전달하지 않음
+        
+    Returns:
+        str: LLM의 응답 텍스트
+    """
+    if _llm_backend is not None:
+        return _llm_backend(prompt)
+    
+    from utils.llm_router import get_llm_router
+    
+    return get_llm_router().call(prompt, timeout, response_schema)
+
+def stream_llm(prompt, timeout=None):
+    """
+    LLM 응답을 생성되는 대로 조각(str)으로 내보냅니다.
+    
+    백엔드가 설정되어 있으면 백엔드 응답 전체를 한 조각으로 내보냅니다.
+    
+    Args:
+        prompt (str): LLM에 전달할 프롬프트
+        timeout (float): 응답 대기 시간(초, None이면 제한 없음)
+        
+    Yields:
+        str: 응답 텍스트 조각
+    """
+    if _llm_backend is not None:
+        yield _llm_backend(prompt)
+        return
+    
+    from utils.llm_router import get_llm_router
+    
+    yield from get_llm_router().stream(prompt, timeout)
+
+# 여러 워크플로우 스레드가 함께 쓰는 Gemini 모델 (API 키가 바뀌면 다시 설정)
+_gemini_models = {}
+_gemini_key = None
+_gemini_lock = threading.Lock()
+
+def get_gemini_model(api_key, model_name=DEFAULT_GEMINI_MODEL):
+    """Gemini 모델 클라이언트를 반환합니다 (모델별로 프로세스 안에서 공유)"""
+    global _gemini_key
+    with _gemini_lock:
+        if _gemini_key != api_key:
+            # google.generativeai는 import 비용이 커서 실제 호출 시점에 로드
+            import google.generativeai as genai
+            
+            # Gemini API 설정
+            genai.configure(api_key=api_key)
+            _gemini_models.clear()
+            _gemini_key = api_key
+        if model_name not in _gemini_models:
+            import google.generativeai as genai
+            
+            _gemini_models[model_name] = genai.GenerativeModel(model_name)
+        return _gemini_models[model_name]
+
+def call_gemini(prompt, timeout=None, model_name=DEFAULT_GEMINI_MODEL, response_schema=None):
+    """
+    백엔드 설정과 무관하게 Gemini API를 직접 호출합니다.
+    
+    Args:
+        prompt (str): LLM에 전달할 프롬프트
+        timeout (float): 요청 타임아웃(초)
+        model_name (str): Gemini 모델 이름
+        response_schema (dict): JSON 응답 스키마 (주어지면 response_mime_type="application/json"으로 생성)
         
     Returns:
         str: LLM의 응답 텍스트
@@ -16,17 +102,48 @@ def call_llm(prompt):
     if api_key == "your-gemini-api-key":
         raise ValueError("GEMINI_API_KEY 환경변수를 설정해주세요")
     
-    # Gemini API 설정
-    genai.configure(api_key=api_key)
-    
-    # Gemini 1.5 Flash 모델 사용 (더 빠르고 안정적)
-    model = genai.GenerativeModel("gemini-1.5-flash")
+    model = get_gemini_model(api_key, model_name)
     
     try:
-        response = model.generate_content(prompt)
+        request_options = {"timeout": timeout} if timeout else None
+        generation_config = None
+        if response_schema:
+            generation_config = {"response_mime_type": "application/json", "response_schema": response_schema}
+        response = model.generate_content(prompt, generation_config=generation_config,
+                                          request_options=request_options)
+        usage = getattr(response, "usage_metadata", None)
+        record_llm_usage(getattr(usage, "prompt_token_count", 0) or 0,
+                         getattr(usage, "candidates_token_count", 0) or 0, model_name)
         return response.text
     except Exception as e:
-        raise Exception(f"Gemini API 호출 실패: {str(e)}")
+        raise Exception(f"Gemini API 호출 실패: {str(e)}") from e
+
+def call_gemini_stream(prompt, timeout=None, model_name=DEFAULT_GEMINI_MODEL):
+    """
+    Gemini 스트리밍 생성으로 응답을 조각별로 내보냅니다.
+    
+    Yields:
+        str: 응답 텍스트 조각
+    """
+    api_key = os.environ.get("GEMINI_API_KEY", "your-gemini-api-key")
+    
+    if api_key == "your-gemini-api-key":
+        raise ValueError("GEMINI_API_KEY 환경변수를 설정해주세요")
+    
+    model = get_gemini_model(api_key, model_name)
+    
+    try:
+        request_options = {"timeout": timeout} if timeout else None
+        response = model.generate_content(prompt, stream=True, request_options=request_options)
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+        # 토큰 사용량은 스트림이 끝난 뒤에 채워짐
+        usage = getattr(response, "usage_metadata", None)
+        record_llm_usage(getattr(usage, "prompt_token_count", 0) or 0,
+                         getattr(usage, "candidates_token_count", 0) or 0, model_name)
+    except Exception as e:
+        raise Exception(f"Gemini API 호출 실패: {str(e)}") from e
 
 if __name__ == "__main__":
     prompt = "오늘 점심 뭐 먹지? 간단하게 추천해줘."
@@ -0,0 +1,264 @@
+import json
+import logging
+import os
+import threading
+import time
+
+DEFAULT_CIRCUIT_PATH = os.path.join("data", "scraper_circuits.json")
+DEFAULT_FAILURE_THRESHOLD = 3  # 일반 실패가 연속으로 이만큼 쌓이면 차단
+DEFAULT_COOLDOWN = 30 * 60  # 첫 차단 시간(초)
+MAX_COOLDOWN = 6 * 60 * 60  # 반개방 확인이 계속 실패할 때 늘어나는 차단 시간 상한(초)
+PROBE_TIMEOUT = 10 * 60  # 반개방 시도 결과가 이 시간 안에 기록되지 않으면(프로세스 종료 등) 다시 한 번 시도 허용(초)
+
+# 한 번만 나와도 바로 차단하는 실패 유형 (인스타그램이 접근을 막고 있다는 뜻)
+BLOCK_SIGNATURES = {"login_wall", "rate_limited", "http_429", "http_403", "http_401"}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ScrapeError(Exception):
+    """실패 유형(signature)이 붙은 스크래핑 오류"""
+
+    def __init__(self, signature, message=None):
+        super().__init__(message or signature)
+        self.signature = signature
+
+def failure_signature(exc):
+    """
+    예외를 서킷 브레이커가 구분하는 실패 유형 문자열로 바꿉니다.
+
+    Returns:
+        str: "login_wall", "http_429", "timeout", "connection", "error" 등
+    """
+    if isinstance(exc, ScrapeError):
+        return exc.signature
+    name = type(exc).__name__
+    if "Timeout" in name:
+        return "timeout"
+    if "Connection" in name:
+        return "connection"
+    return "error"
+
+class CircuitBreaker:
+    """
+    스크래핑 방식 하나(selenium, requests 등)의 서킷 브레이커
+
+    - closed: 평소 상태. 차단 유형 실패는 즉시, 그 외 실패는 연속 failure_threshold번이면 open
+    - open: cooldown 동안 호출하지 않고 바로 건너뜀
+    - half_open: cooldown이 지나면 호출자 하나만 시도해보고(나머지는 결과가 나올 때까지 건너뜀),
+      성공하면 closed, 실패하면 cooldown을 두 배로 늘려 다시 open
+
+    상태는 CircuitRegistry가 JSON 파일로 저장해서 데몬을 다시 시작해도 유지됩니다.
+    """
+
+    def __init__(self, name, registry, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 cooldown=DEFAULT_COOLDOWN, max_cooldown=MAX_COOLDOWN, probe_timeout=PROBE_TIMEOUT):
+        self.name = name
+        self.registry = registry
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_timeout = probe_timeout
+
+    @property
+    def data(self):
+        return self.registry.state_of(self.name, self.base_cooldown)
+
+    def allow(self, now=None):
+        """
+        지금 이 방식을 시도해도 되는지 확인합니다. (cooldown이 지났으면 half_open으로 전환)
+
+        half_open에서는 True를 받은 호출자 하나만 시도하므로, True를 받았으면 반드시
+        record_success/record_failure로 결과를 기록해야 합니다.
+
+        Returns:
+            bool: 시도해도 되면 True
+        """
+        now = now or time.time()
+        with self.registry.lock:
+            data = self.data
+            if data["state"] == CLOSED:
+                return True
+            if data["state"] == HALF_OPEN:
+                # 다른 호출자가 이미 시도 중이면 결과가 나올 때까지 건너뜀
+                if now - (data.get("probe_started_at") or 0.0) < self.probe_timeout:
+                    return False
+            elif now - data["opened_at"] < data["cooldown"]:
+                return False
+            data.update(state=HALF_OPEN, probe_started_at=now)
+            self.registry.save()
+        logging.info(f"🔌 {self.name} 서킷 반개방: 한 번 시도해봅니다")
+        return True
+
+    def remaining(self, now=None):
+        """open 상태가 끝날 때까지 남은 시간(초)"""
+        data = self.data
+        if data["state"] != OPEN:
+            return 0.0
+        return max(0.0, data["opened_at"] + data["cooldown"] - (now or time.time()))
+
+    def record_success(self):
+        with self.registry.lock:
+            data = self.data
+            if data["state"] == CLOSED and not data["failures"]:
+                return
+            if data["state"] != CLOSED:
+                logging.info(f"✅ {self.name} 서킷 닫힘 (다시 정상)")
+            data.update(state=CLOSED, failures=0, cooldown=self.base_cooldown, probe_started_at=None)
+            self.registry.save()
+
+    def release_probe(self):
+        """
+        allow()로 받은 시도를 결과 없이 돌려줍니다. (실패로 볼 수 없는 오류로 시도를 끝냈을 때)
+
+        half_open이면 다음 호출자가 바로 다시 시도할 수 있습니다.
+        """
+        with self.registry.lock:
+            data = self.data
+            if data["state"] == HALF_OPEN and data.get("probe_started_at"):
+                data["probe_started_at"] = None
+                self.registry.save()
+
+    def record_failure(self, signature, now=None):
+        """
+        실패를 기록하고 필요하면 서킷을 엽니다.
+
+        Args:
+            signature (str): 실패 유형 (failure_signature 참고)
+        """
+        now = now or time.time()
+        with self.registry.lock:
+            data = self.data
+            data["failures"] += 1
+            data["last_signature"] = signature
+            data["signatures"][signature] = data["signatures"].get(signature, 0) + 1
+
+            if data["state"] == HALF_OPEN:
+                data["cooldown"] = min(data["cooldown"] * 2, self.max_cooldown)
+                self._open(now, signature)
+            elif signature in BLOCK_SIGNATURES or data["failures"] >= self.failure_threshold:
+                self._open(now, signature)
+            self.registry.save()
+
+    def _open(self, now, signature):
+        self.data.update(state=OPEN, opened_at=now, probe_started_at=None)
+        logging.warning(f"⛔ {self.name} 서킷 열림 ({signature}): "
+                        f"{self.data['cooldown'] / 60:.0f}분 동안 이 방식을 건너뜁니다")
+
+    def call(self, func, *args):
+        """
+        서킷이 허용하면 func를 실행하고 결과에 따라 성공/실패를 기록합니다.
+
+        func가 None을 반환하면 "empty" 실패로 기록합니다.
+
+        Returns:
+            결과 (차단 중이거나 실패하면 None)
+        """
+        if not self.allow():
+            logging.info(f"⏭️ {self.name} 서킷이 열려 있어 건너뜀 "
+                         f"(남은 시간 {self.remaining() / 60:.0f}분, 원인: {self.data['last_signature']})")
+            return None
+        try:
+            result = func(*args)
+        except Exception as e:
+            signature = failure_signature(e)
+            logging.warning(f"⚠️ {self.name} 스크래핑 실패 ({signature}): {e}")
+            self.record_failure(signature)
+            return None
+        if result is None:
+            self.record_failure("empty")
+        else:
+            self.record_success()
+        return result
+
+class CircuitRegistry:
+    """방식 이름 -> 서킷 상태를 JSON 파일 하나에 저장하는 저장소"""
+
+    def __init__(self, path=DEFAULT_CIRCUIT_PATH):
+        """
+        Args:
+            path (str): 상태를 저장할 JSON 파일 경로 (None이면 메모리에서만 사용)
+        """
+        self.path = path
+        self.states = {}
+        # 여러 워크플로우 스레드가 같은 상태를 바꾸므로 변경과 저장을 함께 잠금 (save는 잠금 안에서도 호출)
+        self.lock = threading.RLock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.states = json.load(f).get("circuits", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"⚠️ 서킷 상태를 읽지 못했습니다 ({path}): {e}")
+
+    def state_of(self, name, cooldown=DEFAULT_COOLDOWN):
+        with self.lock:
+            return self._state_of(name, cooldown)
+
+    def _state_of(self, name, cooldown):
+        if name not in self.states:
+            self.states[name] = {"state": CLOSED, "failures": 0, "opened_at": 0.0, "cooldown": cooldown,
+                                 "last_signature": None, "signatures": {}, "probe_started_at": None}
+        return self.states[name]
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"circuits": self.states}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+# 경로별로 한 번만 읽어서 재사용
+_registries = {}
+_circuit_path = DEFAULT_CIRCUIT_PATH
+
+def set_circuit_path(path):
+    """
+    서킷 상태 파일 경로를 바꿉니다. (None이면 파일에 저장하지 않음)
+
+    Args:
+        path (str | None): JSON 파일 경로
+    """
+    global _circuit_path
+    _circuit_path = path
+
+def get_registry(path=None):
+    path = path or _circuit_path
+    if path not in _registries:
+        _registries[path] = CircuitRegistry(path)
+    return _registries[path]
+
+def get_breaker(name):
+    """방식 이름에 해당하는 서킷 브레이커를 반환합니다"""
+    return CircuitBreaker(name, get_registry())
+
+def circuit_states():
+    """
+    모든 서킷의 현재 상태를 반환합니다.
+
+    Returns:
+        dict: 방식 이름 -> {"state", "failures", "remaining", "last_signature", "signatures"}
+    """
+    states = {}
+    registry = get_registry()
+    with registry.lock:
+        items = [(name, dict(data, signatures=dict(data["signatures"]))) for name, data in registry.states.items()]
+    for name, data in items:
+        breaker = get_breaker(name)
+        states[name] = {
+            "state": data["state"],
+            "failures": data["failures"],
+            "remaining": round(breaker.remaining()),
+            "last_signature": data["last_signature"],
+            "signatures": dict(data["signatures"])
+        }
+    return states
+
+if __name__ == "__main__":
+    for name, state in circuit_states().items():
+        print(f"{name}: {state}")
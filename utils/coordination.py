@@ -0,0 +1,291 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date
+from contextlib import closing
+
+from utils.retry import DEFAULT_RUN_DEADLINE_SECONDS
+
+DEFAULT_COORDINATION_DB = os.path.join("data", "coordination.db")
+DEFAULT_LEASE_TTL = 10.0  # 리더가 이 시간 동안 갱신하지 않으면 대기 프로세스가 넘겨받음(초)
+LEADER_LEASE = "scheduler"
+# 이 시간이 지나도록 끝나지 않은 실행은 죽은 프로세스의 것으로 보고 다시 가져갈 수 있음
+# (실행은 실행 예산으로 길이가 제한되므로 그보다 넉넉하게)
+CLAIM_TIMEOUT = DEFAULT_RUN_DEADLINE_SECONDS * 2
+# 리더가 바뀐 직후 이만큼(분) 지난 실행은 이어받아 실행 (이미 끝난 작업은 선점 기록으로 건너뜀)
+DEFAULT_CATCH_UP_MINUTES = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    term INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS work_claims (
+    work_key TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    status TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    finished_at REAL
+);
+"""
+
+def new_holder_id():
+    """프로세스를 구분하는 ID (호스트:PID:임의값)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+def shard_items(items, shard, shard_count, key):
+    """
+    항목을 key 순으로 정렬해서 shard_count개 샤드에 번갈아 나눈 뒤 shard번째 샤드를 반환합니다.
+
+    모든 프로세스가 같은 설정을 읽으면 같은 결과가 나오고, 샤드 크기 차이는 최대 1입니다.
+    (설정이 바뀌는 도중 배정이 겹치더라도 작업 선점으로 한 번만 실행됨)
+    """
+    return sorted(items, key=key)[shard::shard_count]
+
+class Coordinator:
+    """
+    SQLite 파일 하나로 여러 프로세스를 조율하는 분산 락 대용
+
+    - 리스(lease): 이름 하나에 보유자 하나. 만료 전에 갱신하지 않으면 다른 프로세스가 가져감 (리더 선출)
+    - 작업 선점(claim): 작업 키("테넌트:날짜")를 먼저 기록한 프로세스만 실행 (같은 작업을 한 번만 실행)
+
+    같은 호스트의 프로세스끼리만 사용합니다. (SQLite 잠금은 네트워크 파일 시스템에서 믿을 수 없음)
+    """
+
+    def __init__(self, db_path=DEFAULT_COORDINATION_DB, holder=None, ttl=DEFAULT_LEASE_TTL):
+        """
+        Args:
+            db_path (str): 조율용 SQLite 파일 경로 (모든 프로세스가 같은 경로 사용)
+            holder (str): 이 프로세스의 ID (None이면 새로 생성)
+            ttl (float): 리스 유효 시간(초)
+        """
+        self.db_path = db_path
+        self.holder = holder or new_holder_id()
+        self.ttl = ttl
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # isolation_level=None: BEGIN IMMEDIATE로 직접 쓰기 잠금을 잡아서 읽고-쓰기를 원자적으로 처리
+        # (sqlite3 연결의 with는 커밋만 하고 닫지 않으므로 closing으로 감쌈)
+        return closing(sqlite3.connect(self.db_path, timeout=5, isolation_level=None))
+
+    def acquire_lease(self, name=LEADER_LEASE, now=None):
+        """
+        리스를 얻거나 갱신합니다.
+
+        비어 있거나 만료됐거나 이미 내 리스면 내 것으로 만들고 만료 시각을 늘립니다.
+
+        Returns:
+            bool: 지금 이 프로세스가 리스를 갖고 있으면 True
+        """
+        now = now or time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT holder, expires_at, term FROM leases WHERE name = ?", (name,)).fetchone()
+                if row and row[0] != self.holder and row[1] > now:
+                    conn.execute("ROLLBACK")
+                    return False
+                if row is None:
+                    conn.execute("INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)",
+                                 (name, self.holder, now + self.ttl))
+                else:
+                    # 보유자가 바뀌면 term을 올려서 이전 리더의 늦은 쓰기와 구분할 수 있게 함
+                    term = row[2] if row[0] == self.holder else row[2] + 1
+                    conn.execute("UPDATE leases SET holder = ?, expires_at = ?, term = ? WHERE name = ?",
+                                 (self.holder, now + self.ttl, term, name))
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def release_lease(self, name=LEADER_LEASE):
+        """내 리스를 바로 내려놓습니다 (정상 종료 시 대기 프로세스가 TTL을 기다리지 않게)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, self.holder))
+
+    def lease_info(self, name=LEADER_LEASE):
+        """
+        Returns:
+            dict | None: {"holder", "expires_at", "term"} (리스가 없으면 None)
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT holder, expires_at, term FROM leases WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return {"holder": row[0], "expires_at": row[1], "term": row[2]}
+
+    def claim(self, work_key, now=None, timeout=CLAIM_TIMEOUT):
+        """
+        작업을 선점합니다. 먼저 선점한 프로세스 하나만 True를 받습니다.
+
+        끝난 작업(done/failed)은 다시 선점할 수 없고, timeout이 지나도록 running인 작업은
+        선점한 프로세스가 죽은 것으로 보고 다시 선점할 수 있습니다.
+
+        Args:
+            work_key (str): 작업 키 (예: "gudo:2026-10-19")
+
+        Returns:
+            bool: 이 프로세스가 실행해야 하면 True
+        """
+        now = now or time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT holder, status, claimed_at FROM work_claims WHERE work_key = ?",
+                                   (work_key,)).fetchone()
+                if row is None:
+                    conn.execute("INSERT INTO work_claims (work_key, holder, status, claimed_at) VALUES (?, ?, 'running', ?)",
+                                 (work_key, self.holder, now))
+                elif row[1] == "running" and now - row[2] > timeout:
+                    logging.warning(f"♻️ 끝나지 않은 작업을 다시 가져옴: {work_key} (이전 실행: {row[0]})")
+                    conn.execute("UPDATE work_claims SET holder = ?, claimed_at = ? WHERE work_key = ?",
+                                 (self.holder, now, work_key))
+                else:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def finish(self, work_key, success=True, now=None):
+        """선점한 작업이 끝났음을 기록합니다"""
+        with self._connect() as conn:
+            conn.execute("UPDATE work_claims SET status = ?, finished_at = ? WHERE work_key = ? AND holder = ?",
+                         ("done" if success else "failed", now or time.time(), work_key, self.holder))
+
+    def claims(self, prefix=""):
+        """
+        Returns:
+            dict: 작업 키 -> {"holder", "status", "claimed_at", "finished_at"}
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT work_key, holder, status, claimed_at, finished_at FROM work_claims "
+                                "WHERE work_key LIKE ? ORDER BY claimed_at", (f"{prefix}%",)).fetchall()
+        return {row[0]: {"holder": row[1], "status": row[2], "claimed_at": row[3], "finished_at": row[4]}
+                for row in rows}
+
+class LeaderElector:
+    """
+    리스를 주기적으로 갱신해서 리더를 유지하고, 리더가 아니면 계속 리스를 노리는 백그라운드 스레드
+
+    갱신 주기는 TTL의 1/3이라 리더가 죽으면 대기 프로세스가 TTL 안에 넘겨받습니다.
+    """
+
+    def __init__(self, coordinator, name=LEADER_LEASE, on_elected=None, on_demoted=None):
+        """
+        Args:
+            coordinator (Coordinator): 리스를 저장하는 조율기
+            name (str): 리스 이름
+            on_elected: 리더가 되면 호출할 함수
+            on_demoted: 리더에서 밀려나면 호출할 함수
+        """
+        self.coordinator = coordinator
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.leader = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    @property
+    def is_leader(self):
+        return self.leader.is_set()
+
+    def wait_for_leadership(self, timeout=None):
+        """리더가 될 때까지 기다립니다 (timeout 안에 리더가 되면 True)"""
+        return self.leader.wait(timeout)
+
+    def start(self):
+        self._tick()  # 시작하자마자 리더인지 정해서 첫 스케줄 판단에 바로 사용
+        self.thread = threading.Thread(target=self._loop, name="leader-elector", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join(timeout=self.coordinator.ttl)
+        if self.leader.is_set():
+            self.leader.clear()
+            self.coordinator.release_lease(self.name)
+            logging.info("👑 리더 리스를 내려놓았습니다")
+
+    def _loop(self):
+        while not self.stopped.wait(self.coordinator.ttl / 3):
+            self._tick()
+
+    def _tick(self):
+        try:
+            acquired = self.coordinator.acquire_lease(self.name)
+        except sqlite3.Error as e:
+            # 갱신하지 못하면 다른 프로세스가 넘겨받을 수 있으므로 리더 역할을 멈춤
+            logging.warning(f"⚠️ 리스 갱신 실패: {e}")
+            acquired = False
+
+        if acquired and not self.leader.is_set():
+            self.leader.set()
+            logging.info(f"👑 리더로 선출됨 ({self.coordinator.holder})")
+            if self.on_elected:
+                self.on_elected()
+        elif not acquired and self.leader.is_set():
+            self.leader.clear()
+            logging.warning("⚠️ 리더 리스를 잃었습니다. 대기 상태로 전환합니다")
+            if self.on_demoted:
+                self.on_demoted()
+
+def run_once(coordinator, work_key, workflow_function, shared_store):
+    """
+    작업을 선점한 경우에만 워크플로우를 실행하고 결과(status["final_success"])를 기록합니다.
+
+    Returns:
+        bool: 이 프로세스가 실행했으면 True
+    """
+    if not coordinator.claim(work_key):
+        logging.info(f"⏭️ 이미 다른 프로세스가 실행한 작업: {work_key}")
+        return False
+    success = False
+    try:
+        workflow_function(shared_store)
+        success = shared_store["status"].get("final_success", False)
+    finally:
+        coordinator.finish(work_key, success)
+    return True
+
+def leader_only(workflow_function, elector, work_name="default"):
+    """
+    리더일 때만, 하루 한 번만 실행하는 워크플로우 함수를 만듭니다. (scheduler_mode에서 사용)
+
+    리더가 막 죽었다면 TTL 안에 이 프로세스가 넘겨받으므로 실행 시각에 리더가 아니어도 잠시 기다려봅니다.
+
+    Args:
+        workflow_function: shared store를 받는 워크플로우 함수
+        elector (LeaderElector): 시작된 리더 선출기
+        work_name (str): 작업 키 앞부분 (작업 키는 "이름:날짜")
+    """
+    def run(shared_store):
+        if not elector.wait_for_leadership(elector.coordinator.ttl * 2):
+            logging.info("💤 대기 프로세스라 실행하지 않습니다 (리더가 실행)")
+            return
+        run_once(elector.coordinator, f"{work_name}:{date.today().isoformat()}", workflow_function, shared_store)
+    return run
+
+if __name__ == "__main__":
+    coordinator = Coordinator()
+    print(f"리더 리스: {coordinator.lease_info()}")
+    for key, claim in coordinator.claims().items():
+        print(f"{key}: {claim}")
@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import threading
+
+from utils.menu_parser import CATEGORIES, BULLET_PREFIXES, header_category, normalize_dish, split_items
+
+DEFAULT_LEXICON_PATH = os.path.join("data", "dish_lexicon.json")
+
+# 메뉴 이름 끝부분 -> 카테고리 (긴 접미사가 우선)
+SUFFIX_RULES = {
+    "찌개": "국물류", "국": "국물류", "탕": "국물류", "전골": "국물류", "스프": "국물류", "수프": "국물류",
+    "무침": "밑반찬", "볶음": "밑반찬", "나물": "밑반찬", "조림": "밑반찬", "김치": "밑반찬",
+    "장아찌": "밑반찬", "절임": "밑반찬", "젓갈": "밑반찬", "겉절이": "밑반찬", "깍두기": "밑반찬",
+    "반찬": "밑반찬", "말이": "밑반찬",
+    "찜": "주요리", "구이": "주요리", "갈비": "주요리", "불고기": "주요리", "튀김": "주요리",
+    "까스": "주요리", "가스": "주요리", "볶음밥": "주요리", "덮밥": "주요리", "수육": "주요리",
+    "샐러드": "샐러드",
+    "식혜": "후식", "수정과": "후식", "케이크": "후식", "푸딩": "후식", "아이스크림": "후식",
+    "과일": "후식", "후식": "후식", "디저트": "후식"
+}
+
+# 접미사 규칙과 다르게 분류되는 대표 메뉴
+SEED_DISHES = {
+    "제육볶음": "주요리", "오징어볶음": "주요리", "낙지볶음": "주요리", "닭갈비": "주요리",
+    "잡채": "밑반찬", "떡볶이": "주요리", "순대": "주요리",
+    "떡": "후식", "약과": "후식", "수박": "후식"
+}
+
+MAX_SUFFIX_LENGTH = max(len(suffix) for suffix in SUFFIX_RULES)
+
+class DishLexicon:
+    """
+    정규화된 메뉴 이름 -> 카테고리 사전
+
+    학습된 메뉴 이름을 먼저 찾고, 없으면 이름 끝부분을 긴 것부터 접미사 규칙에서 찾습니다.
+    LLM 요약 결과나 섹션 제목이 있는 캡션에서 새 메뉴를 점진적으로 학습하고 JSON 파일로 저장합니다.
+    """
+
+    def __init__(self, path=DEFAULT_LEXICON_PATH):
+        """
+        Args:
+            path (str): 학습 결과를 저장할 JSON 파일 경로 (None이면 메모리에서만 사용)
+        """
+        self.path = path
+        self.dishes = dict(SEED_DISHES)
+        self.dirty = False
+        # 여러 테넌트 워크플로우가 같은 사전을 동시에 학습/저장할 수 있음
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.dishes.update(json.load(f).get("dishes", {}))
+            except (OSError, ValueError) as e:
+                logging.warning(f"⚠️ 메뉴 사전을 읽지 못했습니다 ({path}): {e}")
+
+    def categorize(self, dish):
+        """
+        메뉴의 카테고리를 반환합니다.
+
+        Args:
+            dish (str): 메뉴 이름 (정규화 전이어도 됨)
+
+        Returns:
+            str | None: 카테고리 (모르는 메뉴면 None)
+        """
+        key = normalize_dish(dish)
+        if not key:
+            return None
+        if key in self.dishes:
+            return self.dishes[key]
+        for length in range(min(len(key), MAX_SUFFIX_LENGTH), 0, -1):
+            category = SUFFIX_RULES.get(key[-length:])
+            if category:
+                return category
+        return None
+
+    def learn(self, dish, category):
+        """
+        메뉴 하나의 카테고리를 학습합니다.
+
+        Returns:
+            bool: 사전이 바뀌었는지 여부
+        """
+        key = normalize_dish(dish)
+        if not key or category not in CATEGORIES or category == "기타":
+            return False
+        if self.categorize(key) == category:
+            return False
+        with self.lock:
+            self.dishes[key] = category
+            self.dirty = True
+        return True
+
+    def learn_menu(self, menu):
+        """
+        섹션 제목 아래에서 파싱된 메뉴(ParsedMenu)를 학습합니다.
+
+        Returns:
+            int: 새로 학습한 메뉴 수
+        """
+        return sum(self.learn(item.key, category) for category, item in menu.items())
+
+    def learn_from_summary(self, summary):
+        """
+        LLM 요약 결과("**🥩 주요리**" 아래 "- 갈비찜" 형식)에서 메뉴 분류를 학습합니다.
+
+        Returns:
+            int: 새로 학습한 메뉴 수
+        """
+        learned = 0
+        current = None
+        for raw_line in summary.splitlines():
+            line = raw_line.strip()
+            if line.startswith("**"):
+                # "기타정보" 같은 제목이면 그 아래 줄은 메뉴가 아님
+                current = header_category(line)
+            elif current and line.startswith(BULLET_PREFIXES):
+                for text in split_items(line.lstrip("".join(BULLET_PREFIXES) + " ")):
+                    learned += self.learn(text, current)
+        return learned
+
+    def save(self):
+        """학습 결과가 바뀌었으면 JSON 파일에 저장합니다"""
+        if not self.path or not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            learned = {dish: category for dish, category in self.dishes.items()
+                       if SEED_DISHES.get(dish) != category}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"dishes": learned}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        logging.info(f"📚 메뉴 사전 저장 완료 ({len(learned)}개 학습됨)")
+
+# 경로별로 한 번만 읽어서 재사용
+_lexicons = {}
+
+def get_lexicon(path=DEFAULT_LEXICON_PATH):
+    """경로에 해당하는 메뉴 사전을 반환합니다 (프로세스 안에서 공유)"""
+    if path not in _lexicons:
+        _lexicons[path] = DishLexicon(path)
+    return _lexicons[path]
+
+if __name__ == "__main__":
+    lexicon = DishLexicon(None)
+    for dish in ["갈비찜", "미역국", "콩나물무침", "제육볶음", "감자볶음", "김치찌개", "수박", "모둠전"]:
+        print(f"{dish}: {lexicon.categorize(dish)}")
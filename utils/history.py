@@ -0,0 +1,460 @@
+import hashlib
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+from utils.dish_lexicon import get_lexicon, DEFAULT_LEXICON_PATH
+from utils.menu_parser import DATE_PATTERN, normalize_dish, parse_menu
+
+DEFAULT_DB_PATH = os.path.join("data", "menu_history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT UNIQUE,
+    post_id TEXT,
+    run_at TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    weekday INTEGER NOT NULL,
+    raw_caption TEXT,
+    situation_type TEXT,
+    summary TEXT,
+    final_success INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_date ON runs(run_date);
+CREATE INDEX IF NOT EXISTS idx_runs_post ON runs(post_id);
+CREATE INDEX IF NOT EXISTS idx_runs_situation_weekday ON runs(situation_type, weekday);
+
+CREATE TABLE IF NOT EXISTS menu_items (
+    run_pk INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    dish TEXT NOT NULL,
+    category TEXT,
+    run_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_dish_date ON menu_items(dish, run_date);
+CREATE INDEX IF NOT EXISTS idx_items_run ON menu_items(run_pk);
+
+CREATE TABLE IF NOT EXISTS node_timings (
+    run_pk INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    node TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_timings_run ON node_timings(run_pk);
+
+CREATE TABLE IF NOT EXISTS summary_memo (
+    fingerprint TEXT PRIMARY KEY,
+    template TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_used_at TEXT,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS memo_lookups (
+    looked_up_at TEXT NOT NULL,
+    hit INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memo_lookups_time ON memo_lookups(looked_up_at);
+
+CREATE TABLE IF NOT EXISTS weekly_posts (
+    week TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    posted_at TEXT NOT NULL,
+    PRIMARY KEY (week, channel)
+);
+
+CREATE TABLE IF NOT EXISTS post_sightings (
+    shortcode TEXT PRIMARY KEY,
+    first_seen_at TEXT NOT NULL,
+    taken_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sightings_seen ON post_sightings(first_seen_at);
+"""
+
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 캡션 FTS 인덱스 토크나이저 (trigram은 SQLite 3.34+, 한국어 부분 일치에 유리)
+FTS_TOKENIZERS = ["trigram", "unicode61"]
+
+# 저장된 요약 템플릿에서 날짜가 들어갈 자리
+DATE_PLACEHOLDER = "{날짜}"
+
+def make_summary_template(summary):
+    """요약에서 날짜("8월 1일")를 자리 표시자로 바꿔 재사용 가능한 템플릿으로 만듭니다"""
+    return DATE_PATTERN.sub(DATE_PLACEHOLDER, summary)
+
+def fill_summary_template(template, date_text):
+    """템플릿의 날짜 자리에 오늘 날짜를 넣습니다"""
+    return template.replace(DATE_PLACEHOLDER, date_text)
+
+def extract_dishes(raw_content, lexicon=None):
+    """
+    캡션에서 (정규화된 메뉴 이름, 카테고리) 리스트를 추출합니다.
+
+    섹션 제목이 없는 메뉴는 메뉴 사전(lexicon)이 있으면 사전으로 분류합니다.
+    """
+    return parse_menu(raw_content, lexicon).dishes()
+
+class MenuHistory:
+    """
+    실행 기록을 저장하는 SQLite 저장소
+
+    실행마다 포스트 ID, 시간, 원본 캡션, 정규화된 메뉴, 상황 타입, 노드별 실행 시간을 남기고
+    날짜/메뉴 인덱스와 캡션 전문 검색(FTS5) 인덱스로 조회합니다.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fts_enabled = False
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+            self.fts_enabled = self._ensure_fts(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _ensure_fts(self, conn):
+        """캡션 FTS5 인덱스를 만듭니다 (FTS5가 없는 SQLite면 False)"""
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'captions_fts'").fetchone():
+            return True
+        for tokenizer in FTS_TOKENIZERS:
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE captions_fts USING fts5("
+                    f"raw_caption, content='runs', content_rowid='id', tokenize='{tokenizer}')"
+                )
+                return True
+            except sqlite3.OperationalError:
+                continue
+        logging.warning("⚠️ SQLite FTS5를 사용할 수 없어 캡션 검색은 LIKE로 처리합니다")
+        return False
+
+    def record_run(self, shared, dishes=None):
+        """
+        shared store의 실행 결과를 저장합니다.
+
+        Args:
+            shared (dict): 실행이 끝난 shared store
+            dishes (list): (메뉴, 카테고리) 리스트 (None이면 원본 캡션에서 추출)
+
+        Returns:
+            int: 저장된 실행의 row id (저장할 내용이 없으면 None)
+        """
+        menu_data = shared.get("menu_data", {})
+        raw_caption = menu_data.get("raw_content", "")
+        if not raw_caption:
+            return None
+
+        now = datetime.now()
+        run_id = shared.get("runtime", {}).get("run_id") or now.strftime("%Y%m%d-%H%M%S-%f")
+        post_id = menu_data.get("post_id") or hashlib.sha1(raw_caption.encode("utf-8")).hexdigest()[:12]
+        status = shared.get("status", {})
+        run_date = now.date().isoformat()
+        # 캡션을 못 읽어 안내 문구로 대신한 실행은 캡션/메뉴를 남기지 않음 (이전 메뉴 비교와 캡션 검색에서 제외)
+        caption_missing = (menu_data.get("caption_missing")
+                           and not status.get("ocr", {}).get("replaced_caption"))
+        if caption_missing:
+            raw_caption, dishes = None, []
+        elif dishes is None:
+            lexicon_path = shared.get("config", {}).get("lexicon_path", DEFAULT_LEXICON_PATH)
+            dishes = extract_dishes(raw_caption, get_lexicon(lexicon_path))
+
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (run_id, post_id, run_at, run_date, weekday, raw_caption, "
+                "situation_type, summary, final_success) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, post_id, now.isoformat(), run_date, now.weekday(), raw_caption,
+                 menu_data.get("situation_analysis", {}).get("situation_type"),
+                 menu_data.get("summary"), int(bool(status.get("final_success"))))
+            )
+            run_pk = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO menu_items (run_pk, dish, category, run_date) VALUES (?, ?, ?, ?)",
+                [(run_pk, dish, category, run_date) for dish, category in dishes]
+            )
+            conn.executemany(
+                "INSERT INTO node_timings (run_pk, node, seconds) VALUES (?, ?, ?)",
+                [(run_pk, t["node"], t["seconds"]) for t in shared.get("metrics", {}).get("node_timings", [])]
+            )
+            if self.fts_enabled and raw_caption:
+                conn.execute("INSERT INTO captions_fts (rowid, raw_caption) VALUES (?, ?)", (run_pk, raw_caption))
+
+        logging.info(f"🗄️ 실행 기록 저장 완료 (run_id: {run_id}, 메뉴 {len(dishes)}개)")
+        return run_pk
+
+    def last_served(self, dish, before=None):
+        """
+        메뉴가 마지막으로 나온 날짜를 반환합니다.
+
+        Args:
+            dish (str): 메뉴 이름 (정규화해서 비교)
+            before (str): 이 날짜(YYYY-MM-DD) 이전만 조회 (None이면 전체)
+
+        Returns:
+            str | None: 마지막 날짜 (YYYY-MM-DD)
+        """
+        query = "SELECT MAX(run_date) FROM menu_items WHERE dish = ?"
+        params = [normalize_dish(dish)]
+        if before:
+            query += " AND run_date < ?"
+            params.append(before)
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, params).fetchone()
+        return row[0] if row else None
+
+    def previous_menu(self, before):
+        """
+        before 날짜 이전에 메뉴가 기록된 가장 최근 실행을 반환합니다.
+
+        Args:
+            before (str): 기준 날짜 (YYYY-MM-DD)
+
+        Returns:
+            dict | None: {"run_date", "post_id", "raw_caption"}
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT run_date, post_id, raw_caption FROM runs WHERE run_date < ? "
+                "AND EXISTS (SELECT 1 FROM menu_items WHERE menu_items.run_pk = runs.id) "
+                "ORDER BY run_date DESC, id DESC LIMIT 1",
+                (before,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def weekly_post(self, week, channel):
+        """이번 주에 고정한 전체 메뉴 메시지의 ts를 반환합니다 (없으면 None)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT ts FROM weekly_posts WHERE week = ? AND channel = ?", (week, channel)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_weekly_post(self, week, channel, ts):
+        """이번 주 전체 메뉴 메시지의 ts를 저장합니다"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO weekly_posts (week, channel, ts, posted_at) VALUES (?, ?, ?, ?)",
+                (week, channel, ts, datetime.now().isoformat())
+            )
+
+    def has_run_on(self, run_date):
+        """해당 날짜(YYYY-MM-DD)에 기록된 실행이 있는지 여부"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT 1 FROM runs WHERE run_date = ? LIMIT 1", (run_date,)).fetchone()
+        return row is not None
+
+    def latest_summary(self):
+        """
+        요약까지 성공한 가장 최근 실행을 반환합니다.
+
+        Returns:
+            dict | None: {"run_date", "run_at", "post_id", "raw_caption", "situation_type", "summary"}
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT run_date, run_at, post_id, raw_caption, situation_type, summary FROM runs "
+                "WHERE final_success = 1 AND summary IS NOT NULL AND summary != '' "
+                "ORDER BY run_date DESC, id DESC LIMIT 1"
+            ).fetchone()
+        return dict(row) if row else None
+
+    def latest_run_on(self, run_date):
+        """
+        해당 날짜(YYYY-MM-DD)에 성공한 가장 최근 실행을 반환합니다. (요약이 없는 휴무일/특별 메뉴 실행 포함)
+
+        Returns:
+            dict | None: latest_summary와 같은 형식
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT run_date, run_at, post_id, raw_caption, situation_type, summary FROM runs "
+                "WHERE run_date = ? AND final_success = 1 ORDER BY id DESC LIMIT 1",
+                (run_date,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def summary_for_date(self, day, recent=30):
+        """
+        캡션 날짜("8월 1일")가 day인 최근 실행의 요약을 찾습니다. (미리 올라온 메뉴 조회용)
+
+        Args:
+            day (date): 찾을 날짜
+            recent (int): 확인할 최근 실행 수
+
+        Returns:
+            dict | None: latest_summary와 같은 형식
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT run_date, run_at, post_id, raw_caption, situation_type, summary FROM runs "
+                "WHERE final_success = 1 AND summary IS NOT NULL AND summary != '' "
+                "ORDER BY run_date DESC, id DESC LIMIT ?",
+                (recent,)
+            ).fetchall()
+        for row in rows:
+            dates = {(int(month), int(day_)) for month, day_ in DATE_PATTERN.findall(row["raw_caption"] or "")}
+            if (day.month, day.day) in dates:
+                return dict(row)
+        return None
+
+    def record_post_sighting(self, shortcode, taken_at=None):
+        """
+        새로 발견한 포스트를 기록합니다. (이미 기록된 포스트면 무시)
+
+        Args:
+            shortcode (str): 포스트 shortcode
+            taken_at (datetime): 포스트 게시 시각 (모르면 None)
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO post_sightings (shortcode, first_seen_at, taken_at) VALUES (?, ?, ?)",
+                (shortcode, datetime.now().isoformat(), taken_at.isoformat() if taken_at else None)
+            )
+
+    def last_sighting(self):
+        """가장 최근에 발견한 포스트의 shortcode (없으면 None)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT shortcode FROM post_sightings ORDER BY first_seen_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def posting_minutes(self, days=60):
+        """
+        최근 days일 동안 포스트가 올라온 시각을 자정 기준 분 단위로 반환합니다.
+
+        게시 시각을 모르는 포스트는 처음 발견한 시각을 사용합니다.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT COALESCE(taken_at, first_seen_at) FROM post_sightings "
+                "WHERE first_seen_at >= date('now', 'localtime', ?)",
+                (f"-{days} days",)
+            ).fetchall()
+        minutes = []
+        for (value,) in rows:
+            posted = datetime.fromisoformat(value)
+            minutes.append(posted.hour * 60 + posted.minute)
+        return minutes
+
+    def dish_dates(self, dish, limit=10):
+        """메뉴가 나온 최근 날짜들을 최신순으로 반환합니다"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT run_date FROM menu_items WHERE dish = ? ORDER BY run_date DESC LIMIT ?",
+                (normalize_dish(dish), limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def holiday_frequency_by_weekday(self):
+        """
+        요일별 휴무일 횟수를 반환합니다. (같은 날 여러 번 실행되어도 한 번으로 셈)
+
+        Returns:
+            dict: {"월": 횟수, ..., "일": 횟수}
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT weekday, COUNT(DISTINCT run_date) FROM runs "
+                "WHERE situation_type = 'holiday' GROUP BY weekday"
+            ).fetchall()
+        counts = {day: 0 for day in WEEKDAYS}
+        for weekday, count in rows:
+            counts[WEEKDAYS[weekday]] = count
+        return counts
+
+    def search_captions(self, text, limit=10):
+        """
+        캡션 전문 검색 결과를 최신순으로 반환합니다.
+
+        Returns:
+            list: {"run_date", "post_id", "raw_caption"} 딕셔너리 리스트
+        """
+        with closing(self._connect()) as conn:
+            # trigram 토크나이저는 3글자 미만 검색어를 찾지 못하므로 LIKE 사용
+            if self.fts_enabled and len(text) >= 3:
+                rows = conn.execute(
+                    "SELECT runs.run_date, runs.post_id, runs.raw_caption FROM captions_fts "
+                    "JOIN runs ON runs.id = captions_fts.rowid WHERE captions_fts MATCH ? "
+                    "ORDER BY runs.run_date DESC LIMIT ?",
+                    ('"' + text.replace('"', '""') + '"', limit)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT run_date, post_id, raw_caption FROM runs WHERE raw_caption LIKE ? "
+                    "ORDER BY run_date DESC LIMIT ?",
+                    (f"%{text}%", limit)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def lookup_summary(self, fingerprint):
+        """
+        메뉴 지문에 해당하는 요약 템플릿을 찾습니다.
+
+        Returns:
+            str | None: 요약 템플릿 (날짜 자리는 DATE_PLACEHOLDER)
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT template FROM summary_memo WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return row[0] if row else None
+
+    def record_summary_lookup(self, fingerprint, hit):
+        """요약 메모 조회 결과를 적중률 통계에 기록합니다"""
+        now = datetime.now().isoformat()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT INTO memo_lookups (looked_up_at, hit) VALUES (?, ?)", (now, int(hit)))
+            if hit:
+                conn.execute(
+                    "UPDATE summary_memo SET hits = hits + 1, last_used_at = ? WHERE fingerprint = ?",
+                    (now, fingerprint)
+                )
+
+    def store_summary(self, fingerprint, summary):
+        """메뉴 지문에 요약을 날짜 자리 표시자가 들어간 템플릿으로 저장합니다"""
+        now = datetime.now().isoformat()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO summary_memo (fingerprint, template, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(fingerprint) DO UPDATE SET template = excluded.template",
+                (fingerprint, make_summary_template(summary), now)
+            )
+
+    def summary_memo_stats(self, days=30):
+        """
+        최근 days일 동안의 요약 메모 적중률을 반환합니다.
+
+        Returns:
+            dict: {"lookups", "hits", "hit_rate", "entries"}
+        """
+        with closing(self._connect()) as conn:
+            lookups, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hit), 0) FROM memo_lookups WHERE looked_up_at >= date('now', 'localtime', ?)",
+                (f"-{days} days",)
+            ).fetchone()
+            entries = conn.execute("SELECT COUNT(*) FROM summary_memo").fetchone()[0]
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": entries
+        }
+
+    def node_timing_stats(self, days=30):
+        """최근 days일 동안 노드별 평균/최대 실행 시간(초)을 반환합니다"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT node_timings.node, AVG(seconds), MAX(seconds), COUNT(*) FROM node_timings "
+                "JOIN runs ON runs.id = node_timings.run_pk WHERE runs.run_date >= date('now', ?) "
+                "GROUP BY node_timings.node ORDER BY AVG(seconds) DESC",
+                (f"-{days} days",)
+            ).fetchall()
+        return {node: {"avg": avg, "max": max_, "count": count} for node, avg, max_, count in rows}
@@ -1,15 +1,92 @@
-import requests
+import contextvars
 import json
+import logging
 import re
 import random
 import time
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.menu_parser import DATE_PATTERN
+from utils.circuit_breaker import ScrapeError, get_breaker, failure_signature
+from utils.proxy_pool import get_proxy_pool
+from utils.browser_pool import browser_session
+from utils.metrics import record_scrape
+
+# selenium, requests, bs4는 import 비용이 커서 각 스크래핑 함수 안에서 필요할 때 로드합니다
+
+# scrape_menu_post 한 번 동안 가져온 페이지 HTML (원본 포스트 아카이브용, 스레드 풀에도 전달)
+_captured_pages = contextvars.ContextVar("captured_pages", default=None)
+
+def capture_page(url, html):
+    """가져온 페이지를 현재 스크래핑의 페이지 목록에 추가합니다 (scrape_menu_post 밖이면 무시)"""
+    pages = _captured_pages.get()
+    if pages is not None and html:
+        if isinstance(html, bytes):
+            html = html.decode("utf-8", errors="replace")
+        pages.append({"url": url, "html": html})
+
+# 벤치마크 등에서 실제 스크래핑 대신 사용할 백엔드 (None이면 실제 스크래핑)
+_scraper_backend = None
+
+def set_scraper_backend(backend):
+    """
+    스크래핑 백엔드를 교체합니다.
+    
+    Args:
+        backend: instagram_url(str)을 받아 포스트 텍스트(str) 또는 {"text", "shortcode", "taken_at"}
+            딕셔너리를 반환하는 callable (None이면 실제 스크래핑으로 복원)
+    """
+    global _scraper_backend
+    _scraper_backend = backend
+
+def run_strategy(name, func, instagram_url, proxy=None, *args):
+    """
+    스크래핑 방식 하나를 실행합니다.
+    
+    프록시를 직접 지정하지 않았고 프록시 풀이 있으면 풀에서 점수로 프록시를 골라 쓰고,
+    결과(지연 시간, 성공/차단)를 풀에 기록합니다. 차단은 프록시 단위로 풀이 퇴출로 처리하므로
+    서킷 브레이커는 직접 연결할 때만 사용합니다.
+    
+    Args:
+        name (str): 방식 이름 ("selenium", "requests", "legacy")
+        func: (instagram_url, proxy, *args)를 받는 스크래핑 함수
+        
+    Returns:
+        func의 결과 (실패하거나 서킷이 열려 있으면 None)
+    """
+    pool = get_proxy_pool() if proxy is None else None
+    chosen = pool.pick() if pool else None
+    if not chosen:
+        attempted = []
+        
+        def attempt(*call_args):
+            attempted.append(True)
+            try:
+                result = func(*call_args)
+            except Exception as e:
+                record_scrape(name, failure_signature(e))
+                raise
+            record_scrape(name, "success" if result is not None else "empty")
+            return result
+        
+        result = get_breaker(name).call(attempt, instagram_url, proxy, *args)
+        if not attempted:
+            record_scrape(name, "skipped")
+        return result
+    
+    started = time.perf_counter()
+    try:
+        result = func(instagram_url, chosen, *args)
+    except Exception as e:
+        signature = failure_signature(e)
+        pool.record(chosen, time.perf_counter() - started, signature)
+        record_scrape(name, signature)
+        logging.warning(f"⚠️ {name} 스크래핑 실패 ({signature}, 프록시 {chosen}): {e}")
+        return None
+    pool.record(chosen, time.perf_counter() - started, None if result is not None else "empty")
+    record_scrape(name, "success" if result is not None else "empty")
+    return result
 
 # 다양한 User-Agent 리스트 (안티-봇 회피)
 USER_AGENTS = [
@@ -20,12 +97,19 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/121.0"
 ]
 
+# 오늘 포스트를 고를 때 살펴보는 최근 포스트 수
+RECENT_POSTS_LIMIT = 6
+POST_URL = "https://www.instagram.com/p/{shortcode}/"
+MENU_HINT_KEYWORDS = ["메뉴", "반찬", "국", "찌개"]
+
 def get_random_user_agent():
     """랜덤 User-Agent 반환"""
     return random.choice(USER_AGENTS)
 
 def setup_chrome_options(proxy=None):
     """Chrome 브라우저 옵션 설정 (프록시 지원)"""
+    from selenium.webdriver.chrome.options import Options
+    
     chrome_options = Options()
     
     # Chromium 브라우저 경로 설정 (Oracle Linux/WSL 환경)
@@ -41,7 +125,8 @@ def setup_chrome_options(proxy=None):
     
     # WSL/Linux 환경을 위한 추가 옵션
     chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--remote-debugging-port=9222")
+    # 여러 브라우저를 동시에 띄울 수 있도록 디버깅 포트는 빈 포트를 자동으로 사용
+    chrome_options.add_argument("--remote-debugging-port=0")
     chrome_options.add_argument("--disable-background-timer-throttling")
     chrome_options.add_argument("--disable-backgrounding-occluded-windows")
     chrome_options.add_argument("--disable-renderer-backgrounding")
@@ -70,23 +155,47 @@ def get_instagram_posts_advanced(instagram_url, proxy=None):
         proxy (str): 프록시 서버 (예: "http://proxy:port")
         
     Returns:
-        str: 최신 포스트의 텍스트 내용
+        str: 오늘 메뉴 포스트(없으면 최신 포스트)의 텍스트 내용
     """
-    driver = None
-    try:
-        # Chrome 옵션 설정
-        chrome_options = setup_chrome_options(proxy)
-        driver = webdriver.Chrome(options=chrome_options)
-        
+    post = run_strategy("selenium", scrape_post_selenium, instagram_url, proxy)
+    return post["text"] if post else ""
+
+def scrape_post_selenium(instagram_url, proxy=None, limit=RECENT_POSTS_LIMIT):
+    """
+    Selenium으로 프로필 페이지를 한 번 열어 최근 포스트 링크를 모은 뒤 오늘 메뉴 포스트를 고릅니다.
+    
+    링크를 찾지 못하면 기존처럼 첫 번째 포스트를 클릭해서 텍스트를 읽습니다.
+    로그인 화면이나 요청 제한 안내가 나오면 ScrapeError를 발생시킵니다 (서킷 브레이커가 실패 유형으로 사용).
+    
+    Returns:
+        dict | None: {"text", "shortcode", "taken_at"}
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    
+    shortcodes = []
+    # 브라우저 풀이 있으면 빌려 쓰고, 없으면 새로 띄운 뒤 닫음
+    with browser_session(proxy) as driver:
         # 안티-봇 회피: navigator.webdriver 숨기기
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
         # 페이지 로드
         driver.get(instagram_url)
         
+        # 로그인 화면으로 넘어가면 더 기다려도 소용없음
+        if "/accounts/login" in (driver.current_url or ""):
+            raise ScrapeError("login_wall", "로그인 화면으로 이동됨")
+        
         # 랜덤 지연 (봇 탐지 회피)
         time.sleep(random.uniform(2, 5))
         
+        page_source = driver.page_source or ""
+        capture_page(driver.current_url or instagram_url, page_source)
+        if "Please wait a few minutes" in page_source:
+            raise ScrapeError("rate_limited", "요청 제한 안내 페이지")
+        
         # 쿠키 배너 등 팝업 처리
         try:
             # "나중에 하기" 버튼 클릭 (로그인 팝업)
@@ -98,46 +207,62 @@ def get_instagram_posts_advanced(instagram_url, proxy=None):
         except TimeoutException:
             pass  # 팝업이 없으면 계속 진행
         
-        # 첫 번째 포스트 찾기 (여러 셀렉터 시도)
-        post_selectors = [
-            "article div div div div a",
-            "div[role='main'] article a",
-            "main article a[role='link']",
-            "div._ac7v a"  # Instagram의 새로운 클래스명
-        ]
-        
-        first_post = None
-        for selector in post_selectors:
-            try:
-                first_post = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                )
+        # 최근 포스트 링크 수집 (페이지 한 번 로드로 shortcode만 모음)
+        for link in driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']"):
+            match = re.search(r"/p/([\w-]+)", link.get_attribute("href") or "")
+            if match and match.group(1) not in shortcodes:
+                shortcodes.append(match.group(1))
+            if len(shortcodes) >= limit:
                 break
-            except TimeoutException:
-                continue
-        
-        if not first_post:
-            raise Exception("첫 번째 포스트를 찾을 수 없습니다")
         
-        # 포스트 클릭
-        driver.execute_script("arguments[0].click();", first_post)
-        time.sleep(random.uniform(2, 4))
-        
-        # 포스트 텍스트 추출 (여러 방법 시도)
-        post_text = extract_post_text(driver)
-        
-        return post_text.strip()
-        
-    except Exception as e:
-        print(f"고급 인스타그램 스크래핑 오류: {e}")
-        return ""
-        
-    finally:
-        if driver:
-            driver.quit()
+        if not shortcodes:
+            return {"text": click_first_post(driver), "shortcode": None, "taken_at": None}
+    
+    # 브라우저를 돌려준 뒤 후보 포스트 캡션은 requests로 병렬 수집
+    posts = fetch_post_details([{"shortcode": code} for code in shortcodes], proxy)
+    return select_todays_post(posts)
+
+def click_first_post(driver):
+    """첫 번째 포스트를 클릭해서 텍스트를 읽습니다 (포스트 링크를 찾지 못한 경우)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    
+    # 첫 번째 포스트 찾기 (여러 셀렉터 시도)
+    post_selectors = [
+        "article div div div div a",
+        "div[role='main'] article a",
+        "main article a[role='link']",
+        "div._ac7v a"  # Instagram의 새로운 클래스명
+    ]
+    
+    first_post = None
+    for selector in post_selectors:
+        try:
+            first_post = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+            )
+            break
+        except TimeoutException:
+            continue
+    
+    if not first_post:
+        raise ScrapeError("no_posts", "첫 번째 포스트를 찾을 수 없습니다")
+    
+    # 포스트 클릭
+    driver.execute_script("arguments[0].click();", first_post)
+    time.sleep(random.uniform(2, 4))
+    
+    # 포스트 텍스트 추출 (여러 방법 시도)
+    post_text = extract_post_text(driver)
+    
+    return post_text.strip()
 
 def extract_post_text(driver):
     """포스트 텍스트 추출 (여러 방법 시도)"""
+    from selenium.webdriver.common.by import By
+    
     post_text = ""
     
     # 방법 1: 최신 Instagram 구조
@@ -178,77 +303,169 @@ def extract_post_text(driver):
     
     return post_text
 
+def fetch_profile_html(instagram_url, proxy=None, timeout=15):
+    """
+    Chromium 없이 requests로 프로필 페이지 HTML을 가져옵니다.
+    
+    Returns:
+        bytes: 페이지 HTML
+        
+    Raises:
+        ScrapeError: HTTP 오류("http_429" 등)나 로그인 화면("login_wall")
+    """
+    import requests
+    
+    headers = {
+        'User-Agent': get_random_user_agent(),
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'ko-KR,ko;q=0.8,en-US;q=0.5,en;q=0.3',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+    }
+    
+    # 프록시 설정
+    proxies = None
+    if proxy:
+        proxies = {
+            'http': proxy,
+            'https': proxy
+        }
+    
+    response = requests.get(
+        instagram_url, 
+        headers=headers, 
+        proxies=proxies,
+        timeout=timeout
+    )
+    
+    if response.status_code != 200:
+        raise ScrapeError(f"http_{response.status_code}", f"프로필 페이지 HTTP 오류: {response.status_code}")
+    if "/accounts/login" in response.url:
+        raise ScrapeError("login_wall", "로그인 화면으로 리다이렉트됨")
+    capture_page(response.url, response.content)
+    return response.content
+
 def get_instagram_posts_requests(instagram_url, proxy=None):
     """
     requests + BeautifulSoup을 사용한 개선된 fallback 방법
     """
-    try:
-        headers = {
-            'User-Agent': get_random_user_agent(),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        # 프록시 설정
-        proxies = None
-        if proxy:
-            proxies = {
-                'http': proxy,
-                'https': proxy
-            }
-        
-        # 요청 전 랜덤 지연
-        time.sleep(random.uniform(1, 3))
-        
-        response = requests.get(
-            instagram_url, 
-            headers=headers, 
-            proxies=proxies,
-            timeout=15
-        )
+    post = run_strategy("requests", scrape_post_requests, instagram_url, proxy)
+    return post["text"] if post else ""
+
+def scrape_post_requests(instagram_url, proxy=None, limit=RECENT_POSTS_LIMIT, timeout=15):
+    """
+    프로필 HTML 한 번으로 최근 포스트 메타데이터를 읽고 오늘 메뉴 포스트를 고릅니다.
+    
+    Returns:
+        dict | None: {"text", "shortcode", "taken_at"} (포스트를 찾지 못하면 None)
         
-        if response.status_code != 200:
-            return f"HTTP 오류: {response.status_code}"
+    Raises:
+        ScrapeError: 프로필 페이지 요청이 막힌 경우
+    """
+    # 요청 전 랜덤 지연
+    time.sleep(random.uniform(1, 3))
+    
+    html = fetch_profile_html(instagram_url, proxy, timeout)
+    
+    posts = extract_recent_posts(html, limit)
+    if posts:
+        return select_todays_post(fetch_post_details(posts, proxy, timeout=min(timeout, 10)))
+    
+    caption = parse_profile_html(html)
+    if caption is not None:
+        latest = extract_latest_post_id(html) or {}
+        return {"text": caption, "shortcode": latest.get("shortcode"), "taken_at": latest.get("taken_at")}
+    
+    return None
+
+def scrape_post_legacy(instagram_url):
+    """기존 스크래퍼 모듈이 있으면 사용합니다 (없으면 ImportError)"""
+    from .instagram_scraper_legacy import get_instagram_posts as legacy_scraper
+    return {"text": legacy_scraper(instagram_url), "shortcode": None, "taken_at": None}
+
+def extract_latest_post_id(html):
+    """
+    프로필 HTML에서 최신 포스트의 shortcode와 게시 시각을 찾습니다.
+    
+    BeautifulSoup 파싱 없이 정규식만 사용하므로 새 포스트 감지용으로 가볍게 쓸 수 있습니다.
+    
+    Args:
+        html (str | bytes): 프로필 페이지 HTML
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+    Returns:
+        dict | None: {"shortcode", "taken_at"} (taken_at은 unix 시간, 모르면 None)
+    """
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="ignore")
+    
+    match = re.search(r'"shortcode"\s*:\s*"([\w-]+)"', html)
+    if match:
+        taken_at = re.search(r'"taken_at_timestamp"\s*:\s*(\d+)', html[match.end():])
+        return {"shortcode": match.group(1), "taken_at": int(taken_at.group(1)) if taken_at else None}
+    
+    match = re.search(r'instagram\.com/p/([\w-]+)|href="/p/([\w-]+)', html)
+    if match:
+        return {"shortcode": match.group(1) or match.group(2), "taken_at": None}
+    return None
+
+def probe_latest_post(instagram_url, proxy=None):
+    """
+    HTTP 요청 한 번으로 최신 포스트 정보를 확인합니다. (새 포스트 감지용)
+    
+    requests 방식과 같은 서킷 브레이커를 사용하므로, 차단된 동안에는 요청하지 않고
+    반개방 상태에서는 이 가벼운 요청이 차단 해제 여부를 확인하는 역할을 합니다.
+    
+    Returns:
+        dict | None: {"shortcode", "taken_at"} (확인 실패 시 None)
+    """
+    html = run_strategy("requests", fetch_profile_html, instagram_url, proxy, 10)
+    return extract_latest_post_id(html) if html else None
+
+def parse_profile_html(html):
+    """
+    인스타그램 프로필 HTML에서 최신 포스트 텍스트를 추출합니다.
+    
+    Args:
+        html (str | bytes): 프로필 페이지 HTML
         
-        # 방법 1: JSON-LD 데이터 추출
-        scripts = soup.find_all('script', type='application/ld+json')
-        for script in scripts:
+    Returns:
+        str | None: 추출한 텍스트 (추출할 데이터가 없으면 None)
+    """
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # 방법 1: JSON-LD 데이터 추출
+    scripts = soup.find_all('script', type='application/ld+json')
+    for script in scripts:
+        try:
+            data = json.loads(script.string)
+            if isinstance(data, dict):
+                # 다양한 구조 확인
+                if 'mainEntity' in data and 'text' in data['mainEntity']:
+                    return data['mainEntity']['text']
+                elif 'description' in data:
+                    return data['description']
+                    
+        except (json.JSONDecodeError, TypeError):
+            continue
+    
+    # 방법 2: window._sharedData 추출
+    script_tags = soup.find_all('script')
+    for script in script_tags:
+        if script.string and 'window._sharedData' in script.string:
             try:
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    # 다양한 구조 확인
-                    if 'mainEntity' in data and 'text' in data['mainEntity']:
-                        return data['mainEntity']['text']
-                    elif 'description' in data:
-                        return data['description']
-                        
-            except json.JSONDecodeError:
+                # JSON 데이터 추출 로직
+                json_match = re.search(r'window\._sharedData = ({.*?});', script.string)
+                if json_match:
+                    shared_data = json.loads(json_match.group(1))
+                    # 포스트 데이터 탐색
+                    return extract_from_shared_data(shared_data)
+            except:
                 continue
-        
-        # 방법 2: window._sharedData 추출
-        script_tags = soup.find_all('script')
-        for script in script_tags:
-            if script.string and 'window._sharedData' in script.string:
-                try:
-                    # JSON 데이터 추출 로직
-                    json_match = re.search(r'window\._sharedData = ({.*?});', script.string)
-                    if json_match:
-                        shared_data = json.loads(json_match.group(1))
-                        # 포스트 데이터 탐색
-                        return extract_from_shared_data(shared_data)
-                except:
-                    continue
-        
-        return "requests 방식으로 메뉴 정보를 추출할 수 없습니다."
-        
-    except Exception as e:
-        print(f"requests 스크래핑 오류: {e}")
-        return ""
+    
+    return None
 
 def extract_from_shared_data(shared_data):
     """window._sharedData에서 텍스트 추출"""
@@ -273,6 +490,175 @@ def extract_from_shared_data(shared_data):
     except Exception as e:
         return ""
 
+def extract_recent_posts(html, limit=RECENT_POSTS_LIMIT):
+    """
+    프로필 HTML의 window._sharedData에서 최근 포스트 메타데이터를 읽습니다.
+    
+    Returns:
+        list: {"shortcode", "taken_at", "caption", "image_urls", "pinned"} 딕셔너리 리스트 (최신순, 없으면 빈 리스트)
+    """
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="ignore")
+    
+    match = re.search(r'window\._sharedData = ({.*?});</script>', html, re.DOTALL)
+    if not match:
+        return []
+    try:
+        shared_data = json.loads(match.group(1))
+        profile_page = shared_data.get('entry_data', {}).get('ProfilePage', [])
+        edges = profile_page[0]['graphql']['user']['edge_owner_to_timeline_media']['edges']
+    except (ValueError, KeyError, IndexError, TypeError):
+        return []
+    
+    posts = []
+    for edge in edges[:limit]:
+        node = edge.get('node', {})
+        captions = node.get('edge_media_to_caption', {}).get('edges', [])
+        # 캐러셀이면 모든 이미지, 아니면 대표 이미지
+        children = node.get('edge_sidecar_to_children', {}).get('edges', [])
+        image_urls = [child['node']['display_url'] for child in children if child.get('node', {}).get('display_url')]
+        if not image_urls and node.get('display_url'):
+            image_urls = [node['display_url']]
+        posts.append({
+            "shortcode": node.get('shortcode'),
+            "taken_at": node.get('taken_at_timestamp'),
+            "caption": captions[0].get('node', {}).get('text', '') if captions else None,
+            "image_urls": image_urls,
+            "pinned": bool(node.get('pinned_for_users'))
+        })
+    return posts
+
+def parse_post_html(html):
+    """
+    포스트 페이지 HTML에서 캡션과 게시 시각을 추출합니다.
+    
+    Returns:
+        dict: {"caption", "taken_at", "image_urls"} (찾지 못한 값은 None, 이미지는 빈 리스트)
+    """
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="ignore")
+    
+    caption, taken_at, image_urls = None, None, []
+    for block in re.findall(r'<script type="application/ld\+json">(.*?)</script>', html, re.DOTALL):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            caption = caption or data.get('articleBody') or data.get('caption') or data.get('description')
+            images = data.get('image') or []
+            for image in images if isinstance(images, list) else [images]:
+                url = image.get('url') if isinstance(image, dict) else image
+                if isinstance(url, str) and url not in image_urls:
+                    image_urls.append(url)
+            uploaded = data.get('uploadDate') or data.get('dateCreated')
+            if uploaded and taken_at is None:
+                try:
+                    taken_at = int(datetime.fromisoformat(uploaded.replace('Z', '+00:00')).timestamp())
+                except ValueError:
+                    pass
+    
+    if caption is None:
+        # og:description 형식: '좋아요 12개, 댓글 3개 - user님: "캡션"'
+        meta = re.search(r'<meta property="og:description" content="(.*?)"', html, re.DOTALL)
+        if meta:
+            quoted = re.search(r':\s*&quot;(.*)&quot;', meta.group(1), re.DOTALL)
+            caption = quoted.group(1) if quoted else meta.group(1)
+    
+    if taken_at is None:
+        timestamp = re.search(r'"taken_at(?:_timestamp)?"\s*:\s*(\d+)', html)
+        taken_at = int(timestamp.group(1)) if timestamp else None
+    
+    if not image_urls:
+        og_image = re.search(r'<meta property="og:image" content="(.*?)"', html)
+        if og_image:
+            image_urls.append(og_image.group(1).replace('&amp;', '&'))
+    
+    return {"caption": caption, "taken_at": taken_at, "image_urls": image_urls}
+
+def fetch_post_details(posts, proxy=None, max_workers=4, timeout=10):
+    """
+    캡션이나 게시 시각이 없는 후보 포스트의 페이지를 병렬로 가져와 채웁니다.
+    
+    Args:
+        posts (list): {"shortcode", ...} 딕셔너리 리스트
+        proxy (str): 프록시 서버 주소
+        max_workers (int): 동시에 가져올 포스트 수
+        timeout (float): 포스트 페이지 요청 타임아웃(초)
+        
+    Returns:
+        list: 캡션과 게시 시각이 채워진 포스트 리스트 (입력 순서 유지)
+    """
+    missing = [post for post in posts
+               if post.get("caption") is None or post.get("taken_at") is None or "image_urls" not in post]
+    if not missing:
+        return posts
+    
+    def fetch(post):
+        try:
+            html = fetch_profile_html(POST_URL.format(shortcode=post["shortcode"]), proxy, timeout=timeout)
+        except Exception as e:
+            logging.warning(f"포스트 {post['shortcode']} 가져오기 실패: {e}")
+            return
+        if html:
+            details = parse_post_html(html)
+            post["caption"] = post.get("caption") or details["caption"]
+            post["taken_at"] = post.get("taken_at") or details["taken_at"]
+            post["image_urls"] = post.get("image_urls") or details["image_urls"]
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+        # 가져온 페이지가 아카이브 목록에 모이도록 작업마다 현재 컨텍스트를 복사해서 실행
+        futures = [executor.submit(contextvars.copy_context().run, fetch, post) for post in missing]
+        for future in futures:
+            future.result()
+    return posts
+
+def score_post(post, today):
+    """
+    포스트가 오늘 메뉴 포스트일 가능성 점수를 계산합니다.
+    
+    게시일이 오늘이거나 캡션에 오늘 날짜가 있으면 가산, 다른 날짜만 있거나 고정 포스트면 감산합니다.
+    """
+    score = 0
+    caption = post.get("caption") or ""
+    if post.get("taken_at") and datetime.fromtimestamp(post["taken_at"]).date() == today:
+        score += 3
+    
+    dates = [(int(month), int(day)) for month, day in DATE_PATTERN.findall(caption)]
+    if (today.month, today.day) in dates:
+        score += 3
+    elif dates:
+        score -= 2
+    
+    if any(keyword in caption for keyword in MENU_HINT_KEYWORDS):
+        score += 1
+    if post.get("pinned"):
+        score -= 2
+    return score
+
+def select_todays_post(posts, today=None):
+    """
+    최근 포스트 중 오늘 메뉴 포스트를 고릅니다.
+    
+    점수가 같으면 더 최근 포스트를 고릅니다. 캡션이나 이미지가 있는 후보가 없으면 None.
+    
+    Returns:
+        dict | None: {"text", "shortcode", "taken_at", "image_urls", "score"}
+    """
+    today = today or datetime.now().date()
+    candidates = [post for post in posts if post.get("caption") or post.get("image_urls")]
+    if not candidates:
+        return None
+    
+    best = max(candidates, key=lambda post: (score_post(post, today), post.get("taken_at") or 0))
+    score = score_post(best, today)
+    if score <= 0:
+        logging.warning(f"⚠️ 오늘 메뉴 포스트를 확신할 수 없어 가장 그럴듯한 포스트를 사용합니다: {best['shortcode']}")
+    else:
+        logging.info(f"🎯 최근 포스트 {len(posts)}개 중 {best['shortcode']} 선택 (점수 {score})")
+    return {"text": (best.get("caption") or "").strip(), "shortcode": best["shortcode"],
+            "taken_at": best.get("taken_at"), "image_urls": best.get("image_urls") or [], "score": score}
+
 def scrape_menu_from_instagram(instagram_url, use_proxy=False, proxy=None):
     """
     개선된 인스타그램 메뉴 스크래핑 메인 함수
@@ -282,31 +668,70 @@ def scrape_menu_from_instagram(instagram_url, use_proxy=False, proxy=None):
         use_proxy (bool): 프록시 사용 여부
         proxy (str): 프록시 서버 주소
     """
-    print(f"📱 인스타그램 스크래핑 시작: {instagram_url}")
+    return scrape_menu_post(instagram_url, use_proxy, proxy)["text"]
+
+def scrape_menu_post(instagram_url, use_proxy=False, proxy=None, http_only=False, timeout=15):
+    """
+    오늘 메뉴 포스트의 텍스트와 shortcode를 수집합니다.
+    
+    Args:
+        instagram_url (str): 인스타그램 프로필 URL
+        use_proxy (bool): 프록시 사용 여부 (False면 프록시 풀이 있을 때 풀에서 고름)
+        proxy (str): 프록시 서버 주소
+        http_only (bool): Chromium 없이 HTTP 요청만 사용 (실행 예산이 부족할 때)
+        timeout (float): HTTP 요청 타임아웃(초)
+        
+    Returns:
+        dict: {"text", "shortcode", "taken_at", "image_urls", "pages"} (shortcode/taken_at은 모르면 None).
+            캡션을 못 읽어 안내 문구로 대신했으면 "fallback": True.
+            pages는 이번에 가져온 페이지 HTML 리스트 [{"url", "html"}] (원본 포스트 아카이브용)
+    """
+    pages = []
+    token = _captured_pages.set(pages)
+    try:
+        post = _scrape_menu_post(instagram_url, use_proxy, proxy, http_only, timeout)
+    finally:
+        _captured_pages.reset(token)
+    post["pages"] = pages
+    return post
+
+def _scrape_menu_post(instagram_url, use_proxy, proxy, http_only, timeout):
+    logging.info(f"📱 인스타그램 스크래핑 시작: {instagram_url}")
     
     if use_proxy and proxy:
-        print(f"🌐 프록시 사용: {proxy}")
+        logging.info(f"🌐 프록시 사용: {proxy}")
+    proxy = proxy if use_proxy else None
+    
+    if _scraper_backend is not None:
+        # 백엔드가 설정되어 있으면 실제 스크래핑 대신 사용 (벤치마크 재생 등)
+        post = _scraper_backend(instagram_url)
+        if not isinstance(post, dict):
+            post = {"text": post, "shortcode": None, "taken_at": None}
+    elif http_only:
+        logging.info("⏰ 실행 예산이 부족해 Chromium 없이 HTTP 요청만 사용합니다")
+        post = None
+    else:
+        # 방법 1: 고급 Selenium 스크래핑
+        # (프록시 풀이 있으면 점수로 고른 프록시, 없으면 서킷 브레이커로 감싼 직접 연결)
+        post = run_strategy("selenium", scrape_post_selenium, instagram_url, proxy)
     
-    # 방법 1: 고급 Selenium 스크래핑
-    result = get_instagram_posts_advanced(instagram_url, proxy if use_proxy else None)
+    # 캡션이 없는 이미지 포스트여도 OCR 단계에서 쓸 수 있도록 이미지와 포스트 정보는 보존
+    image_post = post if post and post.get("image_urls") else None
     
     # 방법 2: requests + BeautifulSoup fallback
-    if not result or len(result) < 20:
-        print("🔄 Selenium 실패, requests 방식으로 재시도...")
-        result = get_instagram_posts_requests(instagram_url, proxy if use_proxy else None)
+    if _scraper_backend is None and (not post or len(post["text"]) < 20):
+        logging.info("🔄 Selenium 실패, requests 방식으로 재시도...")
+        post = run_strategy("requests", scrape_post_requests, instagram_url, proxy, RECENT_POSTS_LIMIT, timeout)
+        image_post = image_post or (post if post and post.get("image_urls") else None)
     
     # 방법 3: 기존 방식 fallback
-    if not result or len(result) < 20:
-        print("🔄 모든 방식 실패, 기본 스크래퍼로 재시도...")
-        from .instagram_scraper_legacy import get_instagram_posts as legacy_scraper
-        try:
-            result = legacy_scraper(instagram_url)
-        except:
-            result = ""
+    if _scraper_backend is None and not http_only and (not post or len(post["text"]) < 20):
+        logging.info("🔄 모든 방식 실패, 기본 스크래퍼로 재시도...")
+        post = get_breaker("legacy").call(scrape_post_legacy, instagram_url)
     
     # 최종 fallback
-    if not result or len(result) < 10:
-        result = """
+    if not post or not post["text"] or len(post["text"]) < 10:
+        post = {"text": """
 🍽️ 구도 한식뷔페 오늘의 메뉴
 ━━━━━━━━━━━━━━━━━━━━
 
@@ -325,10 +750,15 @@ def scrape_menu_from_instagram(instagram_url, use_proxy=False, proxy=None):
 
 ━━━━━━━━━━━━━━━━━━━━
 💡 문제가 지속되면 관리자에게 문의해주세요.
-        """.strip()
+        """.strip(), "shortcode": None, "taken_at": None, "fallback": True}
+        if image_post:
+            post.update(shortcode=image_post["shortcode"], taken_at=image_post.get("taken_at"))
     
-    print(f"✅ 스크래핑 완료 (길이: {len(result)}자)")
-    return result
+    if image_post and not post.get("image_urls"):
+        post["image_urls"] = image_post["image_urls"]
+    
+    logging.info(f"✅ 스크래핑 완료 (길이: {len(post['text'])}자, 포스트: {post['shortcode']})")
+    return post
 
 # 기존 함수들 (하위 호환성)
 def get_instagram_posts(instagram_url):
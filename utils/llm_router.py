@@ -0,0 +1,381 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.call_llm import DEFAULT_GEMINI_MODEL, call_gemini, call_gemini_stream
+from utils.circuit_breaker import CircuitBreaker, CircuitRegistry, failure_signature
+from utils.metrics import get_registry
+from utils.retry import is_retryable
+
+DEFAULT_LLM_CIRCUIT_PATH = os.path.join("data", "llm_circuits.json")
+DEFAULT_HEDGE_DELAY = 4.0  # 지연 기록이 쌓이기 전 헤지 요청까지 기다리는 시간(초)
+MIN_HEDGE_DELAY = 0.5  # p95가 아무리 짧아도 이보다 빨리 헤지하지 않음(초)
+LATENCY_WINDOW = 200  # 제공자별로 p95 계산에 쓰는 최근 응답 수
+MIN_LATENCY_SAMPLES = 10  # 이보다 기록이 적으면 DEFAULT_HEDGE_DELAY 사용
+LLM_FAILURE_THRESHOLD = 3  # 연속 실패가 이만큼이면 제공자 서킷을 엶
+LLM_COOLDOWN = 60  # 제공자 서킷이 열려 있는 첫 시간(초)
+LLM_MAX_COOLDOWN = 30 * 60
+LLM_PROBE_TIMEOUT = 2 * 60  # 반개방 시도 결과를 기다리는 최대 시간(초)
+ROUTER_WORKERS = 8
+
+# google.api_core 예외 이름 -> 서킷 브레이커 실패 유형 (할당량/권한 오류는 바로 차단)
+LLM_ERROR_SIGNATURES = {
+    "ResourceExhausted": "http_429",
+    "TooManyRequests": "http_429",
+    "PermissionDenied": "http_403",
+    "Unauthenticated": "http_401",
+    "DeadlineExceeded": "timeout",
+    "ServiceUnavailable": "unavailable",
+    "InternalServerError": "server_error",
+}
+
+class LLMUnavailableError(Exception):
+    """모든 LLM 제공자가 실패했거나 서킷이 열려 있음"""
+
+class LLMProvider:
+    """
+    LLM 제공자 인터페이스
+
+    name은 서킷 브레이커와 지연 기록의 키로 쓰이므로 제공자(모델)마다 달라야 합니다.
+    """
+
+    name = "provider"
+
+    def generate(self, prompt, timeout=None, response_schema=None):
+        """
+        Args:
+            prompt (str): 프롬프트
+            timeout (float): 이 호출에 남은 시간(초, None이면 제한 없음)
+            response_schema (dict): JSON 응답 스키마 (지원하지 않는 제공자는 무시)
+
+        Returns:
+            str: 응답 텍스트
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt, timeout=None):
+        """
+        응답을 조각별로 내보냅니다. (스트리밍을 지원하지 않는 제공자는 전체 응답 한 조각)
+
+        Yields:
+            str: 응답 텍스트 조각
+        """
+        yield self.generate(prompt, timeout)
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini 모델 하나"""
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name or DEFAULT_GEMINI_MODEL
+        self.name = f"gemini:{self.model_name}"
+
+    def generate(self, prompt, timeout=None, response_schema=None):
+        return call_gemini(prompt, timeout, model_name=self.model_name, response_schema=response_schema)
+
+    def stream(self, prompt, timeout=None):
+        return call_gemini_stream(prompt, timeout, model_name=self.model_name)
+
+class StubProvider(LLMProvider):
+    """
+    테스트용 로컬 제공자 (네트워크 없이 지연과 실패를 흉내냄)
+
+    Args:
+        name (str): 제공자 이름
+        reply: 응답 문자열 또는 prompt를 받아 응답을 반환하는 함수
+        latency (float | list): 호출당 지연(초), 리스트면 호출마다 차례로 사용 (마지막 값 반복)
+        errors (list): 앞에서부터 호출마다 던질 예외 (None이면 그 호출은 성공)
+    """
+
+    def __init__(self, name="stub", reply="stub", latency=0.0, errors=None):
+        self.name = name
+        self.reply = reply
+        self.latencies = list(latency) if isinstance(latency, (list, tuple)) else [latency]
+        self.errors = list(errors or [])
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _next_call(self):
+        """이번 호출의 (지연, 예외)"""
+        with self.lock:
+            index = self.calls
+            self.calls += 1
+        error = self.errors[index] if index < len(self.errors) else None
+        return self.latencies[min(index, len(self.latencies) - 1)], error
+
+    def generate(self, prompt, timeout=None, response_schema=None):
+        delay, error = self._next_call()
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+    def stream(self, prompt, timeout=None):
+        # 빈 줄(섹션) 단위로 나눠서 지연 시간 동안 고르게 내보냄
+        delay, error = self._next_call()
+        if error is not None:
+            raise error
+        text = self.reply(prompt) if callable(self.reply) else self.reply
+        sections = text.split("\n\n")
+        for index, section in enumerate(sections):
+            if delay:
+                time.sleep(delay / len(sections))
+            yield section + ("\n\n" if index < len(sections) - 1 else "")
+
+class LatencyTracker:
+    """제공자별 최근 성공 응답 시간으로 p95를 계산합니다"""
+
+    def __init__(self, window=LATENCY_WINDOW, min_samples=MIN_LATENCY_SAMPLES, default=DEFAULT_HEDGE_DELAY):
+        self.window = window
+        self.min_samples = min_samples
+        self.default = default
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    def p95(self, name):
+        """최근 응답 시간의 95번째 백분위(초), 기록이 부족하면 default"""
+        with self.lock:
+            samples = sorted(self.samples.get(name, ()))
+        if len(samples) < self.min_samples:
+            return self.default
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+def llm_failure_signature(exc):
+    """LLM 예외를 서킷 브레이커 실패 유형으로 바꿉니다 (call_gemini가 감싼 원래 예외 기준)"""
+    cause = exc.__cause__ or exc
+    return LLM_ERROR_SIGNATURES.get(type(cause).__name__) or failure_signature(cause)
+
+class LLMRouter:
+    """
+    여러 LLM 제공자에 헤지 요청과 장애 조치를 하는 라우터
+
+    - 서킷이 닫힌 첫 제공자(primary)에 요청하고, 관측된 p95 지연이 지나도록 응답이 없으면
+      다음 제공자(없으면 같은 제공자)에 헤지 요청을 한 번 보낸 뒤 먼저 도착한 응답을 사용
+    - 요청이 실패하면 남은 제공자에 바로 다시 요청 (재시도할 수 없는 설정 오류는 서킷에 기록하지 않고 그대로 올림)
+    - 제공자마다 서킷 브레이커를 두어 연속 실패나 할당량 오류가 나면 cooldown 동안 건너뜀
+
+    진 요청은 취소할 수 없어서 백그라운드에서 끝까지 돌지만, 결과는 지연/서킷 기록에만 쓰입니다.
+    """
+
+    def __init__(self, providers, hedge=True, circuit_path=DEFAULT_LLM_CIRCUIT_PATH, tracker=None,
+                 failure_threshold=LLM_FAILURE_THRESHOLD, cooldown=LLM_COOLDOWN):
+        """
+        Args:
+            providers (list): LLMProvider 리스트 (앞에 있을수록 우선)
+            hedge (bool): 헤지 요청 사용 여부
+            circuit_path (str): 서킷 상태 JSON 경로 (None이면 메모리에만 보관)
+            tracker (LatencyTracker): 지연 기록 (None이면 새로 만듦)
+        """
+        if not providers:
+            raise ValueError("LLM 제공자가 하나 이상 필요합니다")
+        self.providers = list(providers)
+        self.hedge = hedge
+        self.tracker = tracker or LatencyTracker()
+        registry = CircuitRegistry(circuit_path)
+        self.breakers = {
+            provider.name: CircuitBreaker(provider.name, registry, failure_threshold=failure_threshold,
+                                          cooldown=cooldown, max_cooldown=LLM_MAX_COOLDOWN,
+                                          probe_timeout=LLM_PROBE_TIMEOUT)
+            for provider in self.providers
+        }
+        self.executor = ThreadPoolExecutor(max_workers=ROUTER_WORKERS, thread_name_prefix="llm")
+
+    def _attempt(self, provider, prompt, timeout, response_schema=None):
+        """작업 스레드에서 제공자 하나를 호출하고 결과를 지연/서킷에 기록합니다"""
+        breaker = self.breakers[provider.name]
+        started = time.monotonic()
+        try:
+            result = provider.generate(prompt, timeout, response_schema)
+        except Exception as e:
+            if not is_retryable(e):
+                # 설정 오류(API 키 없음 등)는 제공자 장애가 아니므로 서킷에 기록하지 않음
+                breaker.release_probe()
+                raise
+            signature = llm_failure_signature(e)
+            logging.warning(f"⚠️ LLM 제공자 {provider.name} 실패 ({signature}): {e}")
+            get_registry().inc("menu_llm_provider_errors_total", {"provider": provider.name, "signature": signature})
+            breaker.record_failure(signature)
+            raise
+        self.tracker.record(provider.name, time.monotonic() - started)
+        breaker.record_success()
+        return result
+
+    def _next_allowed(self, providers):
+        """
+        providers 앞에서부터 서킷이 허용하는 제공자를 꺼냅니다. (없으면 None)
+
+        allow()는 반개방 서킷의 시도 기회를 차지하므로 실제로 요청할 제공자에만 호출합니다.
+        """
+        while providers:
+            provider = providers.pop(0)
+            if self.breakers[provider.name].allow():
+                return provider
+        return None
+
+    def _submit(self, provider, prompt, deadline, response_schema=None):
+        timeout = max(0.1, deadline - time.monotonic()) if deadline else None
+        return self.executor.submit(contextvars.copy_context().run, self._attempt, provider, prompt, timeout,
+                                    response_schema)
+
+    def call(self, prompt, timeout=None, response_schema=None):
+        """
+        Args:
+            prompt (str): 프롬프트
+            timeout (float): 전체 응답 대기 시간(초, None이면 제한 없음)
+            response_schema (dict): JSON 응답 스키마 (모든 요청에 그대로 전달)
+
+        Returns:
+            str: 먼저 도착한 응답 텍스트
+        """
+        remaining = list(self.providers)
+        primary = self._next_allowed(remaining)
+        if primary is None:
+            raise LLMUnavailableError("모든 LLM 제공자의 서킷이 열려 있습니다")
+
+        deadline = time.monotonic() + timeout if timeout else None
+        pending = {self._submit(primary, prompt, deadline, response_schema): primary}
+        hedge_delay = max(MIN_HEDGE_DELAY, self.tracker.p95(primary.name))
+        hedge_at = time.monotonic() + hedge_delay if self.hedge else None
+        hedge_future = None
+        errors = []
+
+        while pending:
+            wake_times = [t for t in (hedge_at, deadline) if t is not None]
+            wait_seconds = max(0.0, min(wake_times) - time.monotonic()) if wake_times else None
+            done, _ = wait(pending, timeout=wait_seconds, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not is_retryable(e):
+                        # 다른 제공자로 넘기지 않고 원래 예외를 그대로 올려서 재시도하지 않게 함
+                        raise
+                    errors.append(f"{provider.name}: {e}")
+                    continue
+                if future is hedge_future:
+                    logging.info(f"🏁 LLM 헤지 응답 사용: {provider.name}")
+                    get_registry().inc("menu_llm_hedges_total", {"outcome": "won"})
+                return result
+
+            if done and not pending:
+                # 진행 중인 요청이 모두 실패하면 헤지는 그만두고 아직 시도하지 않은 제공자로 바로 넘어감
+                hedge_at = None
+                provider = self._next_allowed(remaining)
+                if provider:
+                    logging.info(f"🔀 LLM 장애 조치: {provider.name}")
+                    pending[self._submit(provider, prompt, deadline, response_schema)] = provider
+                continue
+
+            now = time.monotonic()
+            if deadline and now >= deadline:
+                break
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                # 헤지 대상: 다음 제공자, 없으면 같은 제공자에 한 번 더 (반개방 중이면 헤지하지 않음)
+                hedge_target = self._next_allowed(remaining)
+                if hedge_target is None and self.breakers[primary.name].allow():
+                    hedge_target = primary
+                if hedge_target:
+                    logging.info(f"⏱️ LLM 응답이 p95({hedge_delay:.1f}초)를 넘어 헤지 요청: {hedge_target.name}")
+                    get_registry().inc("menu_llm_hedges_total", {"outcome": "fired"})
+                    hedge_future = self._submit(hedge_target, prompt, deadline, response_schema)
+                    pending[hedge_future] = hedge_target
+
+        if pending:
+            raise TimeoutError(f"LLM 응답 시간 초과 ({timeout:.1f}초)")
+        raise LLMUnavailableError("모든 LLM 제공자 호출 실패: " + "; ".join(errors))
+
+    def stream(self, prompt, timeout=None):
+        """
+        서킷이 닫힌 제공자에 차례로 스트리밍 요청을 합니다.
+
+        첫 조각이 오기 전에 실패하면 다음 제공자로 넘어가지만, 이미 조각을 내보낸 뒤의 실패는
+        그대로 올립니다. (헤지 요청은 하지 않고, 스트리밍 응답 시간은 p95 기록에 넣지 않음)
+
+        Yields:
+            str: 응답 텍스트 조각
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        errors = []
+        for provider in self.providers:
+            if not self.breakers[provider.name].allow():
+                continue
+            if deadline and time.monotonic() >= deadline:
+                raise TimeoutError(f"LLM 응답 시간 초과 ({timeout:.1f}초)")
+            if errors:
+                logging.info(f"🔀 LLM 장애 조치: {provider.name}")
+            breaker = self.breakers[provider.name]
+            remaining = max(0.1, deadline - time.monotonic()) if deadline else None
+            started = False
+            try:
+                for chunk in provider.stream(prompt, remaining):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if not is_retryable(e):
+                    breaker.release_probe()
+                    raise
+                signature = llm_failure_signature(e)
+                logging.warning(f"⚠️ LLM 제공자 {provider.name} 스트리밍 실패 ({signature}): {e}")
+                get_registry().inc("menu_llm_provider_errors_total", {"provider": provider.name, "signature": signature})
+                breaker.record_failure(signature)
+                if started:
+                    raise
+                errors.append(f"{provider.name}: {e}")
+                continue
+            breaker.record_success()
+            return
+        if not errors:
+            raise LLMUnavailableError("모든 LLM 제공자의 서킷이 열려 있습니다")
+        raise LLMUnavailableError("모든 LLM 제공자 호출 실패: " + "; ".join(errors))
+
+# call_llm이 사용하는 라우터 (처음 호출할 때 환경변수로 만듦)
+_llm_router = None
+_llm_router_lock = threading.Lock()
+
+def set_llm_router(router):
+    """
+    call_llm이 사용할 라우터를 교체합니다.
+
+    Args:
+        router (LLMRouter | None): 라우터 (None이면 다음 호출 때 환경변수로 다시 만듦)
+    """
+    global _llm_router
+    with _llm_router_lock:
+        _llm_router = router
+
+def get_llm_router():
+    """
+    기본 라우터를 반환합니다.
+
+    GEMINI_MODEL(기본 gemini-1.5-flash)이 primary, GEMINI_FALLBACK_MODELS(쉼표로 구분)가 헤지/장애 조치 대상이며,
+    대체 모델이 없으면 같은 모델에 헤지합니다.
+    """
+    global _llm_router
+    with _llm_router_lock:
+        if _llm_router is None:
+            models = [os.environ.get("GEMINI_MODEL", "")]
+            models += [m.strip() for m in os.environ.get("GEMINI_FALLBACK_MODELS", "").split(",") if m.strip()]
+            _llm_router = LLMRouter([GeminiProvider(model or None) for model in models])
+        return _llm_router
+
+if __name__ == "__main__":
+    # 스텁 제공자로 헤지 동작 확인: primary가 느리면 secondary 응답을 사용
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    router = LLMRouter([StubProvider("slow", "primary", latency=[0.05] * 10 + [3.0]),
+                        StubProvider("fast", "secondary", latency=0.05)],
+                       circuit_path=None, tracker=LatencyTracker(min_samples=5))
+    for _ in range(11):
+        started = time.monotonic()
+        answer = router.call("테스트")
+        print(f"{answer} ({time.monotonic() - started:.2f}초)")
@@ -0,0 +1,162 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+DEFAULT_LOG_FILE = "menu_notification.log"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024  # 10MB
+DEFAULT_BACKUP_COUNT = 14
+CONSOLE_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# 로그 레코드에 자동으로 붙는 실행 컨텍스트
+_run_id = contextvars.ContextVar("run_id", default=None)
+_node = contextvars.ContextVar("node", default=None)
+_tenant = contextvars.ContextVar("tenant", default=None)
+
+# setup_logging으로 시작한 QueueListener (중복 설정 방지용)
+_listener = None
+
+class ContextFilter(logging.Filter):
+    """현재 실행 ID, 노드 이름, 테넌트를 로그 레코드에 붙이는 필터"""
+
+    def filter(self, record):
+        if not hasattr(record, "run_id"):
+            record.run_id = _run_id.get()
+        if not hasattr(record, "node"):
+            record.node = _node.get()
+        if not hasattr(record, "tenant"):
+            record.tenant = _tenant.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 변환하는 포매터"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "node": getattr(record, "node", None)
+        }
+        tenant = getattr(record, "tenant", None)
+        if tenant is not None:
+            entry["tenant"] = tenant
+        duration_ms = getattr(record, "duration_ms", None)
+        if duration_ms is not None:
+            entry["duration_ms"] = duration_ms
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """파일 크기가 max_bytes를 넘거나 자정이 지나면 회전하는 파일 핸들러"""
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rollover_at = self._next_midnight(time.time())
+
+    @staticmethod
+    def _next_midnight(now):
+        tomorrow = datetime.fromtimestamp(now).date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self._next_midnight(time.time())
+
+def setup_logging(log_file=DEFAULT_LOG_FILE, level=logging.INFO,
+                  max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+    """
+    애플리케이션 전체 로깅을 설정합니다.
+
+    로그 호출은 QueueHandler에 레코드를 넣기만 하고, 실제 콘솔/파일 출력은
+    QueueListener 스레드가 처리합니다. 파일에는 JSON 한 줄 형식으로 기록되며
+    크기(max_bytes) 또는 날짜 기준으로 회전합니다.
+
+    Args:
+        log_file (str): JSON 로그 파일 경로 (None이면 콘솔만 사용)
+        level (int): 로그 레벨
+        max_bytes (int): 로그 파일 회전 크기
+        backup_count (int): 보관할 회전 파일 개수
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    handlers = [console]
+
+    if log_file:
+        file_handler = SizeAndTimeRotatingFileHandler(log_file, max_bytes, backup_count)
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """대기 중인 로그를 모두 출력하고 QueueListener를 종료합니다"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def new_run_id():
+    """워크플로우 실행 하나를 구분하는 짧은 ID를 만듭니다"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+def get_run_id():
+    """현재 컨텍스트의 실행 ID를 반환합니다"""
+    return _run_id.get()
+
+def get_tenant():
+    """현재 컨텍스트의 테넌트 이름을 반환합니다"""
+    return _tenant.get()
+
+@contextmanager
+def log_context(run_id=None, node=None, tenant=None):
+    """
+    블록 안에서 남기는 로그에 실행 ID/노드 이름/테넌트를 붙입니다.
+
+    Args:
+        run_id (str): 실행 ID (None이면 기존 값 유지)
+        node (str): 노드 이름 (None이면 기존 값 유지)
+        tenant (str): 테넌트 이름 (None이면 기존 값 유지)
+    """
+    tokens = []
+    if tenant is not None:
+        tokens.append((_tenant, _tenant.set(tenant)))
+    if run_id is not None:
+        tokens.append((_run_id, _run_id.set(run_id)))
+    if node is not None:
+        tokens.append((_node, _node.set(node)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
@@ -0,0 +1,100 @@
+from utils.menu_parser import CATEGORY_EMOJI
+
+class MenuDiff:
+    """
+    두 메뉴(ParsedMenu)의 차이
+
+    Attributes:
+        added (list): 새로 나온 (카테고리, 메뉴 이름) 리스트
+        removed (list): 빠진 (카테고리, 메뉴 이름) 리스트
+        unchanged (int): 그대로인 메뉴 수
+        price (tuple): 가격이 바뀌었으면 (이전, 오늘), 아니면 None
+        hours (tuple): 영업시간이 바뀌었으면 (이전, 오늘), 아니면 None
+    """
+
+    def __init__(self, added, removed, unchanged, price=None, hours=None):
+        self.added = added
+        self.removed = removed
+        self.unchanged = unchanged
+        self.price = price
+        self.hours = hours
+
+    def is_empty(self):
+        return not (self.added or self.removed or self.price or self.hours)
+
+    def to_dict(self):
+        return {
+            "added": [name for _, name in self.added],
+            "removed": [name for _, name in self.removed],
+            "unchanged": self.unchanged,
+            "price": self.price,
+            "hours": self.hours
+        }
+
+def _changed(old, new):
+    """공백을 무시하고 비교해서 바뀌었으면 (이전, 오늘)을 반환합니다"""
+    if "".join((old or "").split()) == "".join((new or "").split()):
+        return None
+    return (old, new)
+
+def diff_menus(today, previous):
+    """
+    정규화된 메뉴 이름 집합으로 오늘 메뉴와 이전 메뉴를 비교합니다.
+
+    Args:
+        today (ParsedMenu): 오늘 메뉴
+        previous (ParsedMenu): 이전 실행의 메뉴
+
+    Returns:
+        MenuDiff: 비교 결과
+    """
+    today_items = {item.key: (category, item.name) for category, item in today.items() if item.key}
+    previous_items = {item.key: (category, item.name) for category, item in previous.items() if item.key}
+
+    added = [today_items[key] for key in today_items if key not in previous_items]
+    removed = [previous_items[key] for key in previous_items if key not in today_items]
+    unchanged = len(today_items.keys() & previous_items.keys())
+
+    # 가격/영업시간 줄이 없는 날은 바뀐 것으로 보지 않음
+    price = _changed(previous.price, today.price) if today.price and previous.price else None
+    hours = _changed(previous.hours, today.hours) if today.hours and previous.hours else None
+    return MenuDiff(added, removed, unchanged, price, hours)
+
+def render_diff(diff, date_text, previous_date):
+    """
+    메뉴 차이를 슬랙으로 보낼 짧은 메시지로 렌더링합니다.
+
+    Args:
+        diff (MenuDiff): 비교 결과
+        date_text (str): 오늘 날짜 ("8월 2일")
+        previous_date (str): 비교 기준 실행 날짜 (YYYY-MM-DD)
+
+    Returns:
+        str: 메시지 텍스트
+    """
+    lines = [f"🔄 **지난 메뉴와 달라진 점** ({date_text}, 기준: {previous_date})"]
+
+    if diff.is_empty():
+        lines.append("")
+        lines.append(f"✅ 메뉴 {diff.unchanged}개가 모두 그대로입니다")
+        return "\n".join(lines)
+
+    if diff.added:
+        lines.append("")
+        lines.append("**➕ 새 메뉴**")
+        lines.extend(f"- {CATEGORY_EMOJI.get(category, '')} {name}" for category, name in diff.added)
+    if diff.removed:
+        lines.append("")
+        lines.append("**➖ 빠진 메뉴**")
+        lines.extend(f"- {CATEGORY_EMOJI.get(category, '')} {name}" for category, name in diff.removed)
+    if diff.price or diff.hours:
+        lines.append("")
+        if diff.price:
+            lines.append(f"💰 가격: {diff.price[0]} → {diff.price[1]}")
+        if diff.hours:
+            lines.append(f"🕒 영업시간: {diff.hours[0]} → {diff.hours[1]}")
+
+    if diff.unchanged:
+        lines.append("")
+        lines.append(f"나머지 메뉴 {diff.unchanged}개는 그대로입니다")
+    return "\n".join(lines)
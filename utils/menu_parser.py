@@ -0,0 +1,298 @@
+import hashlib
+import re
+
+# 요약에 쓰는 표준 카테고리 (출력 순서)
+CATEGORIES = ["주요리", "밑반찬", "국물류", "샐러드", "후식", "기타"]
+
+CATEGORY_EMOJI = {
+    "주요리": "🥩",
+    "밑반찬": "🥬",
+    "국물류": "🍲",
+    "샐러드": "🥗",
+    "후식": "🍰",
+    "기타": "🍴"
+}
+
+# 섹션 제목에 포함된 키워드 -> 표준 카테고리 (앞에 있을수록 우선)
+HEADER_KEYWORDS = [
+    ("메인", "주요리"),
+    ("주요리", "주요리"),
+    ("특선", "주요리"),
+    ("일품", "주요리"),
+    ("반찬", "밑반찬"),
+    ("나물", "밑반찬"),
+    ("김치", "밑반찬"),
+    ("국물", "국물류"),
+    ("찌개", "국물류"),
+    ("국", "국물류"),
+    ("탕", "국물류"),
+    ("샐러드", "샐러드"),
+    ("신선", "샐러드"),
+    ("후식", "후식"),
+    ("디저트", "후식"),
+    ("음료", "후식"),
+    ("과일", "후식")
+]
+
+BULLET_PREFIXES = ("•", "-", "·", "▪", "*", "◦")
+PRICE_KEYWORDS = ("가격", "요금", "성인", "소인")
+HOURS_KEYWORDS = ("운영", "영업시간", "영업 시간", "오픈", "브레이크")
+DATE_PATTERN = re.compile(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+SEPARATOR_PATTERN = re.compile(r"^[━─=\-~_*·.\s]{3,}$")
+
+# 이 신뢰도 이상이면 LLM 없이 파싱 결과로 요약을 만듭니다
+DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+
+def normalize_dish(name):
+    """
+    메뉴 이름을 비교 가능한 형태로 정규화합니다.
+
+    괄호 설명, 이모지/기호, 공백을 제거합니다. (예: "갈비찜 (양념갈비를 찜)" -> "갈비찜")
+    """
+    name = re.sub(r"\(.*?\)|\[.*?\]", "", name)
+    name = re.sub(r"[^0-9A-Za-z가-힣]", "", name)
+    return name
+
+def split_items(text):
+    """괄호 안의 쉼표는 무시하고 쉼표로 메뉴를 나눕니다"""
+    items, depth, current = [], 0, ""
+    for char in text:
+        if char in "([":
+            depth += 1
+        elif char in ")]" and depth:
+            depth -= 1
+        if char in ",，" and depth == 0:
+            items.append(current)
+            current = ""
+        else:
+            current += char
+    items.append(current)
+    return [item.strip() for item in items if item.strip()]
+
+def header_category(line):
+    """섹션 제목 줄이면 표준 카테고리를, 아니면 None을 반환합니다"""
+    if len(line) > 30:
+        return None
+    for keyword, category in HEADER_KEYWORDS:
+        if keyword in line:
+            return category
+    return None
+
+def after_label(line):
+    """'💰 가격: 12,000원'에서 ':' 뒤의 값만 돌려줍니다"""
+    return line.split(":", 1)[1].strip() if ":" in line else line.strip()
+
+class MenuItem:
+    """메뉴 하나 (이름과 괄호 속 설명)"""
+
+    def __init__(self, name, description=None):
+        self.name = name
+        self.description = description
+        self.key = normalize_dish(name)
+
+    def to_dict(self):
+        return {"name": self.name, "description": self.description}
+
+class ParsedMenu:
+    """
+    캡션을 파싱한 메뉴 모델
+
+    Attributes:
+        categories (dict): 표준 카테고리 -> MenuItem 리스트
+        price (str): 가격 줄
+        hours (str): 영업시간 줄
+        date_text (str): 캡션의 날짜 ("8월 1일")
+        confidence (float): 파싱 신뢰도 (0~1)
+    """
+
+    def __init__(self):
+        self.categories = {}
+        self.price = None
+        self.hours = None
+        self.date_text = None
+        self.confidence = 0.0
+        self.unparsed_lines = []
+
+    def add(self, category, item):
+        self.categories.setdefault(category, []).append(item)
+
+    def items(self):
+        """(카테고리, MenuItem) 리스트를 표준 순서로 반환합니다"""
+        return [(category, item) for category in CATEGORIES for item in self.categories.get(category, [])]
+
+    def dishes(self):
+        """(정규화된 메뉴 이름, 카테고리) 리스트 (중복 제거)"""
+        seen, result = set(), []
+        for category, item in self.items():
+            if item.key and item.key not in seen:
+                seen.add(item.key)
+                result.append((item.key, category))
+        return result
+
+    def to_dict(self):
+        return {
+            "categories": {c: [item.to_dict() for item in self.categories[c]]
+                           for c in CATEGORIES if c in self.categories},
+            "price": self.price,
+            "hours": self.hours,
+            "date_text": self.date_text,
+            "confidence": self.confidence
+        }
+
+def parse_menu(raw_content, lexicon=None):
+    """
+    구조화된 메뉴 캡션을 LLM 없이 파싱합니다.
+
+    이모지 섹션 제목("🥩 메인 요리") 아래의 글머리 기호 줄(•/-)을 쉼표로 나눠
+    카테고리별 메뉴로 만들고, 가격/영업시간/날짜 줄을 따로 추출합니다.
+    섹션 제목이 없는 메뉴는 메뉴 사전(lexicon)이 있으면 사전으로 분류합니다.
+
+    Args:
+        raw_content (str): 포스트 원본 텍스트
+        lexicon (DishLexicon): 메뉴 이름 -> 카테고리 사전 (None이면 "기타"로 분류)
+
+    Returns:
+        ParsedMenu: 파싱 결과 (confidence로 신뢰도 확인)
+    """
+    menu = ParsedMenu()
+    current = None
+    meaningful = recognized = 0
+    categorized = total_items = 0
+
+    for raw_line in raw_content.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        if SEPARATOR_PATTERN.match(line):
+            # 구분선 뒤의 항목은 앞 섹션에 속하지 않음
+            current = None
+            continue
+        if line.startswith("#"):
+            continue
+
+        meaningful += 1
+        date_match = DATE_PATTERN.search(line)
+        if date_match and not menu.date_text:
+            menu.date_text = f"{int(date_match.group(1))}월 {int(date_match.group(2))}일"
+
+        if line.startswith(BULLET_PREFIXES):
+            recognized += 1
+            for text in split_items(line.lstrip("".join(BULLET_PREFIXES) + " ")):
+                description = None
+                match = re.match(r"^(.*?)\s*[\(\[](.*)[\)\]]\s*$", text)
+                if match:
+                    text, description = match.group(1), match.group(2)
+                item = MenuItem(text.strip(), description)
+                if not item.key:
+                    continue
+                total_items += 1
+                category = current
+                if not category and lexicon is not None:
+                    category = lexicon.categorize(item.key)
+                if category:
+                    categorized += 1
+                menu.add(category or "기타", item)
+        elif any(keyword in line for keyword in PRICE_KEYWORDS) and re.search(r"\d", line):
+            recognized += 1
+            menu.price = menu.price or after_label(line)
+        elif any(keyword in line for keyword in HOURS_KEYWORDS):
+            recognized += 1
+            menu.hours = menu.hours or after_label(line)
+        elif header_category(line):
+            recognized += 1
+            current = header_category(line)
+        elif date_match or "메뉴" in line:
+            # 제목 줄 ("🍽️ 오늘의 메뉴 (8월 1일)")
+            recognized += 1
+        else:
+            menu.unparsed_lines.append(line)
+
+    if total_items:
+        coverage = recognized / meaningful
+        category_ratio = categorized / total_items
+        confidence = coverage * category_ratio
+        # 섹션이 하나뿐이면 자유 형식 포스트일 가능성이 높음
+        if len([c for c in menu.categories if c != "기타"]) < 2:
+            confidence *= 0.5
+        menu.confidence = round(confidence, 3)
+    return menu
+
+def menu_fingerprint(menu):
+    """
+    메뉴 구성의 순서 무관 지문을 만듭니다.
+
+    정규화된 메뉴 이름 집합과 가격/영업시간만 사용하므로 날짜, 이모지, 메뉴 순서가 달라도 같은 값이 나옵니다.
+
+    Returns:
+        str | None: sha1 지문 (메뉴가 없으면 None)
+    """
+    dishes = sorted({key for key, _ in menu.dishes()})
+    if not dishes:
+        return None
+    fields = ["|".join(dishes), re.sub(r"\s", "", menu.price or ""), re.sub(r"\s", "", menu.hours or "")]
+    return hashlib.sha1("\n".join(fields).encode("utf-8")).hexdigest()
+
+def render_sections(menu):
+    """
+    카테고리별 메뉴를 "**🥩 주요리**" 제목과 "- 메뉴" 줄로 렌더링합니다.
+
+    Returns:
+        list: 출력할 줄 리스트 (카테고리 사이에 빈 줄)
+    """
+    lines = []
+    for category in CATEGORIES:
+        items = menu.categories.get(category)
+        if not items:
+            continue
+        if lines:
+            lines.append("")
+        lines.append(f"**{CATEGORY_EMOJI[category]} {category}**")
+        lines.extend(f"- {item.name}" for item in items)
+    return lines
+
+def render_summary(menu):
+    """
+    파싱한 메뉴를 SummarizeMenuNode의 LLM 요약과 같은 형식으로 렌더링합니다.
+
+    Args:
+        menu (ParsedMenu): 파싱 결과
+
+    Returns:
+        str: 슬랙으로 보낼 요약 텍스트
+    """
+    title = "🍽️ **오늘의 메뉴**"
+    if menu.date_text:
+        title += f" ({menu.date_text})"
+    lines = [title, ""] + render_sections(menu)
+
+    if menu.price or menu.hours:
+        lines.append("")
+        lines.append("**ℹ️ 기타정보**")
+        if menu.price:
+            lines.append(f"- 가격: {menu.price}")
+        if menu.hours:
+            lines.append(f"- 영업시간: {menu.hours}")
+
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    sample = """
+🍽️ 구도 한식뷔페 오늘의 메뉴 (8월 1일)
+━━━━━━━━━━━━━━━━━━━━
+
+🥩 메인 요리
+• 갈비찜 (양념갈비를 부드럽게 찜)
+• 불고기, 고등어구이
+
+🥬 계절 반찬
+• 배추김치, 깍두기, 콩나물무침
+
+🍲 국물 요리
+• 된장찌개, 미역국
+
+💰 가격: 성인 12,000원 / 소인 8,000원
+🕒 운영: 오전 11시 ~ 오후 9시
+    """
+    parsed = parse_menu(sample)
+    print(f"신뢰도: {parsed.confidence}")
+    print(render_summary(parsed))
@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.logger import get_tenant
+
+DEFAULT_METRICS_HOST = "0.0.0.0"
+DEFAULT_METRICS_PORT = 9108
+# 노드/실행 시간 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# 스케줄러 루프가 예정한 간격의 이 배수만큼 조용하면 /healthz가 실패
+HEALTH_GRACE_FACTOR = 3
+
+# 이름 -> (종류, 설명)
+METRICS = {
+    "menu_runs_total": ("counter", "메뉴 워크플로우 실행 수"),
+    "menu_run_seconds": ("histogram", "메뉴 워크플로우 전체 실행 시간"),
+    "menu_node_seconds": ("histogram", "노드별 실행 시간"),
+    "menu_llm_calls_total": ("counter", "Gemini 호출 수"),
+    "menu_llm_tokens_total": ("counter", "Gemini 사용 토큰 수"),
+    "menu_prompt_tokens_total": ("counter", "LLM 프롬프트 추정 토큰 수 (before: 압축 전, after: 압축 후)"),
+    "menu_llm_hedges_total": ("counter", "LLM 헤지 요청 수 (fired: 보냄, won: 헤지 응답을 사용)"),
+    "menu_llm_provider_errors_total": ("counter", "LLM 제공자별 실패 수"),
+    "menu_first_visible_seconds": ("histogram", "스트리밍 요약의 첫 내용이 슬랙에 보이기까지 걸린 시간"),
+    "menu_situation_parse_total": ("counter", "상황 감지 응답 파싱 결과 (ok, repaired, llm_repaired, failed)"),
+    "menu_cache_requests_total": ("counter", "캐시 조회 수 (요약 메모, OCR)"),
+    "menu_scrape_attempts_total": ("counter", "스크래핑 방식별 시도 결과"),
+    "menu_bot_requests_total": ("counter", "슬랙 봇 명령 응답 수"),
+    "menu_bot_refreshes_total": ("counter", "슬랙 봇이 예약한 백그라운드 새로고침 수"),
+    "menu_scheduler_lag_seconds": ("gauge", "마지막 실행이 예정 시각보다 늦게 시작한 시간"),
+    "menu_scheduler_heartbeat_timestamp": ("gauge", "스케줄러 루프가 마지막으로 돈 시각 (유닉스 시간)"),
+    "process_resident_memory_bytes": ("gauge", "프로세스 RSS"),
+    "process_start_time_seconds": ("gauge", "프로세스 시작 시각 (유닉스 시간)"),
+}
+
+class MetricsRegistry:
+    """
+    Prometheus 텍스트 형식으로 내보내는 작은 메트릭 저장소 (prometheus_client 없이 사용)
+
+    카운터/게이지는 (이름, 라벨) -> 값, 히스토그램은 (이름, 라벨) -> [구간별 개수, 합, 개수]로 보관합니다.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.values = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, labels=None, amount=1):
+        key = self._key(name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, name, value, labels=None):
+        with self.lock:
+            self.values[self._key(name, labels)] = value
+
+    def get(self, name, labels=None):
+        with self.lock:
+            return self.values.get(self._key(name, labels))
+
+    def observe(self, name, value, labels=None):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식 (text/plain; version=0.0.4)"""
+        with self.lock:
+            values = dict(self.values)
+            histograms = {key: (list(counts), total, count) for key, (counts, total, count) in self.histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            samples = [(labels, value) for (metric, labels), value in values.items() if metric == name]
+            series = [(labels, data) for (metric, labels), data in histograms.items() if metric == name]
+            if not samples and not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(samples):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for labels, (counts, total, count) in sorted(series):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {bucket_count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+# 프로세스 안에서 함께 쓰는 메트릭 저장소
+_registry = MetricsRegistry()
+_started_at = time.time()
+_health = {"heartbeat": None, "deadline": None, "loop": None}
+_next_run_provider = None
+
+def get_registry():
+    return _registry
+
+def _tenant_labels(extra=None):
+    labels = {"tenant": get_tenant() or "default"}
+    labels.update(extra or {})
+    return labels
+
+def record_run(shared_store, seconds=None):
+    """
+    워크플로우 실행 하나의 결과를 메트릭에 반영합니다. (main.run_menu_workflow가 실행 후 호출)
+
+    실행 결과, 노드별 시간, 요약 메모/OCR 캐시 적중을 shared store에서 읽습니다.
+    """
+    status = shared_store.get("status", {})
+    _registry.inc("menu_runs_total", _tenant_labels({"result": "success" if status.get("final_success") else "failure"}))
+    if seconds is not None:
+        _registry.observe("menu_run_seconds", seconds, _tenant_labels())
+    for timing in shared_store.get("metrics", {}).get("node_timings", []):
+        _registry.observe("menu_node_seconds", timing["seconds"], {"node": timing["node"]})
+
+    # 요약 메모는 SummarizeMenuNode가 실제로 조회한 실행만 셈 (실행 기록 DB가 없거나 열지 못하면 조회 안 함)
+    lookup = status.get("summary_memo_lookup")
+    if lookup:
+        _registry.inc("menu_cache_requests_total", {"cache": "summary_memo", "result": lookup})
+    ocr = status.get("ocr") or {}
+    if ocr.get("images"):
+        _registry.inc("menu_cache_requests_total", {"cache": "ocr", "result": "hit"}, ocr.get("cache_hits", 0))
+        _registry.inc("menu_cache_requests_total", {"cache": "ocr", "result": "miss"},
+                      ocr["images"] - ocr.get("cache_hits", 0))
+
+def record_llm_usage(prompt_tokens=0, output_tokens=0, model="gemini"):
+    """LLM 호출 한 번의 토큰 사용량을 기록합니다"""
+    _registry.inc("menu_llm_calls_total", {"model": model})
+    if prompt_tokens:
+        _registry.inc("menu_llm_tokens_total", {"model": model, "kind": "prompt"}, prompt_tokens)
+    if output_tokens:
+        _registry.inc("menu_llm_tokens_total", {"model": model, "kind": "output"}, output_tokens)
+
+def record_scrape(strategy, result):
+    """
+    스크래핑 방식 하나의 시도 결과를 기록합니다.
+
+    Args:
+        strategy (str): "selenium", "requests", "legacy"
+        result (str): "success", "empty", "skipped"(서킷 열림) 또는 실패 유형
+    """
+    _registry.inc("menu_scrape_attempts_total", {"strategy": strategy, "result": result})
+
+def record_scheduler_lag(seconds):
+    """실행이 예정 시각보다 늦게 시작한 시간(초)을 기록합니다 (테넌트별)"""
+    _registry.set("menu_scheduler_lag_seconds", max(0.0, seconds), _tenant_labels())
+
+def heartbeat(loop, interval):
+    """
+    스케줄러 루프가 살아 있음을 기록합니다. 루프가 한 번 돌 때마다 호출합니다.
+
+    Args:
+        loop (str): 루프 이름 ("scheduler", "tenants", "watcher", "bot")
+        interval (float): 다음 호출까지의 예정 간격(초), 이 간격의 HEALTH_GRACE_FACTOR배가 지나면 비정상
+    """
+    now = time.time()
+    _health.update(heartbeat=now, deadline=now + interval * HEALTH_GRACE_FACTOR, loop=loop)
+    _registry.set("menu_scheduler_heartbeat_timestamp", now, {"loop": loop})
+
+def set_next_run_provider(provider):
+    """
+    /next-run이 사용할 함수를 설정합니다.
+
+    Args:
+        provider: 다음 실행 예정 시각(datetime 또는 문자열, 없으면 None)을 반환하는 함수
+    """
+    global _next_run_provider
+    _next_run_provider = provider
+
+def process_rss_bytes():
+    """현재 프로세스 RSS(바이트), 알 수 없으면 None"""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # /proc이 없으면 최대 RSS로 대신 (macOS는 바이트, 리눅스는 KB 단위)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+def render_metrics():
+    rss = process_rss_bytes()
+    if rss is not None:
+        _registry.set("process_resident_memory_bytes", rss)
+    _registry.set("process_start_time_seconds", _started_at)
+    return _registry.render()
+
+def health(now=None):
+    """
+    Returns:
+        tuple: (정상 여부, 상태 딕셔너리)
+    """
+    now = now or time.time()
+    deadline = _health["deadline"]
+    healthy = deadline is not None and now <= deadline
+    return healthy, {
+        "status": "ok" if healthy else ("starting" if deadline is None else "stalled"),
+        "loop": _health["loop"],
+        "last_heartbeat_seconds_ago": round(now - _health["heartbeat"], 1) if _health["heartbeat"] else None,
+        "uptime_seconds": round(now - _started_at, 1)
+    }
+
+def next_run():
+    if _next_run_provider is None:
+        return None
+    value = _next_run_provider()
+    return value.isoformat(timespec="seconds") if isinstance(value, datetime) else value
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """/metrics, /healthz, /next-run 요청 처리"""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        try:
+            if path == "/metrics":
+                self._send(200, render_metrics(), "text/plain; version=0.0.4; charset=utf-8")
+            elif path == "/healthz":
+                healthy, body = health()
+                self._send_json(200 if healthy else 503, body)
+            elif path == "/next-run":
+                self._send_json(200, {"next_run": next_run()})
+            else:
+                self._send_json(404, {"error": "not found"})
+        except Exception as e:
+            logging.warning(f"⚠️ 메트릭 요청 처리 실패 ({path}): {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, code, body):
+        self._send(code, json.dumps(body, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _send(self, code, text, content_type):
+        data = text.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Prometheus가 주기적으로 긁어가므로 요청마다 로그를 남기지 않음
+        pass
+
+def start_metrics_server(port=DEFAULT_METRICS_PORT, host=DEFAULT_METRICS_HOST):
+    """
+    메트릭 HTTP 서버를 데몬 스레드에서 시작합니다. (스케줄러 루프와 별도로 동작)
+
+    Returns:
+        ThreadingHTTPServer: 실행 중인 서버 (shutdown()으로 중지)
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logging.info(f"📈 메트릭 서버 시작: http://{host}:{server.server_port} (/metrics, /healthz, /next-run)")
+    return server
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# pytesseract/Pillow는 선택 의존성이라 실제 OCR을 할 때만 로드합니다
+
+DEFAULT_OCR_LANG = "kor+eng"
+DEFAULT_OCR_CACHE_DIR = os.path.join("data", "ocr_cache")
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_OCR_WORKERS = 2
+DEFAULT_DOWNLOAD_TIMEOUT = 15  # 이미지 한 장 다운로드 타임아웃(초)
+
+# 이미지 다운로드에 재사용하는 requests 세션 (연결 풀 공유)
+_session = None
+
+def ocr_available():
+    """pytesseract, Pillow와 tesseract 실행 파일이 모두 있으면 True"""
+    try:
+        import pytesseract  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which("tesseract") is not None
+
+def get_session():
+    """이미지 다운로드용 requests 세션을 반환합니다 (프로세스 안에서 공유)"""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=DEFAULT_DOWNLOAD_WORKERS, pool_maxsize=DEFAULT_DOWNLOAD_WORKERS)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+def download_images(urls, max_workers=DEFAULT_DOWNLOAD_WORKERS, timeout=DEFAULT_DOWNLOAD_TIMEOUT):
+    """
+    이미지들을 공유 세션으로 병렬 다운로드합니다.
+
+    Returns:
+        list: 이미지 바이트 리스트 (실패한 이미지는 None, 입력 순서 유지)
+    """
+    session = get_session()
+
+    def download(url):
+        try:
+            response = session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            logging.warning(f"⚠️ 이미지 다운로드 실패 ({url[:60]}): {e}")
+            return None
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return list(executor.map(download, urls))
+
+def image_hash(data):
+    """이미지 내용의 sha256 해시 (같은 이미지를 다시 올려도 같은 값)"""
+    return hashlib.sha256(data).hexdigest()
+
+def ocr_image_bytes(data, lang=DEFAULT_OCR_LANG):
+    """
+    이미지 한 장의 텍스트를 인식합니다. (프로세스 풀에서 실행)
+
+    Returns:
+        str: 인식한 텍스트
+    """
+    import io
+
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        # 흑백 변환만 해도 한글 인식률이 좋아짐
+        return pytesseract.image_to_string(image.convert("L"), lang=lang).strip()
+
+class OCRCache:
+    """이미지 해시 -> OCR 텍스트 파일 캐시"""
+
+    def __init__(self, cache_dir=DEFAULT_OCR_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.txt")
+
+    def get(self, digest):
+        try:
+            with open(self._path(digest), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, digest, text):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+def ocr_images(urls, cache_dir=DEFAULT_OCR_CACHE_DIR, lang=DEFAULT_OCR_LANG, max_workers=DEFAULT_OCR_WORKERS,
+               timeout=DEFAULT_DOWNLOAD_TIMEOUT):
+    """
+    포스트 이미지(캐러셀 포함)의 텍스트를 인식해서 합칩니다.
+
+    다운로드는 공유 세션 + 스레드 풀, OCR은 프로세스 풀에서 실행하고
+    결과는 이미지 해시로 캐시해서 같은 이미지는 다시 인식하지 않습니다.
+
+    Args:
+        urls (list): 이미지 URL 리스트
+        cache_dir (str): OCR 결과 캐시 디렉토리 (None이면 캐시 사용 안 함)
+        lang (str): tesseract 언어 (한국어 데이터 kor 필요)
+        max_workers (int): OCR 프로세스 수
+        timeout (float): 이미지 다운로드 타임아웃(초)
+
+    Returns:
+        dict: {"text", "images", "cache_hits", "recognized"}
+    """
+    cache = OCRCache(cache_dir) if cache_dir else None
+    images = [data for data in download_images(urls, timeout=timeout) if data]
+
+    digests = [image_hash(data) for data in images]
+    texts, pending = {}, {}
+    for digest, data in zip(digests, images):
+        cached = cache.get(digest) if cache else None
+        if cached is not None:
+            texts[digest] = cached
+        else:
+            pending[digest] = data
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            futures = {digest: executor.submit(ocr_image_bytes, data, lang) for digest, data in pending.items()}
+            for digest, future in futures.items():
+                try:
+                    texts[digest] = future.result()
+                except Exception as e:
+                    logging.warning(f"⚠️ 이미지 OCR 실패: {e}")
+                    continue
+                if cache:
+                    cache.put(digest, texts[digest])
+
+    # 캐러셀 순서대로 합치고 같은 이미지는 한 번만 사용
+    merged, seen = [], set()
+    for digest in digests:
+        if digest in texts and digest not in seen and texts[digest]:
+            seen.add(digest)
+            merged.append(texts[digest])
+
+    return {
+        "text": "\n\n".join(merged),
+        "images": len(images),
+        "cache_hits": len(images) - len(pending),
+        "recognized": len(merged)
+    }
@@ -0,0 +1,341 @@
+import atexit
+import bisect
+import gzip
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# zstandard는 선택 의존성 (없으면 gzip으로 압축)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_ARCHIVE_DIR = os.path.join("data", "post_archive")
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024  # 세그먼트가 이보다 커지면 새 세그먼트에 기록
+INDEX_FILE = "index.bin"
+SEGMENT_NAME = "segment-{:06d}.bin"
+
+CODEC_GZIP = 1
+CODEC_ZSTD = 2
+
+# 인덱스 한 칸 (64바이트 고정): 날짜(YYYYMMDD), 포스트 ID, 세그먼트 번호, 오프셋, 길이, 코덱, 수집 시각
+INDEX_ENTRY = struct.Struct("<I32sIQIB3xd")
+POST_ID_BYTES = 32
+
+class IndexEntry:
+    """인덱스 한 칸 (레코드가 어느 세그먼트 어디에 있는지)"""
+
+    __slots__ = ("date", "post_id", "segment", "offset", "length", "codec", "fetched_at")
+
+    def __init__(self, date, post_id, segment, offset, length, codec, fetched_at):
+        self.date = date
+        self.post_id = post_id
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.codec = codec
+        self.fetched_at = fetched_at
+
+    def pack(self):
+        return INDEX_ENTRY.pack(self.date, self.post_id.encode("ascii", "ignore")[:POST_ID_BYTES],
+                                self.segment, self.offset, self.length, self.codec, self.fetched_at)
+
+    @classmethod
+    def unpack(cls, data, offset=0):
+        date, post_id, segment, position, length, codec, fetched_at = INDEX_ENTRY.unpack_from(data, offset)
+        return cls(date, post_id.rstrip(b"\0").decode("ascii"), segment, position, length, codec, fetched_at)
+
+def _date_key(value):
+    """date/datetime/"YYYY-MM-DD" -> YYYYMMDD 정수"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], "%Y-%m-%d")
+    return value.year * 10000 + value.month * 100 + value.day
+
+def _compress(data):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), CODEC_ZSTD
+    return gzip.compress(data, compresslevel=6, mtime=0), CODEC_GZIP
+
+def _decompress(data, codec):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ImportError("zstd로 압축된 레코드를 읽으려면 zstandard를 설치하세요 (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+class PostArchive:
+    """
+    가져온 인스타그램 페이지 HTML과 캡션을 쌓아두는 추가 전용 압축 아카이브
+
+    - 세그먼트: 레코드(JSON)마다 따로 압축(zstd, 없으면 gzip)한 프레임을 이어 붙인 파일
+    - 인덱스: 레코드마다 64바이트 고정 칸 (날짜, 포스트 ID, 세그먼트, 오프셋, 길이, 코덱, 수집 시각)
+      수집 순서로 쌓이므로 날짜 범위는 mmap 위에서 이진 탐색으로 찾음
+    - 읽을 때는 필요한 프레임만 읽어서 풀기 때문에 세그먼트 전체를 메모리에 올리지 않음
+
+    여러 프로세스가 같은 디렉토리에 쓰면 인덱스 파일 잠금(fcntl)으로 쓰기를 직렬화합니다.
+    """
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR, segment_max_bytes=SEGMENT_MAX_BYTES):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.lock = threading.Lock()
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, SEGMENT_NAME.format(number))
+
+    def append(self, record):
+        """
+        레코드 하나를 압축해서 기록합니다.
+
+        Args:
+            record (dict): {"post_id", "date", "fetched_at", "caption", "pages": [{"url", "html"}], ...}
+
+        Returns:
+            IndexEntry: 기록한 위치
+        """
+        fetched_at = record.get("fetched_at") or time.time()
+        date = record.get("date") or datetime.fromtimestamp(fetched_at).date().isoformat()
+        record = dict(record, date=str(date), fetched_at=fetched_at)
+        payload, codec = _compress(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8"))
+
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.index_path, "ab") as index:
+                if fcntl is not None:
+                    fcntl.flock(index, fcntl.LOCK_EX)
+                try:
+                    segment = self._writable_segment(len(payload))
+                    with open(self._segment_path(segment), "ab") as f:
+                        offset = f.tell()
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    # 세그먼트를 먼저 쓰고 인덱스를 나중에 써서, 중간에 죽어도 인덱스가 없는 데이터를 가리키지 않음
+                    entry = IndexEntry(_date_key(date), str(record.get("post_id") or ""), segment,
+                                       offset, len(payload), codec, fetched_at)
+                    # 이전에 쓰다 만 칸이 있으면 잘라내서 칸 경계를 맞춤
+                    size = index.seek(0, os.SEEK_END)
+                    if size % INDEX_ENTRY.size:
+                        index.truncate(size - size % INDEX_ENTRY.size)
+                    index.write(entry.pack())
+                    index.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(index, fcntl.LOCK_UN)
+        return entry
+
+    def _writable_segment(self, size):
+        """마지막 세그먼트에 size만큼 더 쓸 수 있으면 그 번호, 아니면 다음 번호"""
+        numbers = sorted(int(name[8:14]) for name in os.listdir(self.directory)
+                         if name.startswith("segment-") and name.endswith(".bin"))
+        if not numbers:
+            return 1
+        last = numbers[-1]
+        current = os.path.getsize(self._segment_path(last))
+        return last if current == 0 or current + size <= self.segment_max_bytes else last + 1
+
+    @contextmanager
+    def _index_view(self):
+        """인덱스를 mmap으로 엽니다. (칸 수, mmap)을 주고, 인덱스가 비어 있으면 (0, None)"""
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) < INDEX_ENTRY.size:
+            yield 0, None
+            return
+        with open(self.index_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield len(view) // INDEX_ENTRY.size, view  # 쓰다 만 마지막 칸은 무시
+
+    def __len__(self):
+        with self._index_view() as (count, _):
+            return count
+
+    def entries(self, start_date=None, end_date=None):
+        """
+        수집 날짜 범위(start_date <= 날짜 <= end_date)의 인덱스 칸을 수집 순서대로 반환합니다.
+
+        Returns:
+            list: IndexEntry 리스트
+        """
+        start = _date_key(start_date) if start_date else 0
+        end = _date_key(end_date) if end_date else 99999999
+        result = []
+        with self._index_view() as (count, view):
+            for position in range(bisect.bisect_left(_DateView(view, count), start), count):
+                entry = IndexEntry.unpack(view, position * INDEX_ENTRY.size)
+                if entry.date > end:
+                    break
+                result.append(entry)
+        return result
+
+    def find(self, post_id):
+        """
+        포스트 ID로 가장 최근 레코드의 인덱스 칸을 찾습니다. (mmap 위에서 뒤에서부터 비교)
+
+        Returns:
+            IndexEntry | None
+        """
+        key = post_id.encode("ascii", "ignore")[:POST_ID_BYTES].ljust(POST_ID_BYTES, b"\0")
+        with self._index_view() as (count, view):
+            for position in range(count - 1, -1, -1):
+                start = position * INDEX_ENTRY.size + 4
+                if view[start:start + POST_ID_BYTES] == key:
+                    return IndexEntry.unpack(view, position * INDEX_ENTRY.size)
+        return None
+
+    def read(self, entry):
+        """인덱스 칸 하나가 가리키는 레코드를 읽어서 풉니다"""
+        with open(self._segment_path(entry.segment), "rb") as f:
+            f.seek(entry.offset)
+            return json.loads(_decompress(f.read(entry.length), entry.codec))
+
+    def iter_records(self, start_date=None, end_date=None, post_id=None):
+        """
+        레코드를 하나씩 읽어서 반환합니다. (한 번에 레코드 하나만 메모리에 올림)
+
+        Args:
+            start_date, end_date: 날짜 범위 (date 또는 "YYYY-MM-DD", None이면 제한 없음)
+            post_id (str): 이 포스트의 레코드만
+
+        Yields:
+            dict: 기록한 레코드
+        """
+        handles = {}
+        try:
+            for entry in self.entries(start_date, end_date):
+                if post_id and entry.post_id != post_id:
+                    continue
+                f = handles.get(entry.segment)
+                if f is None:
+                    f = handles[entry.segment] = open(self._segment_path(entry.segment), "rb")
+                f.seek(entry.offset)
+                try:
+                    yield json.loads(_decompress(f.read(entry.length), entry.codec))
+                except (OSError, ValueError, ImportError) as e:
+                    logging.warning(f"⚠️ 아카이브 레코드를 읽지 못했습니다 ({entry.post_id}, {entry.date}): {e}")
+        finally:
+            for f in handles.values():
+                f.close()
+
+class _DateView:
+    """mmap 인덱스의 날짜 칸만 읽는 시퀀스 (bisect용)"""
+
+    def __init__(self, view, count):
+        self.view = view
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        return struct.unpack_from("<I", self.view, position * INDEX_ENTRY.size)[0]
+
+def record_to_post(record):
+    """
+    아카이브 레코드를 스크래퍼 결과 형식으로 바꿉니다. (set_scraper_backend로 플로우에 재생할 때 사용)
+
+    Returns:
+        dict: {"text", "shortcode", "taken_at", "image_urls"}
+    """
+    return {
+        "text": record.get("caption") or "",
+        "shortcode": record.get("post_id") or None,
+        "taken_at": record.get("taken_at"),
+        "image_urls": record.get("image_urls") or []
+    }
+
+def replay_posts(directory=DEFAULT_ARCHIVE_DIR, start_date=None, end_date=None):
+    """
+    아카이브의 포스트를 스크래퍼 결과 형식으로 하나씩 반환합니다.
+
+    Yields:
+        tuple: (레코드 날짜 "YYYY-MM-DD", 포스트 딕셔너리)
+    """
+    for record in PostArchive(directory).iter_records(start_date, end_date):
+        yield str(record.get("date", ""))[:10], record_to_post(record)
+
+class ArchiveWriter:
+    """
+    아카이브 기록을 워크플로우 밖의 백그라운드 스레드에서 처리하는 큐
+
+    FetchMenuNode는 레코드를 넣기만 하고 바로 다음 노드로 넘어갑니다.
+    큐가 가득 차면 (디스크가 매우 느린 경우) 알림 흐름을 막지 않도록 레코드를 버립니다.
+    """
+
+    def __init__(self, max_queue=100):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.archives = {}
+        self.thread = threading.Thread(target=self._loop, name="post-archive", daemon=True)
+        self.thread.start()
+
+    def submit(self, directory, record):
+        try:
+            self.queue.put_nowait((directory, record))
+            return True
+        except queue.Full:
+            logging.warning(f"⚠️ 아카이브 대기열이 가득 차서 기록을 건너뜁니다 ({record.get('post_id')})")
+            return False
+
+    def flush(self, timeout=10.0):
+        """대기 중인 기록이 모두 끝날 때까지 기다립니다 (timeout 안에 끝나면 True)"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _loop(self):
+        while True:
+            directory, record = self.queue.get()
+            try:
+                archive = self.archives.get(directory)
+                if archive is None:
+                    archive = self.archives[directory] = PostArchive(directory)
+                entry = archive.append(record)
+                logging.info(f"🗄️ 원본 포스트 보관: {entry.post_id or '-'} "
+                             f"(페이지 {len(record.get('pages', []))}개, 압축 {entry.length / 1024:.1f}KB)")
+            except Exception as e:
+                logging.warning(f"⚠️ 원본 포스트 보관 실패: {e}")
+            finally:
+                self.queue.task_done()
+
+# 프로세스 안에서 함께 쓰는 기록 스레드 (처음 기록할 때 시작)
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_archive_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ArchiveWriter()
+            # --now처럼 바로 끝나는 실행에서도 대기 중인 기록을 마치고 종료
+            atexit.register(_writer.flush)
+        return _writer
+
+def archive_post_async(directory, record):
+    """레코드를 백그라운드 스레드에서 아카이브에 기록하도록 넣습니다"""
+    return get_archive_writer().submit(directory, record)
+
+if __name__ == "__main__":
+    import sys
+
+    archive = PostArchive(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ARCHIVE_DIR)
+    entries = archive.entries()
+    print(f"레코드 {len(entries)}개 (압축 {sum(entry.length for entry in entries) / 1024:.1f}KB)")
+    for entry in entries[-20:]:
+        print(f"{entry.date} {entry.post_id or '-':<14} 세그먼트 {entry.segment} "
+              f"오프셋 {entry.offset} 길이 {entry.length}")
@@ -0,0 +1,164 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+
+from utils.instagram_scraper import probe_latest_post
+from utils.metrics import heartbeat
+from utils.retry import DEFAULT_RUN_DEADLINE_SECONDS
+
+# 새 포스트를 기다리는 시간대 (끝날 때까지 새 포스트가 없으면 기존 포스트로 워크플로우 실행)
+DEFAULT_WATCH_START = "07:00"
+DEFAULT_WATCH_END = "11:00"
+DEFAULT_MIN_INTERVAL = 60  # 평소 게시 시각 근처의 확인 간격(초)
+DEFAULT_MAX_INTERVAL = 900  # 게시 가능성이 낮은 시간대의 확인 간격(초)
+DEFAULT_BANDWIDTH_MINUTES = 20  # 게시 시각 분포를 부드럽게 만드는 폭(분)
+
+def _parse_hhmm(value):
+    hour, minute = value.split(":")
+    return int(hour) * 60 + int(minute)
+
+class PostingTimeModel:
+    """
+    과거 게시 시각 분포로 확인 간격을 정하는 모델
+
+    게시 시각(자정 기준 분)에 가우시안 커널을 씌운 밀도가 최대 밀도에 가까울수록
+    min_interval에, 0에 가까울수록 max_interval에 가까운 간격을 돌려줍니다.
+    """
+
+    def __init__(self, minutes, bandwidth=DEFAULT_BANDWIDTH_MINUTES):
+        """
+        Args:
+            minutes (list): 과거 게시 시각 (자정 기준 분)
+            bandwidth (float): 커널 폭(분)
+        """
+        self.minutes = list(minutes)
+        self.bandwidth = bandwidth
+        self.peak = max((self.density(m) for m in self.minutes), default=0.0)
+
+    def density(self, minute):
+        return sum(math.exp(-0.5 * ((minute - m) / self.bandwidth) ** 2) for m in self.minutes)
+
+    def interval(self, minute, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL):
+        """
+        minute(자정 기준 분) 시각에 다음 확인까지 기다릴 시간(초)을 반환합니다.
+
+        기록이 없으면 두 간격의 중간값을 사용합니다.
+        """
+        if not self.peak:
+            return (min_interval + max_interval) / 2
+        ratio = min(1.0, self.density(minute) / self.peak)
+        return max_interval - (max_interval - min_interval) * ratio
+
+class PostWatcher:
+    """
+    새 포스트가 올라오는 즉시 워크플로우를 실행하는 감시자
+
+    감시 시간대 동안 HTTP 요청 한 번짜리 확인(probe)으로 최신 포스트 shortcode를 비교하고,
+    바뀌면 on_new_post(shortcode)를 호출합니다. 하루에 한 번만 실행하며, 감시 시간대가 끝날 때까지
+    새 포스트가 없으면 on_new_post(None)으로 기존 스케줄처럼 실행합니다.
+    """
+
+    def __init__(self, instagram_url, on_new_post, history,
+                 start=DEFAULT_WATCH_START, end=DEFAULT_WATCH_END,
+                 min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+                 probe=probe_latest_post):
+        """
+        Args:
+            instagram_url (str): 인스타그램 프로필 URL
+            on_new_post: 새 포스트를 발견하면 호출할 함수 (shortcode를 인자로 받음)
+            history (MenuHistory): 발견한 포스트와 실행 기록을 저장하는 DB
+            start (str): 감시 시작 시각 (HH:MM)
+            end (str): 감시 종료 시각 (HH:MM)
+            min_interval (float): 최소 확인 간격(초)
+            max_interval (float): 최대 확인 간격(초)
+            probe: instagram_url을 받아 {"shortcode", "taken_at"}를 반환하는 함수
+        """
+        self.instagram_url = instagram_url
+        self.on_new_post = on_new_post
+        self.history = history
+        self.start = _parse_hhmm(start)
+        self.end = _parse_hhmm(end)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.probe = probe
+        self.last_shortcode = history.last_sighting()
+        self.model = PostingTimeModel(history.posting_minutes())
+        self.probes = 0
+        # 재시작해도 이미 실행한 날은 다시 실행하지 않음
+        today = datetime.now().date()
+        self.fired_date = today if history.has_run_on(today.isoformat()) else None
+
+    def _fire(self, now, shortcode):
+        self.fired_date = now.date()
+        self.on_new_post(shortcode)
+        # 오늘 게시 시각까지 반영해서 다음 날 간격 계산
+        self.model = PostingTimeModel(self.history.posting_minutes())
+
+    def check_once(self, now=None):
+        """
+        지금 확인이 필요하면 최신 포스트를 확인하고, 새 포스트면 워크플로우를 실행합니다.
+
+        Returns:
+            bool: 워크플로우를 실행했는지 여부
+        """
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        if self.fired_date == now.date() or minute < self.start:
+            return False
+
+        if minute >= self.end:
+            logging.info("⌛ 감시 시간대가 끝날 때까지 새 포스트가 없어 기존 포스트로 실행합니다")
+            self._fire(now, None)
+            return True
+
+        self.probes += 1
+        latest = self.probe(self.instagram_url)
+        if not latest or latest["shortcode"] == self.last_shortcode:
+            return False
+
+        taken_at = datetime.fromtimestamp(latest["taken_at"]) if latest.get("taken_at") else None
+        self.history.record_post_sighting(latest["shortcode"], taken_at)
+        is_first_probe = self.last_shortcode is None
+        self.last_shortcode = latest["shortcode"]
+
+        # 처음 확인한 포스트는 기준점으로만 사용 (오늘 올라온 포스트가 확실할 때만 실행)
+        if is_first_probe and (taken_at is None or taken_at.date() != now.date()):
+            logging.info(f"📌 기준 포스트 저장: {latest['shortcode']}")
+            return False
+
+        logging.info(f"🆕 새 포스트 발견: {latest['shortcode']} (오늘 {self.probes}번째 확인)")
+        self._fire(now, latest["shortcode"])
+        return True
+
+    def next_delay(self, now=None):
+        """다음 확인까지 기다릴 시간(초)을 반환합니다"""
+        now = now or datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        window_start = midnight + timedelta(minutes=self.start)
+        window_end = midnight + timedelta(minutes=self.end)
+
+        if self.fired_date == now.date() or now >= window_end:
+            return (window_start + timedelta(days=1) - now).total_seconds()
+        if now < window_start:
+            return (window_start - now).total_seconds()
+
+        interval = self.model.interval(now.hour * 60 + now.minute, self.min_interval, self.max_interval)
+        return max(1.0, min(interval, (window_end - now).total_seconds()))
+
+    def run(self):
+        """감시 루프를 실행합니다 (무한 루프)"""
+        logging.info(f"👀 새 포스트 감시 시작 (기록된 게시 시각 {len(self.model.minutes)}개)")
+        while True:
+            try:
+                if self.check_once():
+                    self.probes = 0
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                logging.error(f"❌ 포스트 감시 오류: {e}")
+            delay = self.next_delay()
+            # 다음 확인에서 워크플로우를 실행할 수 있으므로 실행 예산만큼 더 기다려줌
+            heartbeat("watcher", delay + DEFAULT_RUN_DEADLINE_SECONDS)
+            logging.info(f"⏳ {delay / 60:.1f}분 후 다시 확인합니다")
+            time.sleep(delay)
@@ -0,0 +1,169 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_PROFILE_DIR = "profiles"
+
+def sampling_available():
+    """샘플링 프로파일러(pyinstrument, 선택사항) 설치 여부를 반환합니다"""
+    try:
+        import pyinstrument  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class NodeProfiler:
+    """
+    노드별 exec 실행을 프로파일링하고 결과를 파일로 남기는 프로파일러
+
+    실행 한 번에 디렉토리 하나(profiles/<run_id>/)를 사용하며,
+    노드마다 프로파일 파일을 하나씩 쓰고 마지막에 합친 리포트를 만듭니다.
+    """
+
+    def __init__(self, output_dir=DEFAULT_PROFILE_DIR, run_id=None, sampling=None, top=40):
+        """
+        Args:
+            output_dir (str): 프로파일 결과 상위 디렉토리
+            run_id (str): 실행 ID (기본값: 현재 시간)
+            sampling (bool): 샘플링 프로파일러 사용 여부 (기본값: 설치되어 있으면 사용)
+            top (int): 합친 리포트에 출력할 함수 개수
+        """
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.run_dir = os.path.join(output_dir, self.run_id)
+        self.sampling = sampling_available() if sampling is None else sampling
+        if self.sampling and not sampling_available():
+            raise ValueError("샘플링 프로파일러(pyinstrument)가 설치되어 있지 않습니다")
+        self.top = top
+        self.files = []
+        self.sessions = []
+        os.makedirs(self.run_dir, exist_ok=True)
+
+    def profile(self, node_name, func, *args):
+        """
+        func(*args)를 프로파일링하며 실행하고 노드별 파일로 저장합니다.
+
+        Returns:
+            func의 반환값
+        """
+        base = os.path.join(self.run_dir, f"{len(self.files) + 1:02d}_{re.sub(r'[^A-Za-z0-9_]', '_', node_name)}")
+
+        if self.sampling:
+            from pyinstrument import Profiler as SamplingProfiler
+            
+            profiler = SamplingProfiler()
+            profiler.start()
+            try:
+                return func(*args)
+            finally:
+                profiler.stop()
+                session = profiler.last_session
+                path = base + ".pyisession"
+                session.save(path)
+                self.sessions.append(session)
+                self.files.append(path)
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args)
+        finally:
+            path = base + ".prof"
+            profiler.dump_stats(path)
+            self.files.append(path)
+
+    def write_report(self):
+        """
+        노드별 프로파일을 합쳐 시간순으로 정렬한 리포트를 저장합니다.
+
+        Returns:
+            str: 리포트 파일 경로 (프로파일된 노드가 없으면 None)
+        """
+        if not self.files:
+            return None
+
+        report_path = os.path.join(self.run_dir, "report.txt")
+        header = f"# 프로파일 리포트 (run_id={self.run_id}, 노드 {len(self.files)}개)\n"
+        header += "".join(f"# - {os.path.basename(path)}\n" for path in self.files)
+
+        if self.sampling:
+            from pyinstrument.renderers import ConsoleRenderer
+            from pyinstrument.session import Session
+            
+            merged = self.sessions[0]
+            for session in self.sessions[1:]:
+                merged = Session.combine(merged, session)
+            try:
+                renderer = ConsoleRenderer(unicode=True, color=False, flat=True)
+            except TypeError:  # flat 옵션이 없는 구버전
+                renderer = ConsoleRenderer(unicode=True, color=False)
+            body = renderer.render(merged)
+        else:
+            stream = io.StringIO()
+            stats = pstats.Stats(*self.files, stream=stream)
+            stats.strip_dirs()
+            stream.write("## 누적 시간(cumulative) 기준\n")
+            stats.sort_stats("cumulative").print_stats(self.top)
+            stream.write("\n## 자체 시간(tottime) 기준\n")
+            stats.sort_stats("tottime").print_stats(self.top)
+            body = stream.getvalue()
+
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(header + "\n" + body)
+        return report_path
+
+@contextmanager
+def profiling(shared, output_dir):
+    """
+    shared store에 프로파일러를 연결한 상태로 블록을 실행합니다.
+
+    TimedNode는 shared["runtime"]["profiler"]가 있으면 exec를 프로파일링합니다.
+    output_dir가 비어 있으면 아무것도 하지 않습니다.
+
+    Args:
+        shared (dict): shared store
+        output_dir (str): 프로파일 결과 상위 디렉토리
+    """
+    if not output_dir:
+        yield None
+        return
+
+    profiler = NodeProfiler(output_dir)
+    runtime = shared.setdefault("runtime", {})
+    runtime["profiler"] = profiler
+    mode = "샘플링" if profiler.sampling else "cProfile"
+    logging.info(f"🔬 노드 프로파일링 시작 ({mode}): {profiler.run_dir}")
+    try:
+        yield profiler
+    finally:
+        runtime.pop("profiler", None)
+        report_path = profiler.write_report()
+        logging.info(f"📄 프로파일 리포트 저장: {report_path}")
+
+def profile_workflow(workflow_function, output_dir, run_number=1):
+    """
+    워크플로우 함수의 run_number번째 실행만 프로파일링하도록 감쌉니다.
+
+    스케줄러처럼 같은 함수를 여러 번 실행하는 경우 특정 실행 한 번만 골라 프로파일링할 때 사용합니다.
+
+    Args:
+        workflow_function: 실행할 워크플로우 함수 (shared_store를 인자로 받음)
+        output_dir (str): 프로파일 결과 상위 디렉토리
+        run_number (int): 프로파일링할 실행 순번 (1부터 시작)
+
+    Returns:
+        function: 감싼 워크플로우 함수
+    """
+    state = {"runs": 0}
+
+    def workflow(shared_store):
+        state["runs"] += 1
+        if state["runs"] != run_number:
+            return workflow_function(shared_store)
+        with profiling(shared_store, output_dir):
+            return workflow_function(shared_store)
+
+    return workflow
@@ -0,0 +1,202 @@
+import logging
+import math
+import re
+
+from utils.menu_parser import SEPARATOR_PATTERN
+from utils.metrics import get_registry
+
+# 포스트 내용에 쓸 추정 토큰 상한 (지시문 제외)
+DEFAULT_PROMPT_TOKEN_BUDGET = 1200
+
+HASHTAG_PATTERN = re.compile(r"(?<!\S)#[^\s#]+")
+# 연속된 이모지/장식 기호 (변형 선택자, ZWJ 포함)
+EMOJI_CHARS = r"\U0001F000-\U0001FAFF\u2190-\u21FF\u25A0-\u25FF\u2600-\u27BF\u2B00-\u2BFF"
+EMOJI_RUN_PATTERN = re.compile(rf"([{EMOJI_CHARS}])(?:[\s\uFE0F\u200D]*[{EMOJI_CHARS}])+\uFE0F?")
+TRUNCATED_MARK = "…(이하 생략)"
+
+# 모든 프롬프트가 같은 앞부분으로 시작하고 포스트 내용은 맨 뒤에 오도록 배치
+# (고정된 앞부분이 길수록 제공자의 프롬프트 접두사 캐시에 걸리기 쉬움)
+SHARED_PREFIX = """당신은 한식뷔페 인스타그램 포스트를 읽고 슬랙 알림을 만드는 도우미입니다.
+포스트에 없는 내용은 추가하지 마세요.
+
+"""
+
+SITUATION_INSTRUCTIONS = """
+아래 원본 내용을 분석하여 특수 상황(휴무일, 영업 중단, 특별 메뉴 등)이 있는지 판단해주세요.
+
+분석 요구사항:
+1. 휴무일 관련 키워드: "휴무", "휴점", "쉬는날", "영업안함", "문닫음", "오늘휴무"
+2. 영업 중단 관련: "영업중단", "임시휴무", "특별휴무", "정기휴무"
+3. 특별 메뉴 관련: "특별메뉴", "이벤트", "한정메뉴", "시즌메뉴"
+4. 영업시간 변경: "영업시간변경", "시간조정", "오늘만"
+
+분석 결과를 다음 JSON 형식으로 반환해주세요 (코드 블록 없이 JSON 객체 하나만):
+{
+    "situation_type": "normal|holiday|special_menu|business_hours_change|error",
+    "confidence": 0.0-1.0,
+    "detected_keywords": ["키워드1", "키워드2"],
+    "summary": "상황 요약",
+    "action_required": "normal|holiday_notice|special_notice|error_notice"
+}
+
+situation_type 설명:
+- normal: 정상 영업, 일반 메뉴
+- holiday: 휴무일 또는 영업 중단
+- special_menu: 특별 메뉴 또는 이벤트
+- business_hours_change: 영업시간 변경
+- error: 분석 불가능한 상황
+
+action_required 설명:
+- normal: 일반 메뉴 요약 진행
+- holiday_notice: 휴무일 알림 전송
+- special_notice: 특별 메뉴 알림 전송
+- error_notice: 오류 상황 알림 전송
+"""
+
+# 상황 감지 응답을 JSON으로 읽지 못했을 때 원본 포스트 없이 응답만 고쳐 달라는 짧은 요청
+SITUATION_REPAIR_INSTRUCTIONS = """
+아래 응답은 특수 상황 분석 결과인데 JSON으로 읽을 수 없습니다.
+판단 내용은 바꾸지 말고 다음 필드만 가진 JSON 객체 하나로 다시 써주세요:
+- situation_type: normal|holiday|special_menu|business_hours_change|error
+- confidence: 0.0-1.0
+- detected_keywords: 문자열 배열
+- summary: 상황 요약
+- action_required: normal|holiday_notice|special_notice|error_notice
+"""
+
+SUMMARY_INSTRUCTIONS = """
+아래 원본 내용의 메뉴 정보를 읽기 쉽고 구조화된 형태로 요약해주세요.
+
+요약 요구사항:
+1. 한국어로 작성
+2. 메뉴를 카테고리별로 정리 (주요리, 밑반찬, 국물류, 후식 등)
+3. 이모지를 적절히 사용하여 보기 좋게 작성
+4. 없는 메뉴는 추가하지 마세요
+5. 영업시간이나 기타 정보가 있다면 포함
+
+아래 형식으로 작성해주세요:
+
+🍽️ **오늘의 메뉴**
+
+**🥩 주요리**
+- 메뉴1
+- 메뉴2
+
+**🥬 밑반찬**
+- 반찬1
+- 반찬2
+
+**🍲 국물류**
+- 국물요리1
+
+**🍰 후식**
+- 후식류
+
+**ℹ️ 기타정보**
+- 영업시간: (있다면)
+- 특이사항: (있다면)
+"""
+
+SPECIAL_MENU_INSTRUCTIONS = """
+아래 특별 메뉴 정보를 바탕으로 특별 메뉴 알림을 작성해주세요.
+
+요구사항:
+1. 특별 메뉴의 특징을 강조
+2. 메뉴 내용을 구조화하여 정리
+3. 이모지를 적절히 사용
+4. 특별한 이유나 이벤트 정보가 있다면 포함
+5. 300자 이내로 작성
+
+형식:
+🎉 **오늘의 특별 메뉴** 🎉
+
+📋 특별 메뉴 정보: [상세 내용]
+🍽️ 메뉴 구성: [구조화된 메뉴]
+🎊 특별 이벤트: [있다면]
+ℹ️ 참고사항: [기타 정보]
+
+맛있게 드세요! 😋
+"""
+
+SPECIAL_EVENT_INSTRUCTIONS = """
+아래는 한식뷔페의 특별 메뉴 정보입니다.
+메뉴 구성은 이미 정리되어 있으니 특별 이벤트 소개만 작성해주세요.
+
+요구사항:
+1. 특별한 이유나 이벤트 정보를 강조
+2. 이모지를 적절히 사용
+3. 100자 이내로 작성
+"""
+
+def estimate_tokens(text):
+    """
+    토크나이저 없이 추정한 토큰 수 (ASCII는 4자, 한글 등은 1.5자에 1토큰)
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+def compact_content(text, token_budget=DEFAULT_PROMPT_TOKEN_BUDGET):
+    """
+    LLM에 넘길 포스트 내용을 줄입니다.
+
+    구분선/해시태그를 지우고, 연속된 이모지는 하나만 남기고, 공백을 정리한 뒤 같은 줄은 한 번만 남깁니다.
+    그래도 token_budget을 넘으면 앞에서부터 예산만큼만 남깁니다.
+
+    Returns:
+        tuple: (줄인 내용, 잘렸는지 여부)
+    """
+    lines, seen = [], set()
+    for line in text.splitlines():
+        if SEPARATOR_PATTERN.match(line):
+            continue
+        line = HASHTAG_PATTERN.sub("", line)
+        line = EMOJI_RUN_PATTERN.sub(r"\1", line)
+        line = " ".join(line.split())
+        if not line or SEPARATOR_PATTERN.match(line) or line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            if not kept:
+                # 한 줄이 예산보다 길면 글자 수로 자름
+                kept.append(line[:int(token_budget * 1.5)])
+            return "\n".join(kept + [TRUNCATED_MARK]), True
+        kept.append(line)
+        used += cost
+    return "\n".join(kept), False
+
+def build_prompt(instructions, content, context=None, label="원본 내용"):
+    """공통 앞부분 + 지시문 + 실행마다 다른 정보 순서로 프롬프트를 만듭니다"""
+    parts = [SHARED_PREFIX + instructions.strip()]
+    if context:
+        parts.append(context.strip())
+    parts.append(f"{label}:\n{content}")
+    return "\n\n".join(parts) + "\n"
+
+def compact_prompt(instructions, content, token_budget=DEFAULT_PROMPT_TOKEN_BUDGET, context=None, name="llm"):
+    """
+    포스트 내용을 줄여서 프롬프트를 만들고 줄이기 전/후 추정 토큰 수를 남깁니다.
+
+    Args:
+        instructions (str): 지시문 (SUMMARY_INSTRUCTIONS 등)
+        content (str): 원본 포스트 내용
+        context (str): 지시문 뒤, 내용 앞에 넣을 정보 ("상황 분석: ...")
+        name (str): 로그/메트릭에 쓸 호출 이름
+
+    Returns:
+        tuple: (프롬프트, {"before", "after", "truncated"})
+    """
+    compacted, truncated = compact_content(content, token_budget)
+    prompt = build_prompt(instructions, compacted, context)
+    before = estimate_tokens(build_prompt(instructions, content, context))
+    after = estimate_tokens(prompt)
+    saved = 1 - after / before if before else 0.0
+    logging.info(f"✂️ {name} 프롬프트 압축: 약 {before} -> {after} 토큰 ({saved:.0%} 절감"
+                 + (", 예산 초과분 생략" if truncated else "") + ")")
+    get_registry().inc("menu_prompt_tokens_total", {"node": name, "stage": "before"}, before)
+    get_registry().inc("menu_prompt_tokens_total", {"node": name, "stage": "after"}, after)
+    return prompt, {"before": before, "after": after, "truncated": truncated}
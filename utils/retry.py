@@ -0,0 +1,206 @@
+import logging
+import random
+import time
+from datetime import datetime
+
+# 한 번의 워크플로우 실행에 허용하는 최대 시간(초)
+DEFAULT_RUN_DEADLINE_SECONDS = 600
+
+class FatalError(Exception):
+    """재시도해도 결과가 바뀌지 않는 오류 (즉시 fallback으로 넘어감)"""
+
+class DeadlineExceeded(FatalError):
+    """실행 마감 시간이 지나서 더 이상 시도하지 않는 경우"""
+
+# 설정/프로그래밍 오류는 재시도해도 소용없으므로 바로 포기
+FATAL_EXCEPTIONS = (FatalError, ValueError, TypeError, KeyError, AttributeError, ImportError, NotImplementedError)
+
+def is_retryable(exc):
+    """
+    예외가 재시도할 가치가 있는지 판단합니다.
+
+    Args:
+        exc (Exception): 발생한 예외
+
+    Returns:
+        bool: 재시도 가능 여부 (네트워크/빈 응답 등은 True, 설정 오류 등은 False)
+    """
+    return not isinstance(exc, FATAL_EXCEPTIONS)
+
+class RetryPolicy:
+    """
+    지수 백오프 + 지터 재시도 정책
+
+    n번째 재시도 전 대기 시간은 base_delay * factor^(n-1)을 max_delay로 자른 뒤
+    jitter 비율만큼 무작위로 줄인 값입니다.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1.0, factor=2.0, max_delay=30.0, jitter=0.3):
+        """
+        Args:
+            max_attempts (int): 첫 시도를 포함한 최대 시도 횟수
+            base_delay (float): 첫 재시도 전 대기 시간(초)
+            factor (float): 재시도마다 대기 시간에 곱하는 배수
+            max_delay (float): 대기 시간 상한(초)
+            jitter (float): 대기 시간을 무작위로 줄이는 비율 (0~1)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """attempt번째 시도가 실패한 뒤 기다릴 시간(초)을 반환합니다"""
+        delay = min(self.base_delay * (self.factor ** (attempt - 1)), self.max_delay)
+        return random.uniform(delay * (1 - self.jitter), delay)
+
+    def max_total_delay(self):
+        """모든 재시도에서 기다릴 수 있는 최대 대기 시간 합계(초)"""
+        return sum(min(self.base_delay * (self.factor ** (attempt - 1)), self.max_delay)
+                   for attempt in range(1, self.max_attempts))
+
+    def __repr__(self):
+        return (f"RetryPolicy(max_attempts={self.max_attempts}, base_delay={self.base_delay}, "
+                f"factor={self.factor}, max_delay={self.max_delay}, jitter={self.jitter})")
+
+# 노드 종류별 기본 재시도 정책
+DEFAULT_POLICIES = {
+    "fetch": RetryPolicy(max_attempts=3, base_delay=5, factor=2, max_delay=20),
+    "situation": RetryPolicy(max_attempts=2, base_delay=3, factor=2, max_delay=10),
+    "notice": RetryPolicy(max_attempts=2, base_delay=2, factor=2, max_delay=10),
+    "summarize": RetryPolicy(max_attempts=2, base_delay=3, factor=2, max_delay=10),
+    "send": RetryPolicy(max_attempts=2, base_delay=2, factor=2, max_delay=10)
+}
+
+# 남은 시간이 이보다 적으면 노드가 더 싼 경로를 선택 (초)
+CHEAP_PATH_BUDGETS = {
+    "selenium": 90,  # Chromium 대신 HTTP 요청만으로 스크래핑
+    "llm": 20,  # LLM 대신 키워드 감지 / 템플릿 요약 / 기본 알림 문구
+    "ocr": 60  # 이미지 OCR 없이 캡션만 사용
+}
+
+# DebugCheckNode가 단계 전체를 다시 실행할 수 있는 최대 횟수
+DEFAULT_STAGE_RETRIES = 1
+
+def get_policy(name):
+    """이름에 해당하는 기본 재시도 정책을 반환합니다"""
+    if name not in DEFAULT_POLICIES:
+        raise ValueError(f"알 수 없는 재시도 정책: {name}")
+    return DEFAULT_POLICIES[name]
+
+class Deadline:
+    """
+    워크플로우 실행 하나의 마감 시간 (실행 예산)
+
+    노드마다 쓴 시간을 stages에 기록하고, 남은 시간으로 더 싼 경로를 고를 수 있게 합니다.
+    """
+
+    def __init__(self, seconds=DEFAULT_RUN_DEADLINE_SECONDS):
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds
+        self.stages = []
+
+    @classmethod
+    def until(cls, sla_time, max_seconds=DEFAULT_RUN_DEADLINE_SECONDS, now=None):
+        """
+        오늘 sla_time(HH:MM)까지를 예산으로 하는 마감 시간을 만듭니다.
+
+        sla_time이 없거나 이미 지났으면 max_seconds를 사용합니다.
+
+        Args:
+            sla_time (str): 메뉴가 슬랙에 도착해야 하는 시각 (예: "11:05")
+            max_seconds (float): 예산 상한(초)
+        """
+        if not sla_time:
+            return cls(max_seconds)
+        now = now or datetime.now()
+        hour, minute = sla_time.split(":")
+        target = now.replace(hour=int(hour), minute=int(minute), second=0, microsecond=0)
+        if target <= now:
+            return cls(max_seconds)
+        return cls(min(max_seconds, (target - now).total_seconds()))
+
+    def remaining(self):
+        """남은 시간(초), 지났으면 0"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self):
+        """시작 후 지난 시간(초)"""
+        return time.monotonic() - self.started_at
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, label="실행"):
+        """마감 시간이 지났으면 DeadlineExceeded를 발생시킵니다"""
+        if self.expired():
+            raise DeadlineExceeded(f"{label}: 실행 마감 시간({self.seconds:.0f}초)이 지났습니다")
+
+    def short(self, path):
+        """
+        남은 시간이 CHEAP_PATH_BUDGETS[path]보다 적으면 True (더 싼 경로를 써야 함)
+
+        Args:
+            path (str): "selenium", "llm" 등
+        """
+        return self.remaining() < CHEAP_PATH_BUDGETS[path]
+
+    def timeout(self, default, fraction=0.5, minimum=3.0):
+        """
+        외부 호출에 쓸 타임아웃(초): 기본값과 남은 시간의 fraction 중 작은 값 (최소 minimum)
+        """
+        return max(minimum, min(default, self.remaining() * fraction))
+
+    def record_stage(self, stage, seconds):
+        """단계(노드)가 쓴 시간과 그 뒤 남은 시간을 기록합니다"""
+        self.stages.append({"stage": stage, "seconds": seconds, "remaining": self.remaining()})
+
+    def report(self):
+        """
+        단계별 예산 사용량을 합쳐서 반환합니다.
+
+        Returns:
+            list: [{"stage", "seconds", "share"}] (share는 전체 예산 대비 비율, 처음 실행된 순서)
+        """
+        totals = {}
+        for entry in self.stages:
+            totals[entry["stage"]] = totals.get(entry["stage"], 0.0) + entry["seconds"]
+        return [{"stage": stage, "seconds": seconds, "share": seconds / self.seconds if self.seconds else 0.0}
+                for stage, seconds in totals.items()]
+
+def run_with_retry(func, arg, policy, deadline=None, label="작업"):
+    """
+    재시도 정책과 마감 시간에 따라 func(arg)를 실행합니다.
+
+    재시도할 수 없는 오류이거나, 다음 대기 시간이 남은 시간보다 길면 바로 마지막 예외를 발생시킵니다.
+
+    Args:
+        func: 실행할 함수
+        arg: func에 넘길 인자
+        policy (RetryPolicy): 재시도 정책
+        deadline (Deadline): 실행 마감 시간 (None이면 제한 없음)
+        label (str): 로그에 쓸 작업 이름
+
+    Returns:
+        func의 반환값
+    """
+    for attempt in range(1, policy.max_attempts + 1):
+        if deadline is not None:
+            deadline.check(label)
+        try:
+            return func(arg)
+        except Exception as e:
+            if not is_retryable(e):
+                logging.warning(f"⛔ {label} 재시도 불가 오류: {e}")
+                raise
+            if attempt == policy.max_attempts:
+                raise
+
+            delay = policy.delay(attempt)
+            if deadline is not None and delay >= deadline.remaining():
+                logging.warning(f"⏰ {label} 재시도 중단: 남은 시간 {deadline.remaining():.1f}초 < 대기 {delay:.1f}초")
+                raise
+            logging.info(f"🔁 {label} 재시도 {attempt}/{policy.max_attempts - 1} ({delay:.1f}초 후): {e}")
+            time.sleep(delay)
@@ -4,15 +4,8 @@ import threading
 from datetime import datetime
 import logging
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('menu_scheduler.log'),
-        logging.StreamHandler()
-    ]
-)
+from utils.metrics import heartbeat, record_scheduler_lag
+from utils.retry import DEFAULT_RUN_DEADLINE_SECONDS
 
 def run_daily_menu_workflow(workflow_function, shared_store):
     """
@@ -68,6 +61,11 @@ def run_scheduler():
     
     while True:
         try:
+            due = [job for job in schedule.get_jobs() if job.should_run]
+            for job in due:
+                record_scheduler_lag((datetime.now() - job.next_run).total_seconds())
+            # 워크플로우는 이 루프 안에서 실행되므로 실행할 작업이 있으면 실행 예산만큼 더 기다려줌
+            heartbeat("scheduler", 60 + (DEFAULT_RUN_DEADLINE_SECONDS if due else 0))
             schedule.run_pending()
             time.sleep(60)  # 1분마다 체크
             
@@ -125,6 +123,9 @@ def list_scheduled_jobs():
         logging.info(f"  {i}. {job} (다음 실행: {job.next_run})")
 
 if __name__ == "__main__":
+    from utils.logger import setup_logging
+    setup_logging()
+    
     # 테스트용 더미 워크플로우
     def dummy_workflow(shared):
         print("🧪 테스트 워크플로우 실행")
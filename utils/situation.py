@@ -0,0 +1,155 @@
+import json
+import re
+
+from utils.metrics import get_registry
+
+# orjson은 선택 의존성 (없으면 표준 json으로 파싱)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 상황 유형 -> 기본 액션 (플로우는 이 네 가지 액션으로만 분기)
+SITUATION_ACTIONS = {
+    "normal": "normal",
+    "holiday": "holiday_notice",
+    "special_menu": "special_notice",
+    "business_hours_change": "normal",
+    "error": "error_notice",
+}
+ACTIONS = ("normal", "holiday_notice", "special_notice", "error_notice")
+
+# Gemini response_schema (OpenAPI 스키마 일부) - response_mime_type="application/json"과 함께 사용
+SITUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "situation_type": {"type": "string", "enum": list(SITUATION_ACTIONS)},
+        "confidence": {"type": "number"},
+        "detected_keywords": {"type": "array", "items": {"type": "string"}},
+        "summary": {"type": "string"},
+        "action_required": {"type": "string", "enum": list(ACTIONS)},
+    },
+    "required": ["situation_type", "confidence", "detected_keywords", "summary", "action_required"],
+}
+
+SITUATION_REPAIR_MAX_CHARS = 1500  # LLM 수선 요청에 넣을 응답 최대 길이
+SITUATION_REPAIR_TIMEOUT = 10  # LLM 수선 요청 타임아웃(초)
+
+JSON_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+PYTHON_LITERAL_PATTERN = re.compile(r"(?<![\w\"])(True|False|None)(?![\w\"])")
+
+class SituationParseError(ValueError):
+    """LLM 응답을 상황 분석 결과로 읽을 수 없음"""
+
+class SituationAnalysis:
+    """
+    검증된 특수 상황 분석 결과
+
+    Attributes:
+        situation_type (str): SITUATION_ACTIONS의 키
+        action_required (str): ACTIONS 중 하나 (플로우 분기에 사용)
+        confidence (float): 0~1
+        detected_keywords (list): 감지된 키워드
+        summary (str): 상황 요약
+    """
+
+    def __init__(self, situation_type, action_required, confidence, detected_keywords, summary):
+        self.situation_type = situation_type
+        self.action_required = action_required
+        self.confidence = confidence
+        self.detected_keywords = detected_keywords
+        self.summary = summary
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        응답 딕셔너리를 검증합니다. 빠진 부가 필드는 채우고, 분기에 쓰는 값이 틀리면 SituationParseError.
+        """
+        if not isinstance(data, dict):
+            raise SituationParseError(f"JSON 객체가 아닙니다: {type(data).__name__}")
+
+        situation_type = data.get("situation_type")
+        if situation_type not in SITUATION_ACTIONS:
+            raise SituationParseError(f"알 수 없는 situation_type: {situation_type!r}")
+        # 액션이 없거나 틀리면 상황 유형으로 정함 (엉뚱한 값이 플로우 분기로 새지 않게)
+        action = data.get("action_required")
+        if action not in ACTIONS:
+            action = SITUATION_ACTIONS[situation_type]
+
+        try:
+            confidence = min(1.0, max(0.0, float(data.get("confidence", 0.5))))
+        except (TypeError, ValueError):
+            confidence = 0.5
+        keywords = data.get("detected_keywords") or []
+        if not isinstance(keywords, list):
+            keywords = [keywords]
+        summary = data.get("summary")
+        return cls(situation_type, action, confidence, [str(k) for k in keywords],
+                   str(summary) if summary else situation_type)
+
+    def to_dict(self):
+        return {
+            "situation_type": self.situation_type,
+            "confidence": self.confidence,
+            "detected_keywords": self.detected_keywords,
+            "summary": self.summary,
+            "action_required": self.action_required
+        }
+
+def loads(text):
+    """JSON을 파싱합니다 (orjson이 있으면 orjson 사용)"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def parse_situation(text):
+    """
+    스키마 모드로 받은 응답(JSON 객체 하나)을 바로 파싱합니다.
+
+    Returns:
+        SituationAnalysis: 검증된 결과
+
+    Raises:
+        SituationParseError: JSON이 아니거나 필수 값이 틀림
+    """
+    try:
+        data = loads(text.strip())
+    except ValueError as e:
+        raise SituationParseError(f"JSON 파싱 실패: {e}") from e
+    return SituationAnalysis.from_dict(data)
+
+def repair_json_text(text):
+    """
+    LLM 응답에서 흔히 깨지는 부분만 고칩니다.
+
+    코드 펜스와 앞뒤 설명을 떼고, 스마트 따옴표, 끝에 남은 쉼표, 파이썬 리터럴(True/False/None)을 바꿉니다.
+    """
+    fence = JSON_FENCE_PATTERN.search(text)
+    if fence:
+        text = fence.group(1)
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start:end + 1]
+    text = text.replace("“", '"').replace("”", '"')
+    text = TRAILING_COMMA_PATTERN.sub(r"\1", text)
+    return PYTHON_LITERAL_PATTERN.sub(lambda m: PYTHON_LITERALS[m.group(1)], text)
+
+def repair_situation(text):
+    """
+    repair_json_text로 고친 응답을 파싱합니다. (LLM 호출 없음)
+
+    Raises:
+        SituationParseError: 고쳐도 읽을 수 없음
+    """
+    return parse_situation(repair_json_text(text))
+
+def record_parse_outcome(outcome):
+    """
+    상황 감지 응답 파싱 결과를 메트릭에 남깁니다.
+
+    Args:
+        outcome (str): "ok"(바로 파싱), "repaired"(로컬 수선), "llm_repaired"(LLM 수선), "failed"(키워드 감지로 대체)
+    """
+    get_registry().inc("menu_situation_parse_total", {"outcome": outcome})
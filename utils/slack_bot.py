@@ -0,0 +1,357 @@
+import hashlib
+import hmac
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from datetime import datetime, date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from utils.history import MenuHistory, DEFAULT_DB_PATH
+from utils.metrics import get_registry
+from utils.retry import DEFAULT_RUN_DEADLINE_SECONDS
+from utils.slack_sender import send_reply
+
+DEFAULT_BOT_HOST = "0.0.0.0"
+LOCAL_BOT_HOST = "127.0.0.1"  # 서명을 확인하지 않을 때는 이 컴퓨터에서 오는 요청만 받음
+DEFAULT_BOT_PORT = 3000
+DEFAULT_POST_TIME = "11:00"
+CACHE_TTL = 30  # 최신 요약을 DB에서 다시 읽기 전까지 메모리에서 그대로 쓰는 시간(초)
+REFRESH_COOLDOWN = 15 * 60  # 새로고침을 다시 예약하기까지 최소 간격(초)
+SIGNATURE_MAX_AGE = 5 * 60  # 이보다 오래된 슬랙 요청은 재전송으로 보고 거절(초)
+CAPTION_PREVIEW_CHARS = 300  # 요약이 없는 실행에 답할 때 보여줄 캡션 길이
+
+# 요약 없이 알림만 보내는 상황 -> 답의 첫 줄
+SITUATION_HEADINGS = {
+    "holiday": "🏖️ 오늘은 휴무일입니다",
+    "special_menu": "🎉 오늘은 특별 메뉴가 나옵니다",
+}
+
+MENTION_PATTERN = re.compile(r"<@[A-Z0-9]+>")
+
+HELP_TEXT = """🍽️ 사용법
+- `/menu` 오늘 메뉴
+- `/menu tomorrow` 내일 메뉴 (미리 올라왔으면)
+- `/menu history 갈비찜` 메뉴가 나온 날짜"""
+
+class BackgroundRefresher:
+    """
+    메뉴를 새로 가져오는 워크플로우를 백그라운드 스레드에서 한 번에 하나만 실행합니다.
+
+    봇 요청은 request()로 예약만 하고 바로 돌아갑니다. 이미 실행 중이거나 마지막 예약 후
+    cooldown이 지나지 않았으면 예약하지 않습니다.
+    """
+
+    def __init__(self, refresh, cooldown=REFRESH_COOLDOWN, on_done=None):
+        """
+        Args:
+            refresh: 메뉴 워크플로우를 실행하는 함수 (인자 없음)
+            cooldown (float): 예약 사이 최소 간격(초)
+            on_done: 새로고침이 끝나면 호출할 함수
+        """
+        self.refresh = refresh
+        self.cooldown = cooldown
+        self.on_done = on_done
+        self.lock = threading.Lock()
+        self.running = False
+        self.last_requested = None
+
+    def request(self, reason, now=None):
+        """
+        Returns:
+            bool: 새로 예약했으면 True
+        """
+        now = now or time.time()
+        with self.lock:
+            if self.running or (self.last_requested is not None and now - self.last_requested < self.cooldown):
+                return False
+            self.running = True
+            self.last_requested = now
+        logging.info(f"🔄 메뉴 새로고침 예약 ({reason})")
+        get_registry().inc("menu_bot_refreshes_total", {"reason": reason})
+        threading.Thread(target=self._run, name="menu-bot-refresh", daemon=True).start()
+        return True
+
+    def _run(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logging.error(f"❌ 메뉴 새로고침 실패: {e}")
+        finally:
+            with self.lock:
+                self.running = False
+            if self.on_done:
+                self.on_done()
+
+class MenuBot:
+    """
+    /menu 명령에 실행 기록 DB에 저장된 요약만으로 답하는 봇
+
+    요청을 처리하는 동안에는 스크래핑이나 LLM을 호출하지 않습니다. 게시 시각이 지났는데 오늘 실행 기록이
+    없으면 새로고침을 예약하고, 지금 가진 정보로 바로 답합니다.
+    """
+
+    def __init__(self, history, refresh=None, post_time=DEFAULT_POST_TIME, cache_ttl=CACHE_TTL, clock=None):
+        """
+        Args:
+            history (MenuHistory): 실행 기록 저장소
+            refresh: 메뉴 워크플로우를 실행하는 함수 (None이면 새로고침하지 않음)
+            post_time (str): 매일 메뉴를 보내는 시각 (HH:MM)
+            cache_ttl (float): 최신 요약을 메모리에 두는 시간(초)
+            clock: 현재 시각(datetime)을 반환하는 함수
+        """
+        self.history = history
+        self.refresher = BackgroundRefresher(refresh, on_done=self.invalidate) if refresh else None
+        self.post_time = datetime.strptime(post_time, "%H:%M").time()
+        self.cache_ttl = cache_ttl
+        self.clock = clock or datetime.now
+        self.lock = threading.Lock()
+        self.cached = None
+        self.cached_at = None
+
+    def latest(self):
+        """가장 최근 요약 (cache_ttl 동안은 메모리에서)"""
+        now = time.monotonic()
+        with self.lock:
+            if self.cached_at is not None and now - self.cached_at < self.cache_ttl:
+                return self.cached
+        latest = self.history.latest_summary()
+        with self.lock:
+            self.cached, self.cached_at = latest, now
+        return latest
+
+    def invalidate(self):
+        with self.lock:
+            self.cached_at = None
+
+    def is_stale(self, now):
+        """
+        오늘 실행이 끝났어야 할 시각(게시 시각 + 실행 마감 시간)이 지났는데 오늘 실행 기록이 없으면 True
+
+        예정된 실행이 아직 진행 중일 수 있는 동안은 새로고침하지 않고, 오늘 실행이 한 번이라도 있었으면
+        (요약이 없는 휴무일/특별 메뉴 실행이나 실패한 실행 포함) 다시 실행하지 않아 알림이 두 번 전송되지 않게 합니다.
+        """
+        due = datetime.combine(now.date(), self.post_time) + timedelta(seconds=DEFAULT_RUN_DEADLINE_SECONDS)
+        return now >= due and not self.history.has_run_on(now.date().isoformat())
+
+    def handle(self, text):
+        """
+        명령 텍스트에 대한 답을 반환합니다.
+
+        Args:
+            text (str): "/menu" 뒤의 텍스트 ("", "tomorrow", "history 갈비찜")
+
+        Returns:
+            str: 슬랙에 보낼 답
+        """
+        started = time.perf_counter()
+        words = (text or "").strip().split(maxsplit=1)
+        command = words[0].lower() if words else ""
+        argument = words[1].strip() if len(words) > 1 else ""
+
+        if command in ("", "today", "오늘"):
+            kind, answer = "today", self.answer_today()
+        elif command in ("tomorrow", "내일"):
+            kind, answer = "tomorrow", self.answer_tomorrow()
+        elif command in ("history", "기록") and argument:
+            kind, answer = "history", self.answer_history(argument)
+        else:
+            kind, answer = "help", HELP_TEXT
+
+        get_registry().inc("menu_bot_requests_total", {"command": kind})
+        logging.info(f"💬 /menu {kind} 응답 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+        return answer
+
+    def answer_today(self):
+        now = self.clock()
+        today = self.history.latest_run_on(now.date().isoformat())
+        if today and today["summary"]:
+            return f"{today['summary']}\n\n🕒 {today['run_at'][11:16]} 기준"
+        if today and today["situation_type"] in SITUATION_HEADINGS:
+            # 휴무일/특별 메뉴 실행은 요약 대신 알림을 보내므로 저장된 캡션으로 답함
+            caption = (today["raw_caption"] or "").strip()
+            if len(caption) > CAPTION_PREVIEW_CHARS:
+                caption = caption[:CAPTION_PREVIEW_CHARS] + "..."
+            return f"{SITUATION_HEADINGS[today['situation_type']]}\n\n{caption}\n\n🕒 {today['run_at'][11:16]} 기준"
+        posted = self.history.summary_for_date(now.date())
+        if posted:
+            return f"{posted['summary']}\n\n🕒 {posted['run_date']}에 미리 올라온 메뉴"
+
+        latest = self.latest()
+        if self.is_stale(now):
+            if self.refresher:
+                self.refresher.request("stale")
+            answer = "⏳ 오늘 메뉴를 아직 가져오지 못해서 새로 가져오는 중입니다. 잠시 후 다시 물어봐 주세요."
+        else:
+            answer = f"⏰ 오늘 메뉴는 보통 {self.post_time:%H:%M}쯤 올라옵니다."
+        if latest:
+            answer += f"\n\n📅 가장 최근 메뉴 ({latest['run_date']})\n{latest['summary']}"
+        return answer
+
+    def answer_tomorrow(self):
+        tomorrow = self.clock().date() + timedelta(days=1)
+        label = f"{tomorrow.month}월 {tomorrow.day}일"
+        posted = self.history.summary_for_date(tomorrow)
+        if posted:
+            return f"📅 내일({label}) 메뉴\n\n{posted['summary']}"
+        return f"🔍 내일({label}) 메뉴는 아직 올라오지 않았습니다. 보통 당일 {self.post_time:%H:%M}쯤 올라옵니다."
+
+    def answer_history(self, dish):
+        dates = self.history.dish_dates(dish, limit=5)
+        if dates:
+            days = (self.clock().date() - date.fromisoformat(dates[0])).days
+            ago = "오늘" if days == 0 else f"{days}일 전"
+            return f"🍽️ '{dish}' 마지막 제공일: {dates[0]} ({ago})\n📅 최근 제공일: {', '.join(dates)}"
+        matches = self.history.search_captions(dish, limit=5)
+        if matches:
+            return f"📝 '{dish}'이(가) 캡션에 나온 날짜: {', '.join(row['run_date'] for row in matches)}"
+        return f"🔍 '{dish}' 제공 기록이 없습니다."
+
+    def answer_mention(self, event):
+        """앱 멘션 이벤트에 스레드 답글로 답합니다"""
+        answer = self.handle(command_from_mention(event.get("text", "")))
+        send_reply(answer, event["channel"], event.get("thread_ts") or event.get("ts"))
+
+def command_from_mention(text):
+    """
+    멘션 텍스트에서 명령 부분만 남깁니다.
+
+    "<@U123> menu tomorrow", "<@U123> /menu history 갈비찜", "<@U123> 내일 메뉴" -> "tomorrow", "history 갈비찜", "내일"
+    """
+    words = MENTION_PATTERN.sub(" ", text).split()
+    if words and words[0].lower() in ("/menu", "menu"):
+        words = words[1:]
+    return " ".join(word for word in words if word != "메뉴")
+
+def verify_signature(secret, timestamp, body, signature, now=None):
+    """
+    슬랙 요청 서명(X-Slack-Signature)을 확인합니다.
+
+    Args:
+        secret (str): 슬랙 앱 Signing Secret
+        timestamp (str): X-Slack-Request-Timestamp 헤더
+        body (bytes): 요청 본문
+        signature (str): X-Slack-Signature 헤더 ("v0=...")
+    """
+    try:
+        sent_at = int(timestamp)
+    except (TypeError, ValueError):
+        return False
+    if abs((now or time.time()) - sent_at) > SIGNATURE_MAX_AGE:
+        return False
+    base = f"v0:{timestamp}:".encode("utf-8") + body
+    expected = "v0=" + hmac.new(secret.encode("utf-8"), base, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+class SlackBotHandler(BaseHTTPRequestHandler):
+    """슬랙 슬래시 명령(/slack/commands)과 이벤트(/slack/events) 요청 처리"""
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        secret = self.server.signing_secret
+        if secret and not verify_signature(secret, self.headers.get("X-Slack-Request-Timestamp"), body,
+                                           self.headers.get("X-Slack-Signature")):
+            self._send_json(401, {"error": "invalid signature"})
+            return
+        try:
+            if path == "/slack/commands":
+                form = {key: values[0] for key, values in parse_qs(body.decode("utf-8")).items()}
+                self._send_json(200, {"response_type": "ephemeral", "text": self.server.bot.handle(form.get("text", ""))})
+            elif path == "/slack/events":
+                self._handle_event(json.loads(body or b"{}"))
+            else:
+                self._send_json(404, {"error": "not found"})
+        except Exception as e:
+            logging.warning(f"⚠️ 슬랙 봇 요청 처리 실패 ({path}): {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def _handle_event(self, payload):
+        if payload.get("type") == "url_verification":
+            self._send_json(200, {"challenge": payload.get("challenge")})
+            return
+        # 슬랙은 3초 안에 응답이 없으면 같은 이벤트를 다시 보내므로 먼저 응답하고, 재전송된 이벤트는 무시
+        self._send_json(200, {})
+        event = payload.get("event") or {}
+        if self.headers.get("X-Slack-Retry-Num") or event.get("type") != "app_mention" or event.get("bot_id"):
+            return
+        self.server.bot.answer_mention(event)
+
+    def _send_json(self, code, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # 응답 로그는 MenuBot.handle이 남김
+        pass
+
+def start_bot_server(bot, port=DEFAULT_BOT_PORT, host=DEFAULT_BOT_HOST, signing_secret=None):
+    """
+    슬랙 요청을 받는 HTTP 서버를 데몬 스레드에서 시작합니다.
+
+    Args:
+        bot (MenuBot): 명령에 답할 봇
+        signing_secret (str): 슬랙 Signing Secret (None이면 서명을 확인하지 않고 LOCAL_BOT_HOST에만 바인딩, 로컬 테스트용)
+
+    Returns:
+        ThreadingHTTPServer: 실행 중인 서버 (shutdown()으로 중지)
+    """
+    if not signing_secret:
+        # 서명 없는 요청으로 누구나 기록을 읽고 새로고침(워크플로우 실행)을 예약할 수 없게 외부 접속을 막음
+        logging.warning(f"⚠️ SLACK_SIGNING_SECRET이 없어 요청 서명을 확인하지 않습니다 ({LOCAL_BOT_HOST}에서만 요청을 받음)")
+        host = LOCAL_BOT_HOST
+    server = ThreadingHTTPServer((host, port), SlackBotHandler)
+    server.daemon_threads = True
+    server.bot = bot
+    server.signing_secret = signing_secret
+    thread = threading.Thread(target=server.serve_forever, name="slack-bot-server", daemon=True)
+    thread.start()
+    logging.info(f"💬 슬랙 봇 서버 시작: http://{host}:{server.server_port} (/slack/commands, /slack/events)")
+    return server
+
+def start_socket_mode(bot, app_token, bot_token):
+    """
+    슬랙 Socket Mode로 연결합니다. (공개 HTTP 주소 없이 사용)
+
+    Args:
+        app_token (str): connections:write 권한이 있는 앱 토큰 (xapp-...)
+        bot_token (str): 멘션 답글에 쓸 봇 토큰 (xoxb-...)
+
+    Returns:
+        SocketModeClient: 연결된 클라이언트 (close()로 종료)
+    """
+    from slack_sdk.socket_mode import SocketModeClient
+    from slack_sdk.socket_mode.response import SocketModeResponse
+    from utils.slack_sender import get_slack_client
+
+    def on_request(client, request):
+        if request.type == "slash_commands":
+            answer = bot.handle(request.payload.get("text", ""))
+            client.send_socket_mode_response(SocketModeResponse(
+                envelope_id=request.envelope_id, payload={"response_type": "ephemeral", "text": answer}))
+            return
+        client.send_socket_mode_response(SocketModeResponse(envelope_id=request.envelope_id))
+        event = request.payload.get("event") or {}
+        if request.type == "events_api" and not request.retry_attempt \
+                and event.get("type") == "app_mention" and not event.get("bot_id"):
+            bot.answer_mention(event)
+
+    client = SocketModeClient(app_token=app_token, web_client=get_slack_client(bot_token))
+    client.socket_mode_request_listeners.append(on_request)
+    client.connect()
+    logging.info("💬 슬랙 봇 Socket Mode 연결")
+    return client
+
+if __name__ == "__main__":
+    # 로컬에서 슬랙 없이 명령 확인: python -m utils.slack_bot history 갈비찜
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    local_bot = MenuBot(MenuHistory(DEFAULT_DB_PATH),
+                        refresh=lambda: logging.info("🔄 (로컬 실행이라 새로고침은 건너뜀)"))
+    print(local_bot.handle(" ".join(sys.argv[1:])))
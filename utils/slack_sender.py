@@ -1,8 +1,42 @@
+import logging
 import os
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+import threading
+import time
 from datetime import datetime
 
+from utils.metrics import get_registry
+
+# 벤치마크 등에서 실제 슬랙 API 대신 사용할 전송 백엔드 (None이면 슬랙 API 사용)
+_slack_backend = None
+
+def set_slack_backend(backend):
+    """
+    슬랙 전송 백엔드를 교체합니다.
+    
+    Args:
+        backend: (channel, text)를 받아 성공 여부(bool) 또는 메시지 ts(str)를 반환하는 callable
+            (None이면 슬랙 API로 복원). 스레드 답글/고정 요청이면 thread_ts, pin 키워드 인자도 받고,
+            이미 보낸 메시지를 고치는 요청이면 update_ts 키워드 인자를 받습니다.
+    """
+    global _slack_backend
+    _slack_backend = backend
+
+STREAM_UPDATE_INTERVAL = 1.0  # 스트리밍 중 chat.update 사이 최소 간격(초)
+STREAM_PENDING_MARK = "\n\n✍️ _작성 중..._"
+
+# 여러 워크플로우 스레드가 함께 쓰는 슬랙 클라이언트 (토큰별로 하나)
+_slack_clients = {}
+_slack_clients_lock = threading.Lock()
+
+def get_slack_client(token):
+    """슬랙 WebClient를 반환합니다 (프로세스 안에서 공유)"""
+    with _slack_clients_lock:
+        if token not in _slack_clients:
+            # slack_sdk는 실제 전송 시점에 로드
+            from slack_sdk import WebClient
+            _slack_clients[token] = WebClient(token=token)
+        return _slack_clients[token]
+
 def send_slack_message(message, channel="#lunch-menu"):
     """
     슬랙 채널로 메시지를 전송합니다.
@@ -14,21 +48,20 @@ def send_slack_message(message, channel="#lunch-menu"):
     Returns:
         bool: 전송 성공 여부
     """
+    return post_slack_message(message, channel) is not None
+
+def format_menu_message(message, updated_at=None):
+    """
+    메뉴 메시지에 머리말(업데이트 시간)과 꼬리말을 붙입니다.
     
-    # 슬랙 토큰 가져오기
-    slack_token = os.environ.get("SLACK_BOT_TOKEN")
-    if not slack_token:
-        print("❌ SLACK_BOT_TOKEN 환경변수가 설정되지 않았습니다.")
-        return False
+    Args:
+        message (str): 메뉴 내용
+        updated_at (datetime): 머리말에 표시할 시간 (None이면 현재 시간)
+    """
+    # 현재 시간을 포함한 메시지 포맷팅
+    current_time = (updated_at or datetime.now()).strftime("%Y년 %m월 %d일 %H시 %M분")
     
-    try:
-        # 슬랙 클라이언트 초기화
-        client = WebClient(token=slack_token)
-        
-        # 현재 시간을 포함한 메시지 포맷팅
-        current_time = datetime.now().strftime("%Y년 %m월 %d일 %H시 %M분")
-        
-        formatted_message = f"""
+    return f"""
 🍽️ **구도 한식뷔페 오늘의 메뉴** 🍽️
 
 📅 업데이트 시간: {current_time}
@@ -37,27 +70,230 @@ def send_slack_message(message, channel="#lunch-menu"):
 
 ---
 💡 *매일 오전 11시에 자동으로 업데이트됩니다*
-        """.strip()
+    """.strip()
+
+def post_slack_message(message, channel="#lunch-menu", thread_ts=None, pin=False):
+    """
+    슬랙 채널로 메시지를 전송하고 메시지 ts를 반환합니다.
+    
+    Args:
+        message (str): 전송할 메시지
+        channel (str): 슬랙 채널명
+        thread_ts (str): 답글을 달 스레드의 부모 메시지 ts (None이면 채널에 전송)
+        pin (bool): 전송한 메시지를 채널에 고정할지 여부
+        
+    Returns:
+        str | None: 전송한 메시지의 ts (실패 시 None)
+    """
+    
+    formatted_message = format_menu_message(message)
+    
+    if _slack_backend is not None:
+        options = {}
+        if thread_ts:
+            options["thread_ts"] = thread_ts
+        if pin:
+            options["pin"] = True
+        result = _slack_backend(channel, formatted_message, **options)
+        if isinstance(result, str) or not result:
+            return result or None
+        return f"{time.time():.6f}"
+    
+    # 슬랙 토큰 가져오기
+    slack_token = os.environ.get("SLACK_BOT_TOKEN")
+    if not slack_token:
+        logging.error("❌ SLACK_BOT_TOKEN 환경변수가 설정되지 않았습니다.")
+        return None
+    
+    from slack_sdk.errors import SlackApiError
+    
+    try:
+        client = get_slack_client(slack_token)
         
         # 메시지 전송
         response = client.chat_postMessage(
             channel=channel,
             text=formatted_message,
-            parse="full"
+            parse="full",
+            thread_ts=thread_ts
         )
         
-        if response["ok"]:
-            print(f"✅ 슬랙 메시지 전송 성공: {channel}")
-            return True
-        else:
-            print(f"❌ 슬랙 메시지 전송 실패: {response.get('error', 'Unknown error')}")
-            return False
+        if not response["ok"]:
+            logging.error(f"❌ 슬랙 메시지 전송 실패: {response.get('error', 'Unknown error')}")
+            return None
+        
+        logging.info(f"✅ 슬랙 메시지 전송 성공: {channel}")
+        if pin:
+            try:
+                client.pins_add(channel=response["channel"], timestamp=response["ts"])
+            except SlackApiError as e:
+                # 고정 실패는 전송 실패가 아님
+                logging.warning(f"⚠️ 슬랙 메시지 고정 실패: {e.response['error']}")
+        return response["ts"]
             
     except SlackApiError as e:
-        print(f"❌ 슬랙 API 오류: {e.response['error']}")
-        return False
+        logging.error(f"❌ 슬랙 API 오류: {e.response['error']}")
+        return None
     except Exception as e:
-        print(f"❌ 예상치 못한 오류: {e}")
+        logging.error(f"❌ 예상치 못한 오류: {e}")
+        return None
+
+class StreamingSlackMessage:
+    """
+    LLM 응답을 받는 대로 슬랙 메시지 하나를 고쳐 쓰며 보여줍니다.
+    
+    첫 조각이 오면 바로 chat.postMessage로 보내고, 이후에는 섹션(빈 줄로 끝나는 단락)이 완성될 때마다
+    chat.update로 고칩니다. 수정은 min_interval에 한 번까지만 보내고 그사이 도착한 내용은 다음 수정에 모아서
+    보내므로 슬랙 rate limit(채널당 초당 1건 정도)을 넘지 않습니다. finish()가 전체 내용으로 마지막 수정을 합니다.
+    """
+    
+    def __init__(self, channel, ts=None, min_interval=STREAM_UPDATE_INTERVAL, clock=time.monotonic):
+        """
+        Args:
+            channel (str): 슬랙 채널
+            ts (str): 이미 보낸 메시지의 ts (재시도할 때 새 메시지 대신 이 메시지를 고침)
+            min_interval (float): chat.update 사이 최소 간격(초)
+        """
+        self.channel = channel
+        self.channel_id = channel
+        self.ts = ts
+        self.min_interval = min_interval
+        self.clock = clock
+        self.text = ""
+        self.shown = None
+        self.last_sent = None
+        self.started = clock()
+        self.first_visible = None
+        self.updated_at = datetime.now()
+        self.updates = 0
+    
+    def append(self, chunk):
+        """응답 조각을 더하고 필요하면 메시지를 보냅니다"""
+        self.text += chunk
+        visible = self._visible()
+        pending = visible + STREAM_PENDING_MARK
+        if not visible or pending == self.shown:
+            return
+        if self.shown is None or self.clock() - self.last_sent >= self.min_interval:
+            self._publish(pending)
+    
+    def finish(self, text=None):
+        """
+        전체 내용으로 메시지를 마무리합니다.
+        
+        Returns:
+            bool: 마지막 전송/수정 성공 여부
+        """
+        if text is not None:
+            self.text = text
+        return self._publish(self.text.strip())
+    
+    def _visible(self):
+        """지금 보여줄 부분 (첫 전송은 마지막 줄바꿈까지, 이후는 완성된 섹션까지)"""
+        text = self.text
+        if self.shown is None:
+            # 첫 조각은 바로 보여주되 줄 중간에서 끊기지 않게 함
+            boundary = text.rfind("\n")
+            return (text[:boundary] if boundary > 0 else text).strip()
+        boundary = text.rfind("\n\n")
+        return text[:boundary].strip() if boundary > 0 else ""
+    
+    def _publish(self, text):
+        if not text:
+            return False
+        message = format_menu_message(text, self.updated_at)
+        if self.ts is None:
+            result = _start_message(message, self.channel)
+            if result is None:
+                return False
+            self.channel_id, self.ts = result
+            ok = True
+        else:
+            ok = _update_message(message, self.channel_id, self.ts)
+            self.updates += 1
+        if ok:
+            if self.first_visible is None:
+                self.first_visible = self.clock() - self.started
+                logging.info(f"📡 첫 내용 표시까지 {self.first_visible:.2f}초")
+                get_registry().observe("menu_first_visible_seconds", self.first_visible)
+            self.shown = text
+            self.last_sent = self.clock()
+        return ok
+
+def _start_message(message, channel):
+    """메시지를 보내고 (채널 ID, ts)를 반환합니다 (chat.update에는 채널 이름 대신 ID가 필요)"""
+    if _slack_backend is not None:
+        result = _slack_backend(channel, message)
+        if not result:
+            return None
+        return channel, result if isinstance(result, str) else f"{time.time():.6f}"
+    
+    slack_token = os.environ.get("SLACK_BOT_TOKEN")
+    if not slack_token:
+        logging.error("❌ SLACK_BOT_TOKEN 환경변수가 설정되지 않았습니다.")
+        return None
+    
+    from slack_sdk.errors import SlackApiError
+    
+    try:
+        response = get_slack_client(slack_token).chat_postMessage(channel=channel, text=message, parse="full")
+        logging.info(f"✅ 슬랙 메시지 전송 성공: {channel} (스트리밍)")
+        return response["channel"], response["ts"]
+    except SlackApiError as e:
+        logging.error(f"❌ 슬랙 API 오류: {e.response['error']}")
+        return None
+
+def _update_message(message, channel_id, ts):
+    """이미 보낸 메시지를 고칩니다 (실패해도 다음 수정에서 다시 시도하므로 로그만 남김)"""
+    if _slack_backend is not None:
+        return bool(_slack_backend(channel_id, message, update_ts=ts))
+    
+    from slack_sdk.errors import SlackApiError
+    
+    try:
+        get_slack_client(os.environ.get("SLACK_BOT_TOKEN")).chat_update(channel=channel_id, ts=ts, text=message, parse="full")
+        return True
+    except SlackApiError as e:
+        logging.warning(f"⚠️ 슬랙 메시지 수정 실패: {e.response['error']}")
+        return False
+
+def update_slack_message(message, channel, ts):
+    """
+    전송한 메뉴 메시지의 내용을 바꿉니다.
+    
+    Args:
+        message (str): 새 메뉴 내용 (머리말/꼬리말은 자동으로 붙음)
+        channel (str): 메시지를 보낸 채널 ID
+        ts (str): 메시지 ts
+        
+    Returns:
+        bool: 성공 여부
+    """
+    return _update_message(format_menu_message(message), channel, ts)
+
+def send_reply(text, channel, thread_ts=None):
+    """
+    메뉴 알림 머리말 없이 text를 그대로 전송합니다. (봇 멘션 답글용)
+
+    Returns:
+        bool: 전송 성공 여부
+    """
+    if _slack_backend is not None:
+        options = {"thread_ts": thread_ts} if thread_ts else {}
+        return bool(_slack_backend(channel, text, **options))
+
+    slack_token = os.environ.get("SLACK_BOT_TOKEN")
+    if not slack_token:
+        logging.error("❌ SLACK_BOT_TOKEN 환경변수가 설정되지 않았습니다.")
+        return False
+
+    from slack_sdk.errors import SlackApiError
+
+    try:
+        response = get_slack_client(slack_token).chat_postMessage(channel=channel, text=text, thread_ts=thread_ts)
+        return bool(response["ok"])
+    except SlackApiError as e:
+        logging.error(f"❌ 슬랙 API 오류: {e.response['error']}")
         return False
 
 def send_error_notification(error_message, channel="#lunch-menu"):
@@ -0,0 +1,320 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from utils.logger import log_context
+from utils.metrics import heartbeat, record_scheduler_lag
+
+DEFAULT_SCHEDULE = "11:00"
+DEFAULT_WORKERS = 4
+DEFAULT_TENANT_DATA_DIR = os.path.join("data", "tenants")
+SLA_MARGIN_MINUTES = 5  # sla_time이 없으면 실행 시각 + 5분을 목표 시각으로 사용
+
+# 테넌트 설정에서 config로 넘기지 않는 키
+TENANT_KEYS = {"name", "schedule"}
+REQUIRED_KEYS = ("instagram_url", "slack_channel")
+HHMM_PATTERN = re.compile(r"^([01]\d|2[0-3]):[0-5]\d$")
+
+class Tenant:
+    """
+    식당 하나의 설정 (인스타그램 프로필, 슬랙 채널, 실행 시각, 나머지 config 옵션)
+
+    실행할 때마다 새 shared store를 만들어서 테넌트끼리, 실행끼리 상태를 공유하지 않습니다.
+    """
+
+    def __init__(self, name, schedule, config):
+        self.name = name
+        self.schedule = schedule
+        self.config = config
+
+    @property
+    def schedule_minutes(self):
+        hour, minute = self.schedule.split(":")
+        return int(hour) * 60 + int(minute)
+
+    def shared_store(self):
+        """이 테넌트의 config를 적용한 새 shared store를 만듭니다"""
+        from flow import get_default_shared_store
+
+        shared = get_default_shared_store()
+        shared["config"].update(self.config)
+        return shared
+
+    def __repr__(self):
+        return f"Tenant({self.name!r}, schedule={self.schedule!r})"
+
+def _read_config_file(path):
+    """JSON/TOML/YAML 파일을 확장자에 맞게 읽습니다 (YAML은 PyYAML이 있어야 함)"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "rb") as f:
+        raw = f.read()
+    if extension == ".json":
+        return json.loads(raw.decode("utf-8"))
+    if extension == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python 3.10 이하
+            import tomli as tomllib
+        return tomllib.loads(raw.decode("utf-8"))
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML 테넌트 설정을 읽으려면 PyYAML을 설치하세요 (pip install pyyaml)")
+        return yaml.safe_load(raw) or {}
+    raise ValueError(f"지원하지 않는 테넌트 설정 형식: {path} (.json, .toml, .yaml)")
+
+def parse_tenants(data):
+    """
+    테넌트 설정 딕셔너리를 Tenant 리스트로 바꿉니다.
+
+    형식:
+        {"defaults": {...모든 테넌트 공통 config...},
+         "tenants": [{"name", "instagram_url", "slack_channel", "schedule", ...config 옵션}]}
+
+    history_db와 archive_dir은 지정하지 않으면 테넌트마다 data/tenants/<이름>/ 아래를 사용하고,
+    sla_time은 지정하지 않으면 실행 시각 + 5분입니다.
+
+    Returns:
+        list: Tenant 리스트
+
+    Raises:
+        ValueError: 이름이 없거나 겹치는 경우, 필수 키가 없는 경우, 시각 형식이 잘못된 경우
+    """
+    defaults = data.get("defaults", {})
+    tenants, names = [], set()
+    for index, entry in enumerate(data.get("tenants", [])):
+        merged = {**defaults, **entry}
+        name = merged.get("name")
+        if not name:
+            raise ValueError(f"{index + 1}번째 테넌트에 name이 없습니다")
+        if name in names:
+            raise ValueError(f"테넌트 이름이 겹칩니다: {name}")
+        names.add(name)
+
+        missing = [key for key in REQUIRED_KEYS if not merged.get(key)]
+        if missing:
+            raise ValueError(f"테넌트 {name}: {', '.join(missing)} 설정이 없습니다")
+
+        schedule = str(merged.get("schedule", DEFAULT_SCHEDULE))
+        if not HHMM_PATTERN.match(schedule):
+            raise ValueError(f"테넌트 {name}: schedule은 HH:MM 형식이어야 합니다 ({schedule})")
+
+        config = {key: value for key, value in merged.items() if key not in TENANT_KEYS}
+        config.setdefault("history_db", os.path.join(DEFAULT_TENANT_DATA_DIR, name, "menu_history.db"))
+        config.setdefault("archive_dir", os.path.join(DEFAULT_TENANT_DATA_DIR, name, "post_archive"))
+        if "sla_time" not in config:
+            sla = datetime.strptime(schedule, "%H:%M") + timedelta(minutes=SLA_MARGIN_MINUTES)
+            config["sla_time"] = sla.strftime("%H:%M")
+        tenants.append(Tenant(name, schedule, config))
+    return tenants
+
+def load_tenants(path):
+    """
+    테넌트 설정 파일(JSON/TOML/YAML)을 읽습니다.
+
+    Returns:
+        list: Tenant 리스트
+    """
+    tenants = parse_tenants(_read_config_file(path))
+    logging.info(f"🏢 테넌트 {len(tenants)}개 로드: {path}")
+    return tenants
+
+def next_run_time(tenants, now=None, skip=()):
+    """
+    테넌트 실행 시각 중 now 이후 가장 이른 시각을 반환합니다.
+
+    Args:
+        skip: 오늘은 이미 실행해서 내일 시각을 써야 하는 테넌트 이름들
+
+    Returns:
+        datetime | None: 다음 실행 예정 시각 (테넌트가 없으면 None)
+    """
+    now = now or datetime.now()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    candidates = []
+    for tenant in tenants:
+        at = midnight + timedelta(minutes=tenant.schedule_minutes)
+        if tenant.name in skip or at < now:
+            at += timedelta(days=1)
+        candidates.append(at)
+    return min(candidates, default=None)
+
+class TenantState:
+    """테넌트 하나의 실행 상태"""
+
+    def __init__(self):
+        self.last_run_date = None
+        self.in_flight = False
+        self.last_started = 0.0
+        self.last_seconds = None
+        self.runs = 0
+        self.failures = 0
+
+class TenantScheduler:
+    """
+    여러 테넌트의 메뉴 워크플로우를 제한된 워커 풀에서 실행하는 스케줄러
+
+    - 테넌트마다 하루 한 번, schedule 시각이 지나면 실행 대상이 됨
+    - 워커가 빌 때만 다음 테넌트를 넣어서 대기열이 쌓이지 않고, 한 테넌트는 동시에 한 번만 실행
+    - 실행 순서는 예정 시각이 이른 순, 같으면 가장 오래전에 실행된 테넌트부터
+      (느린 테넌트는 워커 하나만 차지하고, 실행 예산(sla_time)으로 길이도 제한됨)
+    - 실행마다 테넌트 config로 새 shared store를 만들어서 상태를 격리
+    - coordinator가 있으면 "테넌트:날짜" 작업을 선점한 경우에만 실행 (여러 프로세스가 떠 있어도 한 번만 실행)
+    """
+
+    def __init__(self, tenants, run_function, workers=DEFAULT_WORKERS, catch_up=False, now=None,
+                 coordinator=None):
+        """
+        Args:
+            tenants (list): Tenant 리스트
+            run_function: shared store를 받아 워크플로우를 실행하는 함수 (main.run_menu_workflow)
+            workers (int): 동시에 실행할 최대 워크플로우 수
+            catch_up (bool | int): 시작 시점에 이미 지난 오늘 실행도 실행할지 여부
+                (숫자면 그 분 이내에 지난 실행만 실행, 리더가 바뀐 직후 놓친 실행을 이어받을 때 사용)
+            coordinator (Coordinator): 프로세스 간 작업 선점에 사용할 조율기 (utils.coordination)
+        """
+        self.tenants = list(tenants)
+        self.run_function = run_function
+        self.workers = workers
+        self.coordinator = coordinator
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tenant")
+        self.lock = threading.Lock()
+        self.states = {tenant.name: TenantState() for tenant in self.tenants}
+
+        # schedule 라이브러리처럼 시작 전에 지난 실행은 건너뜀
+        now = now or datetime.now()
+        if catch_up is not True:
+            minute = now.hour * 60 + now.minute
+            window = catch_up or 0
+            for tenant in self.tenants:
+                if tenant.schedule_minutes < minute - window:
+                    self.states[tenant.name].last_run_date = now.date()
+
+    def due_tenants(self, now=None):
+        """지금 실행해야 하는 테넌트를 실행 순서대로 반환합니다"""
+        now = now or datetime.now()
+        with self.lock:
+            return self._due_tenants(now)
+
+    def _due_tenants(self, now):
+        # self.lock을 잡은 상태에서 호출
+        minute = now.hour * 60 + now.minute
+        due = [tenant for tenant in self.tenants
+               if tenant.schedule_minutes <= minute
+               and self.states[tenant.name].last_run_date != now.date()
+               and not self.states[tenant.name].in_flight]
+        due.sort(key=lambda tenant: (tenant.schedule_minutes, self.states[tenant.name].last_started))
+        return due
+
+    def dispatch(self, now=None):
+        """
+        빈 워커 수만큼 실행할 테넌트를 워커 풀에 넣습니다.
+
+        Returns:
+            list: 이번에 실행을 시작한 테넌트 이름 리스트
+        """
+        now = now or datetime.now()
+        # 폴링 루프와 실행을 마친 워커가 동시에 부를 수 있으므로 고르기와 in_flight 표시를 한 번에 잠금 안에서 함
+        with self.lock:
+            free = self.workers - sum(state.in_flight for state in self.states.values())
+            selected = self._due_tenants(now)[:max(0, free)]
+            for tenant in selected:
+                state = self.states[tenant.name]
+                state.in_flight = True
+                state.last_run_date = now.date()
+                state.last_started = time.monotonic()
+        for tenant in selected:
+            self.executor.submit(self._run_tenant, tenant, now.date())
+        return [tenant.name for tenant in selected]
+
+    def _run_tenant(self, tenant, run_date):
+        started = time.perf_counter()
+        ran, failed = True, False
+        try:
+            with log_context(tenant=tenant.name):
+                logging.info(f"🏢 테넌트 실행 시작: {tenant.name}")
+                scheduled = datetime.combine(run_date, datetime.min.time()) + timedelta(minutes=tenant.schedule_minutes)
+                record_scheduler_lag((datetime.now() - scheduled).total_seconds())
+                shared = tenant.shared_store()
+                if self.coordinator:
+                    from utils.coordination import run_once
+
+                    ran = run_once(self.coordinator, f"{tenant.name}:{run_date.isoformat()}",
+                                   self.run_function, shared)
+                else:
+                    self.run_function(shared)
+                failed = ran and not shared["status"].get("final_success", False)
+        except Exception as e:
+            failed = True
+            logging.error(f"❌ 테넌트 {tenant.name} 실행 오류: {e}")
+        finally:
+            with self.lock:
+                state = self.states[tenant.name]
+                state.in_flight = False
+                if ran:
+                    state.last_seconds = time.perf_counter() - started
+                    state.runs += 1
+                    state.failures += failed
+            # 다음 폴링을 기다리지 않고 빈 워커를 바로 채움
+            try:
+                self.dispatch()
+            except Exception as e:
+                logging.error(f"❌ 테넌트 스케줄러 오류: {e}")
+
+    def next_run(self, now=None):
+        """
+        다음에 실행될 테넌트 예정 시각을 반환합니다.
+
+        Returns:
+            datetime | None: 다음 실행 예정 시각 (테넌트가 없으면 None)
+        """
+        now = now or datetime.now()
+        with self.lock:
+            ran_today = {tenant.name for tenant in self.tenants if self.states[tenant.name].last_run_date == now.date()}
+        return next_run_time(self.tenants, now, skip=ran_today)
+
+    def stats(self):
+        """
+        테넌트별 실행 통계를 반환합니다.
+
+        Returns:
+            dict: 테넌트 이름 -> {"schedule", "in_flight", "runs", "failures", "last_seconds"}
+        """
+        with self.lock:
+            return {
+                tenant.name: {
+                    "schedule": tenant.schedule,
+                    "in_flight": self.states[tenant.name].in_flight,
+                    "runs": self.states[tenant.name].runs,
+                    "failures": self.states[tenant.name].failures,
+                    "last_seconds": self.states[tenant.name].last_seconds
+                }
+                for tenant in self.tenants
+            }
+
+    def run(self, poll_seconds=15, keep_running=None):
+        """
+        스케줄러 루프를 실행합니다 (keep_running이 없으면 무한 루프)
+
+        Args:
+            keep_running: 폴링마다 호출해서 False를 반환하면 루프를 끝내는 함수
+        """
+        logging.info(f"🏢 테넌트 스케줄러 시작 (테넌트 {len(self.tenants)}개, 워커 {self.workers}개)")
+        try:
+            while keep_running is None or keep_running():
+                heartbeat("tenants", poll_seconds)
+                try:
+                    started = self.dispatch()
+                    if started:
+                        logging.info(f"🚀 실행 시작: {', '.join(started)}")
+                except Exception as e:
+                    logging.error(f"❌ 테넌트 스케줄러 오류: {e}")
+                time.sleep(poll_seconds)
+        finally:
+            self.executor.shutdown(wait=False)